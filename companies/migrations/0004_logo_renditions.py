@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_alter_company_logo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
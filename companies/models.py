@@ -15,5 +15,7 @@ class Company(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     logo = models.ImageField(upload_to='company_logos/%Y/%m/', blank=True, null=True)
+    # Resized WebP/JPEG copies of the logo (see jobportal/renditions.py)
+    renditions = models.JSONField(default=dict, blank=True)
     def __str__(self):
         return self.company_name
@@ -0,0 +1,87 @@
+"""
+Aggregate queries behind the company dashboard and applicant views.
+
+Each helper answers its whole question with a single conditional-aggregation
+query, so the cost doesn't grow with the number of jobs or applications.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from itertools import chain
+
+from django.db import connection
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from jobs.models import Job, JobApplication
+
+
+def dashboard_stats(company, now=None):
+    """
+    Recruitment statistics for ``company`` in one query: jobs LEFT JOIN
+    applications, counted with FILTER clauses.
+    """
+    now = now or timezone.now()
+    last_30_days = now - timedelta(days=30)
+
+    stats = Job.objects.filter(company=company).aggregate(
+        total_jobs=Count('id', distinct=True),
+        active_jobs=Count('id', filter=Q(is_active=True), distinct=True),
+        total_applications=Count('applications'),
+        interviews_scheduled=Count(
+            'applications', filter=Q(applications__status__in=['interviewed', 'shortlisted'])
+        ),
+        positions_filled=Count('applications', filter=Q(applications__status='hired')),
+        responded_applications=Count(
+            'applications',
+            filter=Q(applications__isnull=False) & ~Q(applications__status='pending'),
+        ),
+        recent_applications=Count(
+            'applications', filter=Q(applications__applied_at__gte=last_30_days)
+        ),
+    )
+
+    total = stats['total_applications']
+    responded = stats.pop('responded_applications')
+    stats['response_rate'] = round((responded / total * 100) if total > 0 else 0, 1)
+    return stats
+
+
+def application_status_stats(applications):
+    """Total and per-status counts of an application queryset, in one query."""
+    return applications.order_by().aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        shortlisted=Count('id', filter=Q(status='shortlisted')),
+        interviewed=Count('id', filter=Q(status='interviewed')),
+        hired=Count('id', filter=Q(status='hired')),
+        rejected=Count('id', filter=Q(status='rejected')),
+    )
+
+
+def recent_applications_by_job(job_ids, per_job=3):
+    """
+    Map each job id to its ``per_job`` newest applications.
+
+    Uses one ROW_NUMBER() OVER (PARTITION BY job_id ...) query; databases
+    without window functions (SQLite before 3.25) get one small query per job.
+    """
+    applications = JobApplication.objects.filter(job_id__in=job_ids).select_related('student')
+    if connection.features.supports_over_clause:
+        rows = applications.annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('job_id'),
+                order_by=[F('applied_at').desc(), F('id').desc()],
+            )
+        ).filter(row_number__lte=per_job).order_by('job_id', 'row_number')
+    else:
+        rows = chain.from_iterable(
+            applications.filter(job_id=job_id).order_by('-applied_at', '-id')[:per_job]
+            for job_id in job_ids
+        )
+
+    recent = defaultdict(list)
+    for application in rows:
+        recent[application.job_id].append(application)
+    return recent
@@ -1,3 +1,241 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from io import BytesIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from jobs.models import Job, JobApplication
+from students import media_tasks
+from students.models import MediaTask, StudentProfile
+from .models import Company
+from .stats import dashboard_stats, recent_applications_by_job
+
+
+class CompanyTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='acme', password='pass12345')
+        self.company = Company.objects.create(user=self.user, company_name='Acme Corp')
+        self.students = 0
+
+    def make_job(self, **fields):
+        defaults = {
+            'title': 'Backend Developer',
+            'description': 'Build APIs.',
+            'location': 'Pune',
+            'deadline': timezone.now().date() + timedelta(days=30),
+            'is_active': True,
+        }
+        defaults.update(fields)
+        return Job.objects.create(company=self.company, **defaults)
+
+    def apply(self, job, status='pending'):
+        self.students += 1
+        student = User.objects.create_user(username=f'student{self.students}')
+        return JobApplication.objects.create(
+            student=student, job=job, cover_letter='Hire me please.',
+            resume='applications/resumes/cv.pdf', status=status,
+        )
+
+
+class DashboardStatsTests(CompanyTestCase):
+    def test_matches_individual_counts(self):
+        job = self.make_job()
+        self.make_job(is_active=False)
+        self.make_job()  # no applications: must not disturb the join counts
+        for status in ['pending', 'pending', 'shortlisted', 'interviewed', 'hired', 'rejected']:
+            self.apply(job, status)
+        old = self.apply(job)
+        JobApplication.objects.filter(pk=old.pk).update(applied_at=timezone.now() - timedelta(days=45))
+
+        stats = dashboard_stats(self.company)
+
+        self.assertEqual(stats, {
+            'total_jobs': 3,
+            'active_jobs': 2,
+            'total_applications': 7,
+            'interviews_scheduled': 2,
+            'positions_filled': 1,
+            'recent_applications': 6,
+            'response_rate': round(4 / 7 * 100, 1),
+        })
+
+    def test_empty_company(self):
+        stats = dashboard_stats(self.company)
+        self.assertEqual(stats['total_applications'], 0)
+        self.assertEqual(stats['response_rate'], 0)
+
+    def test_dashboard_query_count_is_independent_of_data_size(self):
+        self.client.force_login(self.user)
+        url = reverse('companies:company_dashboard')
+        job = self.make_job()
+        self.apply(job)
+
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        for _ in range(3):
+            extra_job = self.make_job()
+            for status in ['pending', 'shortlisted', 'hired', 'rejected']:
+                self.apply(extra_job, status)
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+        self.assertEqual(response.context['total_applications'], 13)
+        self.assertEqual(len(large), len(small))
+
+
+class ApplicationStatisticsTests(CompanyTestCase):
+    def test_monthly_and_status_counts(self):
+        job = self.make_job()
+        for status in ['pending', 'pending', 'hired']:
+            self.apply(job, status)
+        self.client.force_login(self.user)
+
+        data = self.client.get(reverse('companies:get_application_statistics')).json()
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['monthly_stats'], [{'month': timezone.localtime().month, 'count': 3}])
+        self.assertEqual(sorted((row['status'], row['count']) for row in data['status_stats']),
+                         [('hired', 1), ('pending', 2)])
+
+
+class ViewApplicationsTests(CompanyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse('companies:view_applications')
+        self.job = self.make_job()
+
+    def test_paginates_in_the_database_with_fixed_query_count(self):
+        for status in ['pending', 'shortlisted', 'hired']:
+            self.apply(self.job, status)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+
+        for status in ['pending', 'rejected', 'interviewed'] * 5:
+            self.apply(self.job, status)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(len(response.context['applications']), 8)
+        self.assertEqual(response.context['total_applications'], 18)
+        self.assertEqual(response.context['pending_applications'], 6)
+        self.assertEqual(response.context['interviewed_applications'], 5)
+
+    def test_read_path_does_not_create_profiles(self):
+        self.apply(self.job)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(StudentProfile.objects.exists())
+        self.assertEqual(response.context['applications'][0].skills_list, [])
+
+    def test_sort_by_match_ranks_best_fit_first(self):
+        self.job.required_skills = 'Python, Django'
+        self.job.save()
+        weak = self.apply(self.job)
+        strong = self.apply(self.job)
+        StudentProfile.objects.create(user=weak.student, skills='Excel')
+        StudentProfile.objects.create(user=strong.student, skills='python, django')
+
+        response = self.client.get(self.url, {'sort': 'match'})
+        applications = list(response.context['applications'])
+        self.assertEqual([app.pk for app in applications], [strong.pk, weak.pk])
+        self.assertGreater(applications[0].match_score, applications[1].match_score)
+        self.assertContains(response, f'{applications[0].match_score}% match')
+
+
+class ManageJobsTests(CompanyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse('companies:manage_jobs')
+
+    def test_recent_applications_are_newest_three_per_job(self):
+        first, second = self.make_job(), self.make_job(title='Frontend Developer')
+        first_apps = [self.apply(first) for _ in range(5)]
+        second_apps = [self.apply(second) for _ in range(2)]
+
+        recent = recent_applications_by_job([first.id, second.id], per_job=3)
+
+        self.assertEqual(recent[first.id], first_apps[:1:-1])
+        self.assertEqual(recent[second.id], second_apps[::-1])
+
+    def test_query_count_does_not_grow_with_jobs(self):
+        job = self.make_job()
+        self.apply(job)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+
+        for i in range(14):
+            job = self.make_job(title=f'Job {i}', is_active=i % 2 == 0)
+            self.apply(job)
+            self.apply(job)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(len(response.context['job_stats']), 10)
+        self.assertEqual(response.context['total_jobs'], 15)
+        self.assertEqual(response.context['inactive_jobs'], 7)
+        self.assertEqual(response.context['total_applications'], 29)
+
+
+class LogoRenditionTests(CompanyTestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.client.force_login(self.user)
+
+    def upload(self, size=(300, 300)):
+        output = BytesIO()
+        Image.new('RGBA', size, (20, 90, 160, 255)).save(output, format='PNG')
+        self.client.post(reverse('companies:upload_company_logo'),
+                         {'logo': SimpleUploadedFile('acme.png', output.getvalue())})
+        self.company.refresh_from_db()
+        return self.company.logo.name
+
+    def files(self, name):
+        directory, _ = os.path.split(name)
+        return sorted(default_storage.listdir(directory)[1])
+
+    def test_uploaded_logo_gets_renditions_from_the_worker(self):
+        name = self.upload()
+        self.assertEqual(self.company.renditions, {})
+        self.assertEqual(MediaTask.objects.get().kind, 'company_logo')
+
+        media_tasks.process_tasks()
+        self.company.refresh_from_db()
+        stem = os.path.splitext(os.path.basename(name))[0]
+        self.assertEqual(list(self.company.renditions), ['48', '128'])
+        self.assertEqual(self.company.renditions['48']['webp'], f'/media/{os.path.splitext(name)[0]}.48.webp')
+        self.assertEqual(self.files(name), sorted([f'{stem}.png', f'{stem}.48.webp', f'{stem}.48.jpg',
+                                                   f'{stem}.128.webp', f'{stem}.128.jpg']))
+
+        self.apply(self.make_job())
+        response = self.client.get(reverse('jobs:job_list'))
+        self.assertContains(response, f'{stem}.128.webp')
+
+    def test_replacing_or_removing_the_logo_drops_its_renditions(self):
+        self.upload()
+        media_tasks.process_tasks()
+        second = self.upload()
+        self.assertEqual(self.company.renditions, {})
+        self.assertEqual(self.files(second), [os.path.basename(second)])
+
+        media_tasks.process_tasks()
+        self.client.post(reverse('companies:delete_company_logo'))
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.renditions, {})
+        self.assertEqual(self.files(second), [])
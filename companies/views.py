@@ -8,15 +8,21 @@ from django.http import JsonResponse
 from django.utils import timezone
 
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Sum
+from django.db.models.functions import Coalesce, ExtractMonth
 import os
 from datetime import timedelta
 import json
 from django.views.decorators.http import require_POST
 
 from jobs.models import Job, JobApplication  # From jobs app
+from jobs.matching import rank_applications
+from jobs.skills import skill_key
+from jobportal.renditions import delete_local_renditions
 from .models import Company               # Local companies app
+from .stats import application_status_stats, dashboard_stats, recent_applications_by_job
 from students.models import StudentProfile  # Import StudentProfile model
+from students.media_tasks import enqueue_company_logo
 from django.views.decorators.http import require_http_methods
 
 
@@ -189,10 +195,14 @@ def upload_company_logo(request):
             if company.logo:
                 if os.path.isfile(company.logo.path):
                     os.remove(company.logo.path)
+                delete_local_renditions(company.logo.name)
             
             # Save new logo
             company.logo = request.FILES['logo']
+            company.renditions = {}
             company.save()
+            # ✅ Resized WebP/JPEG copies are made by the media worker
+            enqueue_company_logo(company)
             
             messages.success(request, 'Company logo updated successfully!')
         else:
@@ -283,9 +293,11 @@ def delete_company_logo(request):
             # Delete file from filesystem
             if os.path.isfile(company.logo.path):
                 os.remove(company.logo.path)
+            delete_local_renditions(company.logo.name)
             
             # Remove from database
             company.logo = None
+            company.renditions = {}
             company.save()
             
             return JsonResponse({
@@ -314,7 +326,7 @@ def manage_jobs(request):
     """Enhanced job management with activate/deactivate/delete functionality"""
     try:
         company = Company.objects.get(user=request.user)
-        jobs = Job.objects.filter(company=company).order_by('-created_at')
+        jobs = Job.objects.filter(company=company).order_by('-created_at', '-id')
         
         # Handle job actions (activate/deactivate/delete)
         if request.method == 'POST':
@@ -340,24 +352,38 @@ def manage_jobs(request):
 
             return redirect('companies:manage_jobs')
         
-        # Get statistics for each job
-        job_stats = []
-        for job in jobs:
-            applications_count = JobApplication.objects.filter(job=job).count()
-            recent_applications = JobApplication.objects.filter(job=job).order_by('-applied_at')[:3]
-            job_stats.append({
+        # Totals across all of the company's jobs in one query; the
+        # per-job application count is a maintained column on Job.
+        totals = jobs.aggregate(
+            total_jobs=Count('id'),
+            active_jobs=Count('id', filter=Q(is_active=True)),
+            total_applications=Coalesce(Sum('applications_count'), 0),
+        )
+        
+        paginator = Paginator(jobs, 10)
+        paginator.count = totals['total_jobs']
+        page_obj = paginator.get_page(request.GET.get('page'))
+        
+        # Latest three applications for every job on this page, in one query
+        recent = recent_applications_by_job([job.id for job in page_obj], per_job=3)
+        job_stats = [
+            {
                 'job': job,
-                'applications_count': applications_count,
-                'recent_applications': recent_applications,
-            })
+                'applications_count': job.applications_count,
+                'recent_applications': recent.get(job.id, []),
+            }
+            for job in page_obj
+        ]
         
         context = {
             'company': company,
             'job_stats': job_stats,
-            'total_jobs': jobs.count(),
-            'active_jobs': jobs.filter(is_active=True).count(),
-            'inactive_jobs': jobs.filter(is_active=False).count(),
-            'total_applications': sum(stat['applications_count'] for stat in job_stats),
+            'total_jobs': totals['total_jobs'],
+            'active_jobs': totals['active_jobs'],
+            'inactive_jobs': totals['total_jobs'] - totals['active_jobs'],
+            'total_applications': totals['total_applications'],
+            'is_paginated': page_obj.has_other_pages(),
+            'page_obj': page_obj,
         }
         return render(request, 'companies/manage_jobs.html', context)
         
@@ -423,29 +449,10 @@ def company_dashboard(request):
         
         # Get current date for calculations
         now = timezone.now()
-        last_30_days = now - timedelta(days=30)
         last_7_days = now - timedelta(days=7)
         
-        # === RECRUITMENT STATISTICS ===
-        total_jobs = Job.objects.filter(company=company).count()
-        total_applications = JobApplication.objects.filter(job__company=company).count()
-        
-        interviews_scheduled = JobApplication.objects.filter(
-            job__company=company,
-            status__in=['interviewed', 'shortlisted']
-        ).count()
-        
-        positions_filled = JobApplication.objects.filter(
-            job__company=company,
-            status='hired'
-        ).count()
-        
-        active_jobs = Job.objects.filter(company=company, is_active=True).count()
-        
-        recent_applications = JobApplication.objects.filter(
-            job__company=company,
-            applied_at__gte=last_30_days
-        ).count()
+        # === RECRUITMENT STATISTICS (single aggregate query) ===
+        stats = dashboard_stats(company, now=now)
         
         # === RECENT ACTIVITIES ===
         recent_activities = []
@@ -470,26 +477,18 @@ def company_dashboard(request):
         recent_activities.sort(key=lambda x: x['time'], reverse=True)
         recent_activities = recent_activities[:8]
         
-        # Additional metrics
-        total_apps = JobApplication.objects.filter(job__company=company).count()
-        responded_apps = JobApplication.objects.filter(
-            job__company=company
-        ).exclude(status='pending').count()
-        
-        response_rate = round((responded_apps / total_apps * 100) if total_apps > 0 else 0, 1)
-        
         context = {
             'company': company,
             'user': request.user,
             
             # Recruitment Statistics
-            'total_jobs': total_jobs,
-            'total_applications': total_applications,
-            'interviews_scheduled': interviews_scheduled,
-            'positions_filled': positions_filled,
-            'active_jobs': active_jobs,
-            'recent_applications': recent_applications,
-            'response_rate': response_rate,
+            'total_jobs': stats['total_jobs'],
+            'total_applications': stats['total_applications'],
+            'interviews_scheduled': stats['interviews_scheduled'],
+            'positions_filled': stats['positions_filled'],
+            'active_jobs': stats['active_jobs'],
+            'recent_applications': stats['recent_applications'],
+            'response_rate': stats['response_rate'],
             
             # Recent Activities
             'recent_activities': recent_activities,
@@ -505,20 +504,22 @@ def company_dashboard(request):
 def view_applications(request):
     """
     List + filter + paginate applications.  
-    Each application gets a .skills_list attribute so the template never
-    needs a custom filter.
+    Each application on the current page gets a .skills_list attribute so the
+    template never needs a custom filter.
     """
     company = get_object_or_404(Company, user=request.user)
 
     qs = JobApplication.objects.filter(job__company=company) \
-                               .select_related("job", "student") \
-                               .prefetch_related("student__studentprofile") \
-                               .order_by("-applied_at")
+                               .select_related("job", "student", "student__studentprofile") \
+                               .prefetch_related("student__studentprofile__normalized_skills") \
+                               .order_by("-applied_at", "-id")
 
     # ── filters ───────────────────────────────────────────────────────────
     job_filter    = request.GET.get("job_filter", "all")
     status_filter = request.GET.get("status_filter", "all")
+    skill_filter  = request.GET.get("skill", "").strip()
     search        = request.GET.get("search", "").strip()
+    sort          = request.GET.get("sort", "recent")
 
     if job_filter != "all":
         qs = qs.filter(job_id=job_filter)
@@ -526,6 +527,9 @@ def view_applications(request):
     if status_filter != "all":
         qs = qs.filter(status=status_filter)
 
+    if skill_filter:
+        qs = qs.filter(student__studentprofile__skill_links__skill__slug=skill_key(skill_filter))
+
     if search:
         qs = qs.filter(
             Q(student__first_name__icontains=search)  |
@@ -534,41 +538,49 @@ def view_applications(request):
             Q(job__title__icontains=search)
         )
 
-    # ── enrich objects ───────────────────────────────────────────────────
-    apps = []
-    for app in qs:
-        # guarantee profile object
-        profile, _ = StudentProfile.objects.get_or_create(user=app.student)
-        app.student.studentprofile = profile
-
-        app.skills_list = [s.strip() for s in (profile.skills or "").split(",") if s.strip()]
-        apps.append(app)
-
-    # ── pagination ───────────────────────────────────────────────────────
-    paginator  = Paginator(apps, 8)
-    page_obj   = paginator.get_page(request.GET.get("page"))
-
-    # ── quick stats ───────────────────────────────────────────────────────
-    stats = {
-        'total':        qs.count(),
-        'pending':      qs.filter(status="pending").count(),
-        'shortlisted':  qs.filter(status="shortlisted").count(),
-        'hired':        qs.filter(status="hired").count(),
-        'rejected':     qs.filter(status="rejected").count(),
-    }
+    # ── quick stats (one aggregate query) ─────────────────────────────────
+    stats = application_status_stats(qs)
+
+    # ── pagination (LIMIT/OFFSET in the database) ────────────────────────
+    # sort=match ranks every filtered application by fit in one batch, then
+    # loads only the rows of the requested page.
+    match_scores = {}
+    if sort == "match":
+        ranked     = rank_applications(qs)
+        paginator  = Paginator(ranked, 8)
+        page_obj   = paginator.get_page(request.GET.get("page"))
+        match_scores = dict(page_obj.object_list)
+        rows       = qs.in_bulk(list(match_scores))
+        page_obj.object_list = [rows[app_id] for app_id in match_scores if app_id in rows]
+    else:
+        paginator  = Paginator(qs, 8)
+        paginator.count = stats['total']  # already counted above; skip a second COUNT(*)
+        page_obj   = paginator.get_page(request.GET.get("page"))
+
+    # ── enrich only the rows on this page ────────────────────────────────
+    for app in page_obj:
+        if app.id in match_scores:
+            app.match_score = round(match_scores[app.id] * 100)
+        # Student profiles are created at registration; an applicant without
+        # one simply shows no profile details.
+        profile = getattr(app.student, "studentprofile", None)
+        app.skills_list = [skill.name for skill in profile.normalized_skills.all()] if profile else []
 
     context = dict(
         company           = company,
         applications      = page_obj,
-        company_jobs      = Job.objects.filter(company=company).order_by("-created_at"),
+        company_jobs      = Job.objects.filter(company=company).only("id", "title").order_by("-created_at"),
         total_applications= stats['total'],
         pending_applications     = stats['pending'],
         shortlisted_applications = stats['shortlisted'],
+        interviewed_applications = stats['interviewed'],
         hired_applications       = stats['hired'],
         rejected_applications    = stats['rejected'],
         job_filter        = job_filter,
         status_filter     = status_filter,
         search_filter     = search,
+        skill_filter      = skill_filter,
+        sort              = sort,
         is_paginated      = page_obj.has_other_pages(),
         page_obj          = page_obj,
     )
@@ -787,11 +799,12 @@ def get_application_statistics(request):
         company = Company.objects.get(user=request.user)
         
         # Monthly application trends
+        # ✅ FIXED: ExtractMonth instead of raw EXTRACT(), which SQLite lacks
         monthly_stats = JobApplication.objects.filter(
             job__company=company,
             applied_at__gte=timezone.now() - timedelta(days=365)
-        ).extra(
-            select={'month': 'EXTRACT(month FROM applied_at)'}
+        ).annotate(
+            month=ExtractMonth('applied_at')
         ).values('month').annotate(
             count=Count('id')
         ).order_by('month')
@@ -0,0 +1,11 @@
+#!/bin/sh
+# Start command of the Render web service. Render gives every service its own
+# disk and the media worker needs the web's MEDIA_ROOT, so the worker runs
+# here, restarted whenever it crashes; it stops with the service.
+(
+    until python manage.py process_media_tasks; do
+        echo "process_media_tasks exited with status $?, restarting in 5s" >&2
+        sleep 5
+    done
+) &
+exec gunicorn jobportal.wsgi:application
@@ -0,0 +1,27 @@
+"""
+Gunicorn settings, loaded automatically from the working directory.
+
+Sets up the shared directory prometheus_client's multiprocess mode needs, so
+/metrics reports totals across all workers (see jobportal/metrics.py).
+"""
+import os
+import shutil
+import tempfile
+
+# Workers inherit this; it must be set before they import prometheus_client.
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'jobportal-prometheus')
+)
+
+
+def on_starting(server):
+    # Samples from a previous run would be added to this one's totals.
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
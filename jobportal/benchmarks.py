@@ -0,0 +1,189 @@
+"""
+View benchmarks: query-count budgets (and optional latency budgets) on
+growing datasets.
+
+    python manage.py benchmark_views
+
+(or ``manage.py test jobportal.benchmarks``). Not part of the default test run (the module isn't named ``test*.py``). Each
+view in ``VIEWS`` is requested through the test client on every dataset in
+``TIERS`` (seeded with jobs/seeding.py, then rolled back), recording the
+median wall time, the number of queries and the bytes rendered. The run
+fails when
+
+* a view's query count differs between tiers, i.e. grows with the data, or
+* a view makes more queries than ``benchmark_baseline.json`` records.
+
+Query counts are the same on every machine, so they are the gate. Timings
+depend on the hardware: they are reported, and only checked against a
+baseline recorded on the same machine when one is given.
+
+Environment variables:
+
+``BENCHMARK_UPDATE_BASELINE=1``
+    Write this run's numbers to the baseline(s) instead of checking them.
+``BENCHMARK_LATENCY_BASELINE``
+    Path of a machine-local latency baseline (not committed) to check the
+    timings against, or to write with ``BENCHMARK_UPDATE_BASELINE``.
+``BENCHMARK_TOLERANCE``
+    Allowed slowdown over the latency baseline as a fraction (default 1.0).
+``BENCHMARK_REPORT``
+    Also write the results as JSON to this path.
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import OutputWrapper
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobportal import cache
+from jobs.seeding import seed_portal
+
+BASELINE_PATH = Path(__file__).with_name('benchmark_baseline.json')
+REPEATS = 5
+# Absolute slack on top of the relative tolerance; single-digit millisecond
+# timings are mostly noise.
+NOISE_MS = 5.0
+
+TIERS = [
+    ('small', dict(companies=4, jobs=40, students=30, applications=300)),
+    ('medium', dict(companies=4, jobs=160, students=120, applications=1200)),
+    ('large', dict(companies=4, jobs=640, students=480, applications=4800)),
+]
+
+# name -> (who is logged in, how to build the URL from the tier's fixtures)
+VIEWS = {
+    'job_list': (None, lambda f: reverse('jobs:job_list')),
+    'job_search': (None, lambda f: reverse('jobs:job_search') + '?q=developer'),
+    'job_detail': (None, lambda f: reverse('jobs:job_detail', args=[f['job'].pk])),
+    'company_dashboard': ('company', lambda f: reverse('companies:company_dashboard')),
+    'manage_jobs': ('company', lambda f: reverse('companies:manage_jobs')),
+    'view_applications': ('company', lambda f: reverse('companies:view_applications')),
+    'get_application_statistics': ('company', lambda f: reverse('companies:get_application_statistics')),
+    'student_applications': ('student', lambda f: reverse('students:student_applications')),
+}
+
+
+def _load_baseline(path):
+    path = Path(path)
+    if path.exists():
+        return json.loads(path.read_text())
+    return {}
+
+
+def _write_baseline(path, results, key):
+    baseline = {view: {name: numbers[key] for name, numbers in tiers.items()}
+                for view, tiers in results.items()}
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+
+
+class ViewBenchmarks(TestCase):
+    # Where the results table goes; `manage.py benchmark_views` sets its own stdout.
+    stdout = OutputWrapper(sys.stdout)
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def measure(self, user, url):
+        """Median wall time (ms), query count and response size of ``GET url``."""
+        self.client.logout()
+        if user:
+            self.client.force_login(user)
+        timings = []
+        for _ in range(REPEATS):
+            # Measure the uncached path; a cache hit says nothing about the view.
+            cache.get_cache().clear()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = self.client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.assertEqual(response.status_code, 200, f"GET {url}")
+        return {
+            'ms': round(statistics.median(timings), 2),
+            'queries': len(queries),
+            'bytes': len(response.content),
+        }
+
+    def run_tier(self, name, sizes):
+        results = {}
+        with transaction.atomic():
+            seed_portal(seed=0, prefix=f'bench_{name}', **sizes)
+            company_user = User.objects.get(username=f'bench_{name}_company_0')
+            fixtures = {
+                'company': company_user,
+                'student': User.objects.get(username=f'bench_{name}_student_0'),
+                'job': company_user.company.jobs.order_by('pk').first(),
+            }
+            for view, (role, url) in VIEWS.items():
+                results[view] = self.measure(fixtures.get(role), url(fixtures))
+            transaction.set_rollback(True)
+        return results
+
+    def test_view_budgets(self):
+        results = {view: {} for view in VIEWS}
+        for name, sizes in TIERS:
+            for view, numbers in self.run_tier(name, sizes).items():
+                results[view][name] = numbers
+        self.report(results)
+
+        failures = []
+        for view, tiers in results.items():
+            counts = {name: numbers['queries'] for name, numbers in tiers.items()}
+            if len(set(counts.values())) > 1:
+                failures.append(f"{view}: query count grows with data size {counts}")
+
+        latency_path = os.environ.get('BENCHMARK_LATENCY_BASELINE')
+        if os.environ.get('BENCHMARK_UPDATE_BASELINE'):
+            _write_baseline(BASELINE_PATH, results, 'queries')
+            if latency_path:
+                _write_baseline(latency_path, results, 'ms')
+        else:
+            failures += self.compare_queries(results, _load_baseline(BASELINE_PATH))
+            if latency_path:
+                failures += self.compare_latency(results, _load_baseline(latency_path))
+
+        if failures:
+            self.fail("\n".join(failures))
+
+    def compare_queries(self, results, baseline):
+        failures = []
+        for view, tiers in results.items():
+            for name, numbers in tiers.items():
+                expected = baseline.get(view, {}).get(name)
+                if expected is not None and numbers['queries'] > expected:
+                    failures.append(f"{view} [{name}]: {numbers['queries']} queries, baseline {expected}")
+        return failures
+
+    def compare_latency(self, results, baseline):
+        tolerance = float(os.environ.get('BENCHMARK_TOLERANCE', 1.0))
+        failures = []
+        for view, tiers in results.items():
+            for name, numbers in tiers.items():
+                expected = baseline.get(view, {}).get(name)
+                if expected is None:
+                    continue
+                budget = expected * (1 + tolerance) + NOISE_MS
+                if numbers['ms'] > budget:
+                    failures.append(f"{view} [{name}]: {numbers['ms']:.1f} ms, "
+                                    f"budget {budget:.1f} ms (baseline {expected:.1f} ms)")
+        return failures
+
+    def report(self, results):
+        lines = [f"\n{'view':<28}{'tier':<8}{'ms':>10}{'queries':>9}{'bytes':>10}"]
+        for view, tiers in results.items():
+            for name, numbers in tiers.items():
+                lines.append(f"{view:<28}{name:<8}{numbers['ms']:>10.1f}"
+                             f"{numbers['queries']:>9}{numbers['bytes']:>10}")
+        self.stdout.write("\n".join(lines))
+        if os.environ.get('BENCHMARK_REPORT'):
+            Path(os.environ['BENCHMARK_REPORT']).write_text(json.dumps(results, indent=2))
@@ -0,0 +1,217 @@
+"""
+Keyed caching with namespace invalidation.
+
+Cached values are grouped into namespaces ("jobs", "companies",
+"applications"). Every key embeds its namespace's current version, so
+invalidating a namespace is one counter bump: old entries are never read
+again and simply age out. The signal receivers in ``jobs/signals.py`` bump
+the namespaces when jobs, companies or applications are saved or deleted.
+
+    latest = cached_queryset('jobs', ['main', 'latest'], Job.objects.filter(...)[:5])
+
+Whole pages can be cached for anonymous visitors with
+``@cache_anonymous_page(JOBS)``; the page key includes the "listing version"
+(the JOBS namespace), which moves whenever a job is posted, edited, toggled or
+deleted.
+
+The backend comes from ``settings.CACHES`` (see ``CACHE_URL``), so the same
+code runs on local memory, files or Redis.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.messages.storage.session import SessionStorage
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from jobportal import metrics
+
+CACHE_ALIAS = 'default'
+
+JOBS = 'jobs'
+COMPANIES = 'companies'
+APPLICATIONS = 'applications'
+
+_MISSING = object()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f'ns:{namespace}:version'
+
+
+def namespace_version(namespace):
+    """Current version of ``namespace``, creating it on first use."""
+    cache = get_cache()
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a version lost to eviction or a restart
+        # never comes back as a number old entries were stored under.
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def _bump(namespaces):
+    cache = get_cache()
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            # Not created yet (or evicted): a fresh clock-seeded version
+            # is newer than anything stored before.
+            namespace_version(namespace)
+
+
+def bump_namespace(*namespaces):
+    """
+    Invalidate everything cached under the given namespaces once the
+    current transaction commits (straight away outside one). Bumping
+    earlier would let a concurrent reader cache the pre-commit rows under
+    the new version.
+    """
+    transaction.on_commit(lambda: _bump(namespaces))
+
+
+def make_key(namespace, parts):
+    """Build the versioned cache key for ``parts`` (any reprs) in ``namespace``."""
+    digest = hashlib.md5(repr(tuple(parts)).encode(), usedforsecurity=False).hexdigest()
+    return f'{namespace}:{namespace_version(namespace)}:{digest}'
+
+
+def cached(namespace, parts, compute, timeout=None):
+    """
+    Return the cached value for ``parts``, calling ``compute()`` and storing
+    its result on a miss. ``timeout=None`` uses the backend's CACHE_TIMEOUT.
+    """
+    cache = get_cache()
+    key = make_key(namespace, parts)
+    value = cache.get(key, _MISSING)
+    metrics.record_cache('value', hit=value is not _MISSING)
+    if value is _MISSING:
+        value = compute()
+        if timeout is None:
+            cache.set(key, value)
+        else:
+            cache.set(key, value, timeout)
+    return value
+
+
+def cached_queryset(namespace, parts, queryset, timeout=None):
+    """Evaluate ``queryset`` into a list once and serve it from the cache."""
+    # .all() so a queryset object reused across calls is re-run, not read
+    # back from its own result cache.
+    return cached(namespace, parts, lambda: list(queryset.all()), timeout)
+
+
+def listing_version():
+    """Version of the public job listings; bumped on every job write."""
+    return namespace_version(JOBS)
+
+
+def _has_pending_messages(request):
+    if request.COOKIES.get(CookieStorage.cookie_name):
+        return True
+    session = getattr(request, 'session', None)
+    return session is not None and SessionStorage.session_key in session
+
+
+def _is_cacheable_request(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        and not _has_pending_messages(request)
+    )
+
+
+def _is_cacheable_response(request, response):
+    # A page that used {% csrf_token %} carries a token tied to this
+    # visitor's cookie, and one that sets cookies is per-visitor too.
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def cache_anonymous_page(*namespaces, timeout=None):
+    """
+    Cache a view's whole response for anonymous GET/HEAD requests.
+
+    The key covers the view, the path, every query parameter and the current
+    version of each namespace, so bumping a namespace retires the page.
+    Logged-in users, visitors with pending flash messages, and responses
+    that set cookies or embed a CSRF token always go to the view. Responses
+    carry ``X-Cache: HIT`` or ``MISS``.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+
+            cache = get_cache()
+            key = make_key(namespaces[0], [
+                'page', view_func.__module__, view_func.__qualname__, request.path,
+                sorted(request.GET.lists()), [namespace_version(ns) for ns in namespaces[1:]],
+            ])
+            response = cache.get(key)
+            metrics.record_cache('page', hit=response is not None)
+            if response is not None:
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if _is_cacheable_response(request, response):
+                if timeout is None:
+                    cache.set(key, response)
+                else:
+                    cache.set(key, response, timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_page(validators):
+    """
+    Answer conditional GETs (If-None-Match / If-Modified-Since) with a 304
+    before the view runs.
+
+    ``validators(request, *args, **kwargs)`` returns ``(etag, last_modified)``
+    and should be cheap: a version number or a one-column lookup, never the
+    full object. Returning ``(None, None)`` skips the check, e.g. for pages
+    that differ per user.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            etag, last_modified = validators(request, *args, **kwargs)
+            if etag is None and last_modified is None:
+                return view_func(request, *args, **kwargs)
+
+            etag = quote_etag(etag) if etag else None
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+                if timestamp is not None:
+                    response.headers.setdefault('Last-Modified', http_date(timestamp))
+            return response
+        return wrapper
+    return decorator
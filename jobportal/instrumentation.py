@@ -0,0 +1,159 @@
+"""
+Per-request instrumentation: query counts, SQL and template time, response
+size and latency, aggregated per URL name.
+
+``InstrumentationMiddleware`` (jobportal/middleware.py) opens a
+``RequestRecord`` for each request; a database execute wrapper and the
+template backend (``TimedDjangoTemplates``) add to it while the view runs. Finished records are
+folded into ``stats``, which staff can read at ``/instrumentation/``.
+
+Turned on with ``INSTRUMENTATION_ENABLED``. When it is off the middleware
+removes itself at startup; with no record open, templates render as usual
+after one context-variable lookup.
+Aggregates are kept per process: with several workers each one reports the
+requests it served.
+"""
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, reraise
+from django.template.backends.django import Template as DjangoTemplate
+from django.views.decorators.http import require_http_methods
+
+_current = ContextVar('instrumentation_record', default=None)
+
+_NUMBER_RE = re.compile(r"\b\d+\b|'[^']*'")
+
+
+class RequestRecord:
+    """What one request spent, filled in while it runs."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.statements = Counter()
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _current.reset(self._token)
+
+    @property
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def duplicates(self, threshold):
+        """Statements run at least ``threshold`` times, most repeated first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper: time each statement into the current record."""
+    record = _current.get()
+    if record is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record.sql_ms += (time.perf_counter() - started) * 1000
+        record.queries += 1
+        # Literals inlined into the SQL would hide repeats, so fold them.
+        record.statements[_NUMBER_RE.sub('?', sql)] += 1
+
+
+class TimedTemplate(DjangoTemplate):
+    """A template that adds its render time to the current record, if any."""
+
+    def render(self, context=None, request=None):
+        record = _current.get()
+        if record is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record.template_ms += (time.perf_counter() - started) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend (the TEMPLATES ``BACKEND``), timing top-level
+    renders only: includes render through the engine, so aren't counted twice.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class RequestStats:
+    """Thread-safe running totals per URL name."""
+
+    FIELDS = ('requests', 'flagged', 'queries', 'max_queries', 'sql_ms',
+              'template_ms', 'bytes', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def add(self, name, record, size, flagged):
+        elapsed = record.elapsed_ms
+        with self._lock:
+            row = self._views.setdefault(name, dict.fromkeys(self.FIELDS, 0))
+            row['requests'] += 1
+            row['flagged'] += flagged
+            row['queries'] += record.queries
+            row['max_queries'] = max(row['max_queries'], record.queries)
+            row['sql_ms'] += record.sql_ms
+            row['template_ms'] += record.template_ms
+            row['bytes'] += size
+            row['total_ms'] += elapsed
+            row['max_ms'] = max(row['max_ms'], elapsed)
+
+    def snapshot(self):
+        """Per-view totals and averages, slowest (by total time) first."""
+        with self._lock:
+            rows = [dict(row, view=name) for name, row in self._views.items()]
+        for row in rows:
+            count = row['requests']
+            row['avg_ms'] = round(row['total_ms'] / count, 2)
+            row['avg_queries'] = round(row['queries'] / count, 2)
+            row['avg_sql_ms'] = round(row['sql_ms'] / count, 2)
+            row['avg_template_ms'] = round(row['template_ms'] / count, 2)
+            row['avg_bytes'] = round(row['bytes'] / count)
+            for key in ('sql_ms', 'template_ms', 'total_ms', 'max_ms'):
+                row[key] = round(row[key], 2)
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+stats = RequestStats()
+
+
+@staff_member_required
+@require_http_methods(['GET', 'POST'])
+def instrumentation_view(request):
+    """Aggregated request timings for this worker; POST clears them."""
+    if request.method == 'POST':
+        stats.reset()
+        return JsonResponse({'success': True, 'message': 'Statistics cleared'})
+    return JsonResponse({'success': True, 'views': stats.snapshot()})
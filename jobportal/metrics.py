@@ -0,0 +1,124 @@
+"""
+Prometheus metrics, served at ``/metrics``.
+
+Requests (latency per view, responses per status code, database queries) are
+recorded by ``MetricsMiddleware`` in jobportal/middleware.py; cache hits and
+misses by jobportal/cache.py; profile picture uploads by
+students/supabase_storage.py.
+
+Under gunicorn every worker is its own process. When
+``PROMETHEUS_MULTIPROC_DIR`` is set (gunicorn.conf.py does this) each worker
+writes its samples to files in that directory and ``/metrics`` merges them,
+so scraping any worker returns totals for all of them.
+
+Labels only ever carry URL names, methods, status codes and fixed words, never
+paths or ids, so the number of series stays bounded.
+"""
+import hmac
+import os
+import time
+from contextlib import contextmanager
+
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    'jobportal_request_duration_seconds', 'Time spent handling a request.',
+    ['view', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSES = Counter(
+    'jobportal_responses', 'Responses sent, by status code.',
+    ['view', 'method', 'status'],
+)
+DB_QUERIES = Histogram(
+    'jobportal_db_queries_per_request', 'Database queries made by one request.',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250),
+)
+DB_QUERY_DURATION = Histogram(
+    'jobportal_db_query_duration_seconds', 'Time spent in database queries per request.',
+    ['view'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+CACHE_REQUESTS = Counter(
+    'jobportal_cache_requests', 'Cache lookups by jobportal/cache.py.',
+    ['kind', 'result'],
+)
+UPLOAD_BYTES = Counter(
+    'jobportal_upload_bytes', 'Bytes of uploaded files stored.',
+    ['backend'],
+)
+UPLOAD_DURATION = Histogram(
+    'jobportal_upload_duration_seconds', 'Time spent storing one uploaded file.',
+    ['backend', 'outcome'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+class QueryTimer:
+    """Database execute wrapper counting one request's queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def record_request(view, method, status, seconds, queries):
+    REQUEST_LATENCY.labels(view, method).observe(seconds)
+    RESPONSES.labels(view, method, str(status)).inc()
+    DB_QUERIES.labels(view).observe(queries.count)
+    DB_QUERY_DURATION.labels(view).observe(queries.seconds)
+
+
+def record_cache(kind, hit):
+    CACHE_REQUESTS.labels(kind, 'hit' if hit else 'miss').inc()
+
+
+@contextmanager
+def observe_upload(backend, size):
+    """Time the upload in the ``with`` block; ``size`` bytes count only if it succeeds."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        UPLOAD_DURATION.labels(backend, 'error').observe(time.perf_counter() - started)
+        raise
+    UPLOAD_DURATION.labels(backend, 'ok').observe(time.perf_counter() - started)
+    UPLOAD_BYTES.labels(backend).inc(size)
+
+
+def _registry():
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not path:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    return registry
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition; requires ``Authorization: Bearer <METRICS_TOKEN>``.
+    Without a token it is only served with DEBUG on.
+    """
+    from django.conf import settings
+
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -1,5 +1,16 @@
+import logging
+import time
+from contextlib import ExitStack
+
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+
+from jobportal import instrumentation, metrics, profiling, slow_queries
+
+logger = logging.getLogger('jobportal.instrumentation')
 
 class SecurityHeadersMiddleware(MiddlewareMixin):
     """Adds basic security response headers and optional CSP from env.
@@ -20,3 +31,127 @@ class SecurityHeadersMiddleware(MiddlewareMixin):
         if csp:
             response.setdefault('Content-Security-Policy', csp)
         return response
+
+
+class InstrumentationMiddleware:
+    """Records per-request query counts and timings (see jobportal/instrumentation.py).
+
+    - Off unless INSTRUMENTATION_ENABLED; then Django drops it at startup
+    - Logs requests over INSTRUMENTATION_MAX_QUERIES / INSTRUMENTATION_MAX_MS,
+      with any statement repeated INSTRUMENTATION_DUPLICATE_QUERIES times (N+1)
+    - Adds a Server-Timing header
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.max_queries = settings.INSTRUMENTATION_MAX_QUERIES
+        self.max_ms = settings.INSTRUMENTATION_MAX_MS
+        self.duplicate_threshold = settings.INSTRUMENTATION_DUPLICATE_QUERIES
+
+    def __call__(self, request):
+        with instrumentation.RequestRecord() as record, ExitStack() as wrappers:
+            for connection in connections.all():
+                wrappers.enter_context(connection.execute_wrapper(instrumentation.record_query))
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        name = match.view_name if match else '<unresolved>'
+        size = 0 if response.streaming else len(response.content)
+        duplicates = record.duplicates(self.duplicate_threshold)
+        flagged = record.queries > self.max_queries or record.elapsed_ms > self.max_ms or bool(duplicates)
+        if flagged:
+            self.log(request, name, record, duplicates)
+        instrumentation.stats.add(name, record, size, flagged)
+
+        response['Server-Timing'] = (
+            f'db;dur={record.sql_ms:.1f};desc="{record.queries} queries", '
+            f'tpl;dur={record.template_ms:.1f}, total;dur={record.elapsed_ms:.1f}'
+        )
+        return response
+
+    def log(self, request, name, record, duplicates):
+        lines = [
+            f"{request.method} {request.path} ({name}): {record.queries} queries, "
+            f"{record.sql_ms:.1f} ms SQL, {record.template_ms:.1f} ms templates, "
+            f"{record.elapsed_ms:.1f} ms total"
+        ]
+        lines += [f"  {count}x {sql}" for sql, count in duplicates[:5]]
+        logger.warning("\n".join(lines))
+
+
+class MetricsMiddleware:
+    """Feeds request latency, status codes and query counts to jobportal/metrics.py.
+
+    - Off when METRICS_ENABLED is False; then Django drops it at startup
+    - Keep it first in MIDDLEWARE so the latency covers the whole stack
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        queries = metrics.QueryTimer()
+        with ExitStack() as wrappers:
+            for connection in connections.all():
+                wrappers.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        metrics.record_request(
+            match.view_name if match else '<unresolved>', request.method,
+            response.status_code, time.perf_counter() - started, queries,
+        )
+        return response
+
+
+class SlowQueryMiddleware:
+    """Logs the request's statements slower than SLOW_QUERY_MS (see jobportal/slow_queries.py).
+
+    - Off when SLOW_QUERY_MS is 0; then Django drops it at startup
+    - SLOW_QUERY_EXPLAIN_RATE of the slow statements also get their plan logged
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'SLOW_QUERY_MS', 0):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        slow_queries.configure_logging()
+
+    def __call__(self, request):
+        recorder = slow_queries.SlowQueryRecorder(
+            request, settings.SLOW_QUERY_MS, settings.SLOW_QUERY_EXPLAIN_RATE,
+        )
+        with ExitStack() as wrappers:
+            for connection in connections.all():
+                wrappers.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
+
+
+class ProfilingMiddleware:
+    """Profiles a single request on ?__profile=cpu for staff (see jobportal/profiling.py).
+
+    - Must come after AuthenticationMiddleware; anyone else's flag is ignored
+    - Off when PROFILING_ENABLED is False; then Django drops it at startup
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.GET.get(profiling.PROFILE_PARAM)
+        if mode not in profiling.MODES or not request.user.is_staff:
+            return self.get_response(request)
+
+        with profiling.RequestProfiler(mode) as profiler, ExitStack() as wrappers:
+            for connection in connections.all():
+                wrappers.enter_context(connection.execute_wrapper(profiler.timeline))
+            response = self.get_response(request)
+        meta = profiler.save(request, response)
+
+        if request.GET.get(profiling.OUTPUT_PARAM) == 'text':
+            response = HttpResponse(profiling.text_report(meta), content_type='text/plain; charset=utf-8')
+        response['X-Profile-Id'] = meta['id']
+        return response
@@ -0,0 +1,196 @@
+"""
+On-demand profiling of single requests.
+
+A staff user adds ``?__profile=cpu`` to any URL and ``ProfilingMiddleware``
+(jobportal/middleware.py) runs that one request under cProfile, recording
+every SQL statement on a timeline as well. ``?__profile=sample`` uses
+pyinstrument's sampling profiler instead, when it is installed. The artifact
+(``<id>.prof`` pstats data or ``<id>.txt`` sampling report, plus ``<id>.json``
+with the request details and SQL timeline) goes to ``PROFILE_DIR``, which
+keeps only the newest ``PROFILE_KEEP`` profiles. The response carries
+``X-Profile-Id``; add ``__profile_output=text`` to get the report back instead
+of the page.
+
+``manage.py request_profiles list`` / ``export <id>`` reads them back, as
+text, raw pstats or callgrind (for KCachegrind / QCachegrind).
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # optional
+    SamplingProfiler = None
+
+PROFILE_PARAM = '__profile'
+OUTPUT_PARAM = '__profile_output'
+MODES = ('cpu', 'sample')
+TEXT_REPORT_LINES = 40
+
+
+class SqlTimeline:
+    """Database execute wrapper noting when each statement started and how long it took."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            finished = time.perf_counter()
+            self.queries.append({
+                'start_ms': round((started - self.started) * 1000, 3),
+                'ms': round((finished - started) * 1000, 3),
+                'sql': sql,
+                'many': many,
+            })
+
+
+class RequestProfiler:
+    """Profile one request; ``mode`` is 'cpu' (cProfile) or 'sample' (pyinstrument if present)."""
+
+    def __init__(self, mode):
+        self.mode = 'sample' if mode == 'sample' and SamplingProfiler else 'cpu'
+        self.profiler = SamplingProfiler() if self.mode == 'sample' else cProfile.Profile()
+        self.timeline = SqlTimeline()
+
+    def __enter__(self):
+        self.timeline.started = time.perf_counter()
+        if self.mode == 'sample':
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.mode == 'sample':
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+        self.total_ms = (time.perf_counter() - self.timeline.started) * 1000
+
+    def save(self, request, response):
+        """Write the artifact to PROFILE_DIR, trim the ring buffer and return the metadata."""
+        directory = settings.PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        # Sortable by time, unique across workers.
+        profile_id = f"{timezone.now():%Y%m%d-%H%M%S-%f}-{uuid.uuid4().hex[:6]}"
+        if self.mode == 'sample':
+            artifact = f'{profile_id}.txt'
+            with open(os.path.join(directory, artifact), 'w', encoding='utf-8') as out:
+                out.write(self.profiler.output_text())
+        else:
+            artifact = f'{profile_id}.prof'
+            self.profiler.dump_stats(os.path.join(directory, artifact))
+
+        match = request.resolver_match
+        meta = {
+            'id': profile_id,
+            'time': timezone.now().isoformat(),
+            'mode': self.mode,
+            'artifact': artifact,
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else '<unresolved>',
+            'user': request.user.get_username(),
+            'status': response.status_code,
+            'total_ms': round(self.total_ms, 2),
+            'sql_ms': round(sum(query['ms'] for query in self.timeline.queries), 2),
+            'queries': self.timeline.queries,
+        }
+        with open(os.path.join(directory, f'{profile_id}.json'), 'w', encoding='utf-8') as out:
+            json.dump(meta, out, indent=1)
+        trim(directory, settings.PROFILE_KEEP)
+        return meta
+
+
+def trim(directory, keep):
+    """Delete all but the newest ``keep`` profiles in ``directory``."""
+    for meta in list_profiles(directory)[keep:]:
+        for name in (f"{meta['id']}.json", meta['artifact']):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory=None):
+    """Metadata of the stored profiles, newest first."""
+    directory = directory or settings.PROFILE_DIR
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if name.endswith('.json'):
+            try:
+                with open(os.path.join(directory, name), encoding='utf-8') as meta:
+                    profiles.append(json.load(meta))
+            except (OSError, ValueError):
+                continue
+    return profiles
+
+
+def load_profile(profile_id, directory=None):
+    """Metadata of one profile; raises FileNotFoundError if it has been trimmed."""
+    directory = directory or settings.PROFILE_DIR
+    with open(os.path.join(directory, f'{profile_id}.json'), encoding='utf-8') as meta:
+        return json.load(meta)
+
+
+def load_stats(meta, directory=None):
+    """pstats.Stats of a cProfile ('cpu') profile."""
+    return pstats.Stats(os.path.join(directory or settings.PROFILE_DIR, meta['artifact']))
+
+
+def text_report(meta, directory=None):
+    """Human-readable report: request summary, hottest functions, SQL timeline."""
+    out = io.StringIO()
+    out.write(f"{meta['method']} {meta['path']} ({meta['view']}) -> {meta['status']}, "
+              f"{meta['total_ms']:.1f} ms, {len(meta['queries'])} queries in {meta['sql_ms']:.1f} ms\n\n")
+    if meta['mode'] == 'sample':
+        with open(os.path.join(directory or settings.PROFILE_DIR, meta['artifact']), encoding='utf-8') as report:
+            out.write(report.read())
+    else:
+        stats = load_stats(meta, directory)
+        stats.stream = out
+        stats.sort_stats('cumulative').print_stats(TEXT_REPORT_LINES)
+    out.write("\nSQL timeline (start ms, duration ms):\n")
+    for query in meta['queries']:
+        out.write(f"{query['start_ms']:>10.1f} {query['ms']:>8.1f}  {query['sql']}\n")
+    return out.getvalue()
+
+
+def callgrind(meta, directory=None):
+    """Convert a cProfile artifact to callgrind format (times in microseconds)."""
+    stats = load_stats(meta, directory).stats
+    callees = defaultdict(dict)
+    for function, (_, _, _, _, callers) in stats.items():
+        for caller, (_, calls, _, cumulative) in callers.items():
+            callees[caller][function] = (calls, cumulative)
+
+    def name(function):
+        filename, line, func = function
+        return f'fl={filename}\nfn={func}:{line}'
+
+    lines = ['# callgrind format', 'version: 1', 'creator: jobportal.profiling',
+             f"cmd: {meta['method']} {meta['path']}", 'events: Microseconds', '']
+    for function, (_, _, own_time, _, _) in stats.items():
+        lines += [name(function), f'{function[1]} {int(own_time * 1e6)}']
+        for callee, (calls, cumulative) in callees[function].items():
+            filename, line, func = callee
+            lines += [f'cfl={filename}', f'cfn={func}:{line}', f'calls={calls} {line}',
+                      f'{function[1]} {int(cumulative * 1e6)}']
+        lines.append('')
+    return '\n'.join(lines)
@@ -0,0 +1,97 @@
+"""
+Fixed-size derivatives ("renditions") of avatars and logos.
+
+Pages show student pictures and company logos at 40-120 CSS px, but the
+originals go up to 1000px. When a picture or logo is processed by the media
+queue (students/media_tasks.py), ``generate_renditions()`` also makes every
+size in ``SIZES`` as WebP and JPEG and stores them next to the original:
+``acme.png`` gets ``acme.48.webp``, ``acme.48.jpg``, ``acme.128.webp`` and so
+on. Their URLs are kept on the model's ``renditions`` field::
+
+    {"48": {"webp": "...", "jpeg": "..."}, "128": {...}, "512": {...}}
+
+Templates use ``{% responsive_image %}`` (jobs/templatetags/renditions.py),
+which serves the smallest rendition covering the displayed size, with a 2x
+candidate for high-density screens, and falls back to the original for
+images that have no renditions yet.
+"""
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+SIZES = (48, 128, 512)
+# renditions key -> (PIL format, file extension)
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+QUALITY = 82
+
+
+def rendition_name(name, size, key):
+    """Where the ``size`` px ``key`` rendition of ``name`` is stored."""
+    root, _ = os.path.splitext(name)
+    return f'{root}.{size}.{FORMATS[key][1]}'
+
+
+def _sizes_for(image):
+    # No upscaling: sizes past the original's longest side would just repeat it.
+    longest = max(image.size)
+    return [size for size in SIZES if size <= longest] or [SIZES[0]]
+
+
+def _encode(image, size, key):
+    image = image.copy()
+    image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    pil_format = FORMATS[key][0]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG has no alpha: flatten onto white
+        rgba = image.convert('RGBA')
+        image = Image.new('RGB', image.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.split()[-1])
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    output = BytesIO()
+    image.save(output, format=pil_format, quality=QUALITY, method=4 if pil_format == 'WEBP' else 0)
+    return output.getvalue()
+
+
+def generate_renditions(image, name, save):
+    """
+    Encode every rendition of the PIL ``image`` whose original is stored as
+    ``name``; ``save(rendition_name, data)`` stores one and returns its URL.
+    Returns the ``renditions`` mapping.
+    """
+    renditions = {}
+    for size in _sizes_for(image):
+        renditions[str(size)] = {
+            key: save(rendition_name(name, size, key), _encode(image, size, key))
+            for key in FORMATS
+        }
+    return renditions
+
+
+def local_saver(storage=default_storage):
+    """A ``save`` for generate_renditions() that writes to ``storage`` (replacing old files)."""
+    def save(name, data):
+        storage.delete(name)
+        return storage.url(storage.save(name, ContentFile(data)))
+    return save
+
+
+def delete_local_renditions(name, storage=default_storage):
+    """Remove the stored renditions of ``name`` (missing ones are ignored)."""
+    for size in SIZES:
+        for key in FORMATS:
+            storage.delete(rendition_name(name, size, key))
+
+
+def image_url(field_file):
+    """URL of an image field whose name may itself be a URL (remote uploads store one)."""
+    name = field_file.name or ''
+    if name.startswith(('http://', 'https://')):
+        return name
+    return field_file.url
@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import socket
+import tempfile
 from urllib.parse import urlparse
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -64,8 +67,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'jobportal.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'jobportal.middleware.SecurityHeadersMiddleware',
+    'jobportal.middleware.InstrumentationMiddleware',
+    'jobportal.middleware.SlowQueryMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,13 +79,15 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',   
+    'jobportal.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'jobportal.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that also times renders for jobportal/instrumentation.py
+        'BACKEND': 'jobportal.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -102,6 +110,31 @@ WSGI_APPLICATION = 'jobportal.wsgi.application'
 SUPABASE_URL = config('SUPABASE_URL', default=os.environ.get('SUPABASE_URL'))
 SUPABASE_KEY = config('SUPABASE_KEY', default=os.environ.get('SUPABASE_KEY'))
 
+# Storage client (students/supabase_storage.py): one pooled keep-alive client
+# per worker process. Timeouts are in seconds. Failed connections and
+# 429/503 responses (and 502/504 for idempotent requests, not uploads) are
+# retried SUPABASE_RETRIES times, backing off exponentially from
+# SUPABASE_RETRY_BACKOFF seconds.
+SUPABASE_TIMEOUT = config('SUPABASE_TIMEOUT', default=20, cast=float)
+SUPABASE_CONNECT_TIMEOUT = config('SUPABASE_CONNECT_TIMEOUT', default=5, cast=float)
+SUPABASE_RETRIES = config('SUPABASE_RETRIES', default=3, cast=int)
+SUPABASE_RETRY_BACKOFF = config('SUPABASE_RETRY_BACKOFF', default=0.5, cast=float)
+SUPABASE_MAX_CONNECTIONS = config('SUPABASE_MAX_CONNECTIONS', default=10, cast=int)
+SUPABASE_KEEPALIVE_EXPIRY = config('SUPABASE_KEEPALIVE_EXPIRY', default=30, cast=float)
+
+# Media queue (students/media_tasks.py), worked by `manage.py process_media_tasks`.
+# A claimed task is retried by another worker after MEDIA_TASK_LEASE seconds;
+# failures are retried MEDIA_TASK_MAX_ATTEMPTS times in all, waiting
+# MEDIA_TASK_RETRY_DELAY seconds and doubling each time.
+MEDIA_TASK_LEASE = config('MEDIA_TASK_LEASE', default=300, cast=int)
+MEDIA_TASK_MAX_ATTEMPTS = config('MEDIA_TASK_MAX_ATTEMPTS', default=5, cast=int)
+MEDIA_TASK_RETRY_DELAY = config('MEDIA_TASK_RETRY_DELAY', default=30, cast=int)
+MEDIA_TASK_POLL_INTERVAL = config('MEDIA_TASK_POLL_INTERVAL', default=2, cast=float)
+# Workers only claim tasks queued with their own MEDIA_TASK_HOST, since the
+# files are on that host's MEDIA_ROOT. Hosts sharing one MEDIA_ROOT (e.g. over
+# NFS) should all set the same value.
+MEDIA_TASK_HOST = config('MEDIA_TASK_HOST', default=socket.gethostname())
+
 # Use DATABASE_URL if provided (recommended on Render and for production/Supabase testing)
 DATABASE_URL = config('DATABASE_URL', default=None)
 # Strip redundant variable prefix if set incorrectly (e.g. DATABASE_URL=postgresql://...)
@@ -192,6 +225,97 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resumes stream through jobs.uploads.ResumeUploadHandler: type checked from
+# the first bytes, size capped and SHA-256 taken while the body is read, and
+# written straight to a temporary file. Other uploads use Django's handlers.
+FILE_UPLOAD_HANDLERS = [
+    'jobs.uploads.ResumeUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+
+# Job listing: show an approximate result count (planner estimate on PostgreSQL,
+# capped count elsewhere) instead of running COUNT(*) over the whole listing.
+JOB_LIST_APPROXIMATE_COUNT = config('JOB_LIST_APPROXIMATE_COUNT', default=True, cast=bool)
+JOB_LIST_COUNT_CAP = config('JOB_LIST_COUNT_CAP', default=1000, cast=int)
+
+
+# Cache backend, picked by CACHE_URL:
+#   locmem://[name]            per-process memory (default with DEBUG on)
+#   file:///var/tmp/jobportal  shared by processes on one machine
+#   redis://host:6379/0        Redis, or anything speaking its protocol (rediss:// for TLS)
+#   dummy://                   caching off
+# Entries live CACHE_TIMEOUT seconds; saves and deletes invalidate them early
+# (see jobportal/cache.py and jobs/signals.py). Invalidations only reach the
+# processes sharing the backend, so with DEBUG off CACHE_URL must be set: a
+# per-process default would serve stale pages from every other worker. Set
+# locmem:// explicitly only for a single-process deployment.
+CACHE_TIMEOUT = config('CACHE_TIMEOUT', default=300, cast=int)
+
+
+def _parse_cache_url(value):
+    parsed = urlparse(value)
+    scheme = parsed.scheme.lower()
+    if scheme in ('redis', 'rediss'):
+        backend = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': value}
+    elif scheme == 'file':
+        backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                   'LOCATION': parsed.path or os.path.join(tempfile.gettempdir(), 'jobportal-cache')}
+    elif scheme == 'dummy':
+        backend = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    elif scheme == 'locmem':
+        backend = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                   'LOCATION': parsed.netloc or 'jobportal'}
+    else:
+        raise ImproperlyConfigured(f"Unsupported CACHE_URL scheme: {value!r}")
+    backend.update({'TIMEOUT': CACHE_TIMEOUT, 'KEY_PREFIX': 'jobportal'})
+    return backend
+
+
+CACHE_URL = config('CACHE_URL', default='locmem://' if DEBUG else '')
+if not CACHE_URL:
+    raise ImproperlyConfigured(
+        "Set CACHE_URL to a cache shared by all web processes (e.g. redis://host:6379/0) when DEBUG is off."
+    )
+
+CACHES = {
+    'default': _parse_cache_url(CACHE_URL),
+}
+
+
+# Per-request instrumentation (jobportal/instrumentation.py): query counts,
+# SQL/template time and latency per URL name, readable by staff at
+# /instrumentation/. Requests over either threshold, or repeating one
+# statement INSTRUMENTATION_DUPLICATE_QUERIES times, are logged as warnings.
+INSTRUMENTATION_ENABLED = config('INSTRUMENTATION_ENABLED', default=False, cast=bool)
+INSTRUMENTATION_MAX_QUERIES = config('INSTRUMENTATION_MAX_QUERIES', default=30, cast=int)
+INSTRUMENTATION_MAX_MS = config('INSTRUMENTATION_MAX_MS', default=500, cast=int)
+INSTRUMENTATION_DUPLICATE_QUERIES = config('INSTRUMENTATION_DUPLICATE_QUERIES', default=5, cast=int)
+
+# Prometheus metrics at /metrics (jobportal/metrics.py). The scraper sends
+# "Authorization: Bearer <METRICS_TOKEN>"; with no token set the endpoint is
+# only served when DEBUG is on. Under gunicorn,
+# gunicorn.conf.py sets PROMETHEUS_MULTIPROC_DIR so workers share totals.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Slow-query log (jobportal/slow_queries.py): statements slower than
+# SLOW_QUERY_MS (0, the default, turns it off; try 250) go to SLOW_QUERY_LOG as
+# JSON lines. All workers share the file, so rotate it externally (logrotate).
+# SLOW_QUERY_EXPLAIN_RATE of them (0-1) carry their plan. Summarize with
+# `manage.py slow_query_report`.
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=0, cast=int)
+SLOW_QUERY_EXPLAIN_RATE = config('SLOW_QUERY_EXPLAIN_RATE', default=0.1, cast=float)
+SLOW_QUERY_LOG = config('SLOW_QUERY_LOG', default=os.path.join(tempfile.gettempdir(), 'jobportal-slow-queries.log'))
+
+# On-demand request profiling (jobportal/profiling.py): staff add
+# ?__profile=cpu to a URL. The newest PROFILE_KEEP profiles are kept in
+# PROFILE_DIR; list and export them with `manage.py request_profiles`.
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILE_DIR = config('PROFILE_DIR', default=os.path.join(tempfile.gettempdir(), 'jobportal-profiles'))
+PROFILE_KEEP = config('PROFILE_KEEP', default=50, cast=int)
+
 
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'recruiter_dashboard'
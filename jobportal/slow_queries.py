@@ -0,0 +1,167 @@
+"""
+Slow-query log.
+
+``SlowQueryMiddleware`` (jobportal/middleware.py) wraps every database call a
+request makes with a ``SlowQueryRecorder``. Statements slower than
+``SLOW_QUERY_MS`` (0, the default, turns the log off) are written as one JSON
+object per line to ``SLOW_QUERY_LOG`` with the URL name, path, duration, SQL and
+parameters.
+A ``SLOW_QUERY_EXPLAIN_RATE`` fraction of them also carry their plan: EXPLAIN
+ANALYZE on PostgreSQL (SELECTs only, since ANALYZE runs the statement),
+EXPLAIN QUERY PLAN on SQLite.
+
+Every worker process appends to the same file, so it is never rotated from
+here: rotate it externally (logrotate or similar). The handler notices the file
+was moved and reopens it. ``manage.py slow_query_report`` summarizes the log and
+its rotated copies (``.1``, ``.2.gz``, ...).
+"""
+import glob
+import gzip
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from logging.handlers import WatchedFileHandler
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from jobs.query_plans import explain
+
+logger = logging.getLogger('jobportal.slow_queries')
+
+PARAM_REPR_LIMIT = 200
+
+# Set while a plan is being captured, so the EXPLAIN isn't itself recorded.
+_explaining = ContextVar('slow_query_explaining', default=False)
+_handler_lock = threading.Lock()
+
+_PLACEHOLDER_LIST_RE = re.compile(r'IN \(%s(?:\s*,\s*%s)*\)', re.IGNORECASE)
+_LITERAL_RE = re.compile(r"\b\d+\b|'[^']*'")
+
+
+def normalize_sql(sql):
+    """Fold literals and IN (%s, %s, ...) lists so repeats of one statement group together."""
+    return _LITERAL_RE.sub('?', _PLACEHOLDER_LIST_RE.sub('IN (...)', sql))
+
+
+def log_paths():
+    """The current log file followed by its rotated copies (``.1``, ``.2.gz``, ...), newest first."""
+    path = settings.SLOW_QUERY_LOG
+    rotated = []
+    for name in glob.glob(f'{glob.escape(path)}.*'):
+        number = name[len(path) + 1:].removesuffix('.gz')
+        if number.isdigit():
+            rotated.append((int(number), name))
+    return [path] + [name for _, name in sorted(rotated)]
+
+
+def configure_logging():
+    """Attach the JSON-lines file handler to the slow-query logger (again if SLOW_QUERY_LOG moved)."""
+    path = os.path.abspath(settings.SLOW_QUERY_LOG)
+    with _handler_lock:
+        for handler in list(logger.handlers):
+            if getattr(handler, 'slow_query_log', False):
+                if handler.baseFilename == path:
+                    return
+                logger.removeHandler(handler)
+                handler.close()
+        os.makedirs(os.path.dirname(settings.SLOW_QUERY_LOG) or '.', exist_ok=True)
+        handler = WatchedFileHandler(settings.SLOW_QUERY_LOG, delay=True, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler.slow_query_log = True
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+class _PlanCaptured(Exception):
+    """Raised out of capture_plan()'s atomic block to roll it back."""
+
+    def __init__(self, plan):
+        super().__init__()
+        self.plan = plan
+
+
+def _params_repr(params):
+    if params is None:
+        return None
+    text = repr(params)
+    return text if len(text) <= PARAM_REPR_LIMIT else text[:PARAM_REPR_LIMIT] + '...'
+
+
+class SlowQueryRecorder:
+    """Database execute wrapper that logs statements slower than ``threshold_ms``."""
+
+    def __init__(self, request, threshold_ms, explain_rate):
+        self.request = request
+        self.threshold_ms = threshold_ms
+        self.explain_rate = explain_rate
+
+    def __call__(self, execute, sql, params, many, context):
+        if _explaining.get():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            result = execute(sql, params, many, context)
+            succeeded = True
+            return result
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                self.log(sql, params, many, context['connection'], elapsed_ms, succeeded)
+
+    def log(self, sql, params, many, connection, elapsed_ms, succeeded=True):
+        match = self.request.resolver_match
+        entry = {
+            'time': timezone.now().isoformat(),
+            'view': match.view_name if match else '<unresolved>',
+            'path': self.request.path,
+            'ms': round(elapsed_ms, 2),
+            'sql': sql,
+            'params': _params_repr(params),
+            'many': many,
+        }
+        if not succeeded:
+            entry['failed'] = True
+        elif not many and random.random() < self.explain_rate:
+            entry['plan'] = self.capture_plan(sql, params, connection)
+        logger.info(json.dumps(entry, default=str))
+
+    def capture_plan(self, sql, params, connection):
+        # ANALYZE runs the statement, and a WITH can wrap an INSERT/UPDATE/DELETE.
+        is_select = sql.lstrip().upper().startswith('SELECT')
+        if connection.vendor == 'postgresql' and not is_select:
+            return None
+        token = _explaining.set(True)
+        try:
+            # Always rolled back: a failing EXPLAIN can't poison the request's
+            # transaction, and nothing the ANALYZE did is kept.
+            with transaction.atomic(using=connection.alias):
+                raise _PlanCaptured(explain(sql, params, using=connection.alias, analyze=is_select))
+        except _PlanCaptured as captured:
+            return captured.plan
+        except DatabaseError as exc:
+            return [f'EXPLAIN failed: {exc}']
+        finally:
+            _explaining.reset(token)
+
+
+def read_entries(paths=None):
+    """Yield every logged entry, oldest file first; unreadable lines are skipped."""
+    for path in reversed(paths or log_paths()):
+        if not os.path.exists(path):
+            continue
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
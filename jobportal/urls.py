@@ -24,6 +24,8 @@ from django.contrib.auth import views as auth_views
 # temporary import for debug
 from debug.views import debug_env
 from jobportal.hello import health
+from jobportal.instrumentation import instrumentation_view
+from jobportal.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -35,6 +37,8 @@ urlpatterns = [
     path('companies/', include('companies.urls')),
     path('debug/env/', debug_env),
     path('health/', health),
+    path('instrumentation/', instrumentation_view, name='instrumentation'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 
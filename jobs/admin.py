@@ -6,7 +6,8 @@ class JobAdmin(admin.ModelAdmin):
     list_display = ['title', 'company', 'location', 'job_type', 'created_at', 'deadline', 'is_active', 'applications_count']
     list_filter = ['job_type', 'is_active', 'created_at', 'company']
     search_fields = ['title', 'company__company_name', 'location', 'required_skills']
-    readonly_fields = ['created_at', 'applications_count']
+    readonly_fields = ['created_at', 'applications_count', 'pending_count', 'shortlisted_count',
+                       'interviewed_count', 'rejected_count', 'hired_count']
     date_hierarchy = 'created_at'
     
     fieldsets = (
@@ -26,11 +27,12 @@ class JobAdmin(admin.ModelAdmin):
         ('Status', {
             'fields': ('is_active',)
         }),
+        ('Applications', {
+            'fields': ('applications_count', 'pending_count', 'shortlisted_count',
+                       'interviewed_count', 'rejected_count', 'hired_count'),
+            'classes': ('collapse',)
+        }),
     )
-    
-    def applications_count(self, obj):
-        return obj.applications.count()
-    applications_count.short_description = 'Applications'
 
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
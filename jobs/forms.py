@@ -1,5 +1,6 @@
 from django import forms
 from .models import JobApplication, Job
+from .uploads import RESUME_MAX_BYTES, SIZE_ERROR, TYPE_ERROR, detect_resume_type
 
 class JobApplicationForm(forms.ModelForm):
     class Meta:
@@ -26,16 +27,12 @@ class JobApplicationForm(forms.ModelForm):
     def clean_resume(self):
         resume = self.cleaned_data.get('resume')
         if resume:
-            if resume.size > 5 * 1024 * 1024:  # 5MB limit
-                raise forms.ValidationError('File size must be under 5MB.')
+            if resume.size > RESUME_MAX_BYTES:  # 5MB limit
+                raise forms.ValidationError(SIZE_ERROR)
             
-            allowed_types = [
-                'application/pdf', 
-                'application/msword', 
-                'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            ]
-            if resume.content_type not in allowed_types:
-                raise forms.ValidationError('Only PDF and Word documents are allowed.')
+            # ✅ Check the file's bytes, not the Content-Type the browser claims
+            if detect_resume_type(resume) is None:
+                raise forms.ValidationError(TYPE_ERROR)
         
         return resume
     
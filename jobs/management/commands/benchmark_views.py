@@ -0,0 +1,34 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import get_runner
+
+from jobportal import benchmarks
+
+
+class Command(BaseCommand):
+    help = ("Run the view benchmarks (jobportal/benchmarks.py) on a test database "
+            "and print each view's timings and query counts.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--update-baseline', action='store_true',
+                            help="Write this run's query counts (and, with --latency-baseline, "
+                                 "timings) to the baseline instead of checking them.")
+        parser.add_argument('--latency-baseline',
+                            help="Also check timings against this machine-local baseline file.")
+        parser.add_argument('--report', help="Also write the results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        if options['update_baseline']:
+            os.environ['BENCHMARK_UPDATE_BASELINE'] = '1'
+        if options['latency_baseline']:
+            os.environ['BENCHMARK_LATENCY_BASELINE'] = options['latency_baseline']
+        if options['report']:
+            os.environ['BENCHMARK_REPORT'] = options['report']
+        benchmarks.ViewBenchmarks.stdout = self.stdout
+
+        runner = get_runner(settings)(verbosity=options['verbosity'], interactive=False)
+        if runner.run_tests(['jobportal.benchmarks']):
+            raise CommandError("View benchmarks failed.")
+        self.stdout.write(self.style.SUCCESS("View benchmarks passed."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from jobs.resumes import dedupe_media
+
+
+class Command(BaseCommand):
+    help = ("Move resumes stored under their upload names into the SHA-256 layout, "
+            "keeping one file per distinct resume, and recount their references.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report what would change without touching files or rows.")
+
+    def handle(self, *args, **options):
+        verbose = options['verbosity'] > 1
+        stats = dedupe_media(dry_run=options['dry_run'],
+                             progress=self.stdout.write if verbose else None)
+
+        summary = (f"{stats['files']} file(s), {stats['duplicates']} duplicate(s), "
+                   f"{stats['bytes_freed'] / 1024 / 1024:.1f} MB freed")
+        if stats['missing']:
+            summary += f", {stats['missing']} missing file(s) left as they were"
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Dry run: {summary}."))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Deduplicated resumes: {summary}; {stats['orphans']} unreferenced blob(s) removed."
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = ("Deactivate every active job whose deadline has passed, in one UPDATE. "
+            "Safe to run repeatedly, e.g. hourly from cron.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report how many jobs would be deactivated.")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = Job.objects.expired().count()
+            self.stdout.write(f"{count} expired job(s) would be deactivated.")
+            return
+
+        # The bulk update also moves the listing version, so cached
+        # listings stop showing these jobs right away.
+        closed = Job.objects.deactivate_expired()
+        remaining = Job.objects.filter(is_active=True).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deactivated {closed} expired job(s); {remaining} active job(s) remain."
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from jobs.search import FallbackJobSearch, get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for all jobs."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if isinstance(backend, FallbackJobSearch):
+            self.stdout.write(self.style.WARNING(
+                "This database has no full-text backend; searches use substring matching."
+            ))
+            return
+        count = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} jobs ({backend.vendor})."))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized application counters on Job and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, action='append', dest='job_ids',
+                            help="Only check this job id (repeatable).")
+        parser.add_argument('--check', action='store_true',
+                            help="Report drifted jobs without fixing them.")
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.all()
+        if options['job_ids']:
+            jobs = jobs.filter(pk__in=options['job_ids'])
+
+        drifted = list(jobs.with_counter_drift().values_list('pk', flat=True))
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("All application counters are accurate."))
+            return
+
+        if options['check']:
+            self.stdout.write(self.style.WARNING(
+                f"{len(drifted)} job(s) have drifted counters: {', '.join(map(str, drifted[:50]))}"
+            ))
+            return
+
+        fixed = Job.objects.filter(pk__in=drifted).refresh_application_counts()
+        self.stdout.write(self.style.SUCCESS(f"Repaired application counters on {fixed} job(s)."))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobportal import profiling
+
+
+class Command(BaseCommand):
+    help = "List request profiles captured with ?__profile=cpu, or export one."
+
+    def add_arguments(self, parser):
+        subcommands = parser.add_subparsers(dest='action', required=True)
+        subcommands.add_parser('list', help="Stored profiles, newest first.")
+        export = subcommands.add_parser('export', help="Write one profile out.")
+        export.add_argument('profile_id')
+        export.add_argument('--format', choices=['text', 'pstats', 'callgrind'], default='text',
+                            help="text report with SQL timeline (default), raw pstats, or callgrind.")
+        export.add_argument('--output', '-o', help="File to write; text goes to stdout without it.")
+
+    def handle(self, *args, **options):
+        if options['action'] == 'list':
+            profiles = profiling.list_profiles()
+            for meta in profiles:
+                self.stdout.write(
+                    f"{meta['id']}  {meta['mode']:<6} {meta['status']} {meta['total_ms']:>9.1f} ms "
+                    f"{len(meta['queries']):>4} queries  {meta['method']} {meta['path']} ({meta['view']})"
+                )
+            self.stdout.write(self.style.SUCCESS(f"{len(profiles)} profile(s) stored."))
+            return
+
+        try:
+            meta = profiling.load_profile(options['profile_id'])
+        except FileNotFoundError:
+            raise CommandError(f"No profile {options['profile_id']!r}; it may have been rotated out.")
+        output = options['output']
+        if options['format'] != 'text' and meta['mode'] != 'cpu':
+            raise CommandError("Only cProfile ('cpu') profiles export as pstats or callgrind.")
+
+        if options['format'] == 'pstats':
+            if not output:
+                raise CommandError("--output is required for pstats.")
+            profiling.load_stats(meta).dump_stats(output)
+        else:
+            content = (profiling.text_report(meta) if options['format'] == 'text'
+                       else profiling.callgrind(meta))
+            if not output:
+                self.stdout.write(content)
+                return
+            with open(output, 'w', encoding='utf-8') as out:
+                out.write(content)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['format']} profile to {output}."))
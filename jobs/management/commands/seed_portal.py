@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.seeding import BATCH_SIZE, RESUME_FILES, SEED_PASSWORD, seed_portal
+
+
+class Command(BaseCommand):
+    help = ("Bulk-create synthetic companies, jobs, students and applications for load "
+            "and scale testing. The same --seed always produces the same data.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=10)
+        parser.add_argument('--jobs', type=int, default=100)
+        parser.add_argument('--students', type=int, default=100)
+        parser.add_argument('--applications', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Random seed (default 0).")
+        parser.add_argument('--prefix', default='seed',
+                            help="Username prefix; use a new one to seed the same database again.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=f"Rows per INSERT batch (default {BATCH_SIZE}).")
+        parser.add_argument('--resume-files', type=int, default=RESUME_FILES,
+                            help=f"Stub resume files shared by the applications (default {RESUME_FILES}).")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            counts = seed_portal(
+                companies=options['companies'], jobs=options['jobs'],
+                students=options['students'], applications=options['applications'],
+                seed=options['seed'], prefix=options['prefix'],
+                batch_size=options['batch_size'], resume_files=options['resume_files'],
+                progress=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {counts['companies']} companies, {counts['jobs']} jobs, {counts['students']} "
+            f"students and {counts['applications']} applications in {elapsed:.1f}s. "
+            f"Every seeded user's password is '{SEED_PASSWORD}'."
+        ))
@@ -0,0 +1,53 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from jobportal.slow_queries import normalize_sql, read_entries
+
+
+class Command(BaseCommand):
+    help = ("Summarize the slow-query log (SLOW_QUERY_LOG and its rotated files): "
+            "statements grouped by shape, worst total time first.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10,
+                            help="Statements to show (default 10).")
+        parser.add_argument('--view', help="Only queries logged for this URL name, e.g. jobs:job_list.")
+        parser.add_argument('--plans', action='store_true',
+                            help="Print the latest captured plan of each statement.")
+
+    def handle(self, *args, **options):
+        groups = defaultdict(lambda: {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                      'views': defaultdict(int), 'plan': None})
+        for entry in read_entries():
+            if options['view'] and entry.get('view') != options['view']:
+                continue
+            group = groups[normalize_sql(entry['sql'])]
+            group['count'] += 1
+            group['total_ms'] += entry['ms']
+            group['max_ms'] = max(group['max_ms'], entry['ms'])
+            group['views'][entry.get('view')] += 1
+            if entry.get('plan'):
+                group['plan'] = entry['plan']
+
+        if not groups:
+            self.stdout.write(self.style.SUCCESS("No slow queries logged."))
+            return
+
+        ranked = sorted(groups.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        for sql, group in ranked[:options['top']]:
+            views = ', '.join(f'{view} ({count})' for view, count in
+                              sorted(group['views'].items(), key=lambda item: -item[1]))
+            self.stdout.write(self.style.WARNING(
+                f"{group['count']}x, {group['total_ms']:.0f} ms total, "
+                f"{group['total_ms'] / group['count']:.0f} ms avg, {group['max_ms']:.0f} ms max"
+            ))
+            self.stdout.write(f"  views: {views}")
+            self.stdout.write(f"  {sql}")
+            if options['plans'] and group['plan']:
+                for line in group['plan']:
+                    self.stdout.write(f"    {line}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(group['count'] for group in groups.values())} slow queries in "
+            f"{len(groups)} distinct statements."
+        ))
@@ -0,0 +1,260 @@
+"""
+Candidate-to-job match scoring.
+
+A match score (0.0 - 1.0) blends four features:
+
+* skills   - share of the job's required skills the student has
+* gpa      - GPA normalised to 0-1 (4-point or 10-point scale)
+* grad     - how well the graduation year suits the job type
+* location - same city as the job, or a remote job
+
+Skills come from the normalized index (``JobSkill`` / ``StudentSkill``), held
+as sparse CSR-style arrays of skill ids. Scores are computed with NumPy over
+whole batches, never row by row in Python:
+
+* ``score_pairs`` scores a list of ``(job, profile)`` pairs, e.g. every
+  applicant of a company's jobs;
+* ``match_matrix`` scores profiles x jobs, e.g. every active job for a chunk
+  of students (students/recommendations.py).
+
+Missing profile data scores a neutral 0.5 for that feature instead of zero.
+"""
+from django.utils import timezone
+
+import numpy as np
+
+WEIGHTS = {
+    'skills': 0.60,
+    'gpa': 0.15,
+    'grad': 0.10,
+    'location': 0.15,
+}
+
+NEUTRAL = 0.5
+
+# Job types that suit students who have not graduated yet.
+STUDENT_JOB_TYPES = ('internship', 'part_time')
+
+
+def _location_key(value):
+    """'Pune, Maharashtra' -> 'pune'."""
+    return (value or '').split(',', 1)[0].strip().lower()
+
+
+class SkillMatrix:
+    """
+    Sparse 0/1 matrix of owners (jobs or profiles) x skills in CSR layout:
+    row ``i`` holds ``indices[indptr[i]:indptr[i + 1]]``. The last row is an
+    empty sentinel used for owners that are unknown (e.g. no student profile).
+    """
+
+    def __init__(self, owner_ids, links):
+        self.owner_ids = list(owner_ids)
+        self.row_of = {owner_id: row for row, owner_id in enumerate(self.owner_ids)}
+        self.empty_row = len(self.owner_ids)
+
+        links = np.asarray(links, dtype=np.int64).reshape(-1, 2)
+        rows = np.fromiter((self.row_of.get(owner_id, -1) for owner_id in links[:, 0].tolist()),
+                           dtype=np.int64, count=len(links))
+        keep = rows >= 0
+        rows, skills = rows[keep], links[keep, 1]
+        order = np.lexsort((skills, rows))
+        self.indices = skills[order]
+        counts = np.bincount(rows, minlength=self.empty_row + 1)
+        self.indptr = np.concatenate(([0], np.cumsum(counts)))
+
+    @property
+    def lengths(self):
+        return np.diff(self.indptr)
+
+    def rows(self, owner_ids):
+        return np.fromiter((self.row_of.get(owner_id, self.empty_row) for owner_id in owner_ids),
+                           dtype=np.int64, count=len(owner_ids))
+
+    def dense(self, vocabulary, start=0, stop=None):
+        """
+        0/1 float matrix of rows ``start:stop`` (default: all, sentinel
+        included) x len(vocabulary); skills outside the vocabulary are dropped.
+        """
+        stop = self.empty_row + 1 if stop is None else stop
+        out = np.zeros((stop - start, len(vocabulary)), dtype=np.float32)
+        if not len(vocabulary):
+            return out
+        indices = self.indices[self.indptr[start]:self.indptr[stop]]
+        columns = np.minimum(np.searchsorted(vocabulary, indices), len(vocabulary) - 1)
+        known = vocabulary[columns] == indices
+        rows = np.repeat(np.arange(stop - start), self.lengths[start:stop])
+        out[rows[known], columns[known]] = 1
+        return out
+
+
+class JobFeatures:
+    """Per-job arrays for a set of job ids (plus the sentinel row)."""
+
+    def __init__(self, job_ids):
+        from .models import Job, JobSkill
+
+        rows = list(Job.objects.filter(id__in=job_ids).values_list('id', 'job_type', 'location'))
+        links = JobSkill.objects.filter(job_id__in=job_ids).values_list('job_id', 'skill_id')
+        self.skills = SkillMatrix([row[0] for row in rows], list(links))
+        self.student_job = np.array([row[1] in STUDENT_JOB_TYPES for row in rows] + [False])
+        self.remote = np.array(['remote' in (row[2] or '').lower() for row in rows] + [False])
+        # Location keys as integer codes; '' is code 0
+        self.location_codes = {'': 0}
+        self.location = np.array([
+            self.location_codes.setdefault(_location_key(row[2]), len(self.location_codes))
+            for row in rows
+        ] + [0])
+
+
+class ProfileFeatures:
+    """Per-profile arrays for a set of StudentProfile ids (plus the sentinel row)."""
+
+    def __init__(self, profile_ids):
+        from students.models import StudentProfile, StudentSkill
+
+        rows = list(StudentProfile.objects.filter(id__in=profile_ids).values_list(
+            'id', 'gpa', 'graduation_year', 'location'))
+        links = StudentSkill.objects.filter(profile_id__in=profile_ids).values_list('profile_id', 'skill_id')
+        self.skills = SkillMatrix([row[0] for row in rows], list(links))
+        self.gpa = np.array([np.nan if row[1] is None else float(row[1]) for row in rows] + [np.nan])
+        self.grad_year = np.array([np.nan if row[2] is None else row[2] for row in rows] + [np.nan],
+                                  dtype=float)
+        self.locations = [_location_key(row[3]) for row in rows] + ['']
+
+
+def _profile_location_codes(jobs, profiles):
+    """Profile locations in the jobs' codes; -1 for places no job is in."""
+    return np.array([jobs.location_codes.get(key, -1) for key in profiles.locations])
+
+
+def _combine(skills, gpa, grad_year, student_job, job_loc, remote, profile_loc, year):
+    """
+    Blend the features into one score. Arguments are aligned (or
+    broadcastable) arrays, so the same code scores pair lists and matrices.
+    """
+    scaled = np.where(gpa <= 4, gpa / 4, gpa / 10)
+    gpa_score = np.where(np.isnan(gpa), NEUTRAL, np.clip(scaled, 0, 1))
+
+    # Full-time roles want people who have graduated; internships and
+    # part-time roles want people who are still studying. Each year off
+    # costs a quarter of the feature.
+    gap = np.where(student_job, (year + 1) - grad_year, grad_year - year)
+    grad_score = np.clip(1 - 0.25 * np.maximum(gap, 0), 0, 1)
+    grad_score = np.where(np.isnan(grad_year), NEUTRAL, grad_score)
+
+    location = np.where(remote | (job_loc == profile_loc), 1.0, 0.0)
+    location = np.where((profile_loc == 0) & ~remote, NEUTRAL, location)
+
+    return (
+        WEIGHTS['skills'] * skills
+        + WEIGHTS['gpa'] * gpa_score
+        + WEIGHTS['grad'] * grad_score
+        + WEIGHTS['location'] * location
+    )
+
+
+def _pair_overlap(job_skills, job_rows, profile_skills, profile_rows):
+    """Number of shared skills for each (job row, profile row) pair."""
+    n_pairs = len(job_rows)
+    lengths = profile_skills.lengths[profile_rows]
+    total = int(lengths.sum())
+    if total == 0 or len(job_skills.indices) == 0:
+        return np.zeros(n_pairs)
+
+    # Gather every pair's profile skills into one flat array (a ragged take).
+    pair_of = np.repeat(np.arange(n_pairs), lengths)
+    starts = np.repeat(profile_skills.indptr[profile_rows] - (np.cumsum(lengths) - lengths), lengths)
+    skills = profile_skills.indices[starts + np.arange(total)]
+
+    # Encode (job row, skill) as one integer so membership is a single isin().
+    width = int(max(job_skills.indices.max(), skills.max())) + 1
+    job_keys = np.repeat(np.arange(job_skills.empty_row + 1), job_skills.lengths) * width + job_skills.indices
+    pair_keys = job_rows[pair_of] * width + skills
+    hits = np.isin(pair_keys, job_keys)
+    return np.bincount(pair_of, weights=hits, minlength=n_pairs)
+
+
+def _coverage(shared, required):
+    return np.where(required > 0, shared / np.maximum(required, 1), NEUTRAL)
+
+
+def match_matrix(profiles, jobs, today=None, start=0, stop=None):
+    """
+    Score loaded ``ProfileFeatures`` against the jobs in rows ``start:stop``
+    of ``JobFeatures`` (default: all). Returns an array of shape (profiles,
+    jobs in range), sentinel rows excluded.
+
+    Jobs stay sparse; only the requested block is expanded, so callers
+    scoring a large catalogue should walk it in blocks.
+    """
+    year = (today or timezone.localdate()).year
+    stop = jobs.skills.empty_row if stop is None else min(stop, jobs.skills.empty_row)
+    block = slice(start, stop)
+    # Only skills some profile in this batch has can count, so the dense
+    # indicator matrices stay as narrow as the batch's own vocabulary.
+    vocabulary = np.unique(profiles.skills.indices)
+    shared = profiles.skills.dense(vocabulary)[:-1] @ jobs.skills.dense(vocabulary, start, stop).T
+    skills = _coverage(shared, jobs.skills.lengths[None, block])
+
+    profile_loc = _profile_location_codes(jobs, profiles)[:-1]
+    return _combine(
+        skills,
+        profiles.gpa[:-1, None], profiles.grad_year[:-1, None],
+        jobs.student_job[None, block], jobs.location[None, block], jobs.remote[None, block],
+        profile_loc[:, None], year,
+    )
+
+
+def score_pairs(pairs, today=None):
+    """
+    Score ``[(job_id, profile_id), ...]`` and return a float array in the
+    same order. ``profile_id`` may be ``None`` for an applicant without a
+    profile; unknown ids score as empty.
+    """
+    if not pairs:
+        return np.zeros(0)
+    year = (today or timezone.localdate()).year
+    job_ids = [job_id for job_id, _ in pairs]
+    profile_ids = [profile_id for _, profile_id in pairs]
+
+    jobs = JobFeatures(set(job_ids))
+    profiles = ProfileFeatures({pid for pid in profile_ids if pid is not None})
+    job_rows = jobs.skills.rows(job_ids)
+    profile_rows = profiles.skills.rows(profile_ids)
+
+    shared = _pair_overlap(jobs.skills, job_rows, profiles.skills, profile_rows)
+    skills = _coverage(shared, jobs.skills.lengths[job_rows])
+
+    profile_loc = _profile_location_codes(jobs, profiles)
+    return _combine(
+        skills,
+        profiles.gpa[profile_rows], profiles.grad_year[profile_rows],
+        jobs.student_job[job_rows], jobs.location[job_rows], jobs.remote[job_rows],
+        profile_loc[profile_rows], year,
+    )
+
+
+def top_n(scores, ids, n):
+    """Indices of the ``n`` best scores (ties: higher id first), best first."""
+    ids = np.asarray(ids)
+    if len(scores) > n:
+        candidates = np.argpartition(-scores, n - 1)[:n]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((-ids[candidates], -scores[candidates]))]
+
+
+def rank_applications(applications, today=None):
+    """
+    Return ``[(application_id, score), ...]`` best match first for an
+    application queryset. Only ids and keys are read from the database.
+    """
+    rows = list(applications.values_list('id', 'job_id', 'student__studentprofile__id'))
+    if not rows:
+        return []
+    scores = score_pairs([(job_id, profile_id) for _, job_id, profile_id in rows], today=today)
+    ids = np.array([app_id for app_id, _, _ in rows])
+    order = np.lexsort((-ids, -scores))  # ties: newest application first
+    return [(int(ids[i]), float(scores[i])) for i in order]
+
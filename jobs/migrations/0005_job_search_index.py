@@ -0,0 +1,53 @@
+# Full-text search index for jobs (see jobs/search.py)
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # The SQL that fills the index is spelled out here rather than taken from
+    # jobs/search.py, so later changes there don't change this migration.
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE jobs_job ADD COLUMN search_vector tsvector")
+        schema_editor.execute(
+            "CREATE INDEX jobs_job_search_vector_gin ON jobs_job USING GIN (search_vector)"
+        )
+        schema_editor.execute(
+            "UPDATE jobs_job AS j SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(j.title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(j.required_skills, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(c.company_name, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(j.description, '')), 'C') "
+            "FROM companies_company AS c WHERE c.id = j.company_id"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE jobs_job_fts USING fts5("
+            "title, description, company_name, required_skills, tokenize = 'unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO jobs_job_fts (rowid, title, description, company_name, required_skills) "
+            "SELECT j.id, j.title, j.description, c.company_name, coalesce(j.required_skills, '') "
+            "FROM jobs_job j JOIN companies_company c ON c.id = j.company_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS jobs_job_search_vector_gin")
+        schema_editor.execute("ALTER TABLE jobs_job DROP COLUMN IF EXISTS search_vector")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS jobs_job_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_alter_job_is_active'),
+        ('companies', '0003_alter_company_logo'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
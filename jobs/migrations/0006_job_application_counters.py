@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:38
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+
+    def counted(**filters):
+        applications = JobApplication.objects.filter(job=OuterRef('pk'), **filters) \
+            .order_by().values('job').annotate(n=Count('pk')).values('n')
+        return Coalesce(Subquery(applications, output_field=IntegerField()), 0)
+
+    counters = {'applications_count': counted()}
+    for status in ('pending', 'shortlisted', 'interviewed', 'rejected', 'hired'):
+        counters[f'{status}_count'] = counted(status=status)
+    Job.objects.update(**counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='hired_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='interviewed_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='rejected_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='shortlisted_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
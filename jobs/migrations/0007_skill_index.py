@@ -0,0 +1,154 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:42
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# A frozen copy of the parsing rules in jobs/skills.py as they were when this
+# migration was written, so later changes there don't change what it did.
+# students/migrations/0006_student_skills.py uses it too.
+ALIASES = {
+    'js': 'javascript',
+    'java script': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'python 3': 'python',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'react js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'node js': 'node.js',
+    'expressjs': 'express',
+    'express.js': 'express',
+    'postgres': 'postgresql',
+    'postgre sql': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'mysql db': 'mysql',
+    'golang': 'go',
+    'cpp': 'c++',
+    'c plus plus': 'c++',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'k8s': 'kubernetes',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'drf': 'django rest framework',
+    'html5': 'html',
+    'css3': 'css',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+}
+
+DISPLAY_NAMES = {
+    'javascript': 'JavaScript',
+    'typescript': 'TypeScript',
+    'node.js': 'Node.js',
+    'postgresql': 'PostgreSQL',
+    'mongodb': 'MongoDB',
+    'mysql': 'MySQL',
+    'c++': 'C++',
+    'c#': 'C#',
+    'html': 'HTML',
+    'css': 'CSS',
+    'aws': 'AWS',
+    'sql': 'SQL',
+    'php': 'PHP',
+    'django rest framework': 'Django REST Framework',
+    'github': 'GitHub',
+}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def skill_key(name):
+    key = _WHITESPACE_RE.sub(' ', str(name or '')).strip().strip('.,;').lower()
+    return ALIASES.get(key, key)[:100]
+
+
+def display_name(key, original=''):
+    if key in DISPLAY_NAMES:
+        return DISPLAY_NAMES[key]
+    original = _WHITESPACE_RE.sub(' ', str(original or '')).strip()
+    if original.lower() == key and not original.islower():
+        return original
+    return key.title()
+
+
+def parse_skills(text):
+    seen = {}
+    for item in (text or '').split(','):
+        name = item.split('||', 1)[0]
+        key = skill_key(name)
+        if key and key not in seen:
+            seen[key] = display_name(key, name)
+    return list(seen.items())
+
+
+def backfill_job_skills(apps, schema_editor):
+    Skill = apps.get_model('jobs', 'Skill')
+    Owner = apps.get_model('jobs', 'Job')
+    Link = apps.get_model('jobs', 'JobSkill')
+
+    skill_ids = dict(Skill.objects.values_list('slug', 'id'))
+    links = []
+    for owner_id, text in Owner.objects.exclude(required_skills__isnull=True).exclude(required_skills='') \
+            .values_list('id', 'required_skills').iterator():
+        for key, name in parse_skills(text):
+            if key not in skill_ids:
+                skill_ids[key] = Skill.objects.create(slug=key, name=name).pk
+            links.append(Link(job_id=owner_id, skill_id=skill_ids[key]))
+        if len(links) >= 1000:
+            Link.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    Link.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_application_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='jobs.job')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_links', to='jobs.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='normalized_skills',
+            field=models.ManyToManyField(blank=True, related_name='jobs', through='jobs.JobSkill', to='jobs.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='jobskill',
+            index=models.Index(fields=['skill', 'job'], name='jobs_jobskill_skill_job'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobskill',
+            unique_together={('job', 'skill')},
+        ),
+        migrations.RunPython(backfill_job_skills, migrations.RunPython.noop),
+    ]
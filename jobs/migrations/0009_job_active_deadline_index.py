@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_alter_company_logo'),
+        ('jobs', '0008_job_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['is_active', 'deadline'], name='jobs_job_active_deadline'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_alter_company_logo'),
+        ('jobs', '0009_job_active_deadline_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', '-created_at'], name='jobs_job_active_created'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='jobs_job_open_newest'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['company', 'created_at'], name='jobs_job_company_created'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job', 'status'], name='jobs_app_job_status'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job', '-applied_at'], name='jobs_app_job_applied'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['student', 'status', 'applied_at'], name='jobs_app_student_status'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['job', '-applied_at'], name='jobs_app_pending_queue'),
+        ),
+    ]
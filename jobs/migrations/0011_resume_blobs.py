@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:24
+
+import jobs.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('reference_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='resume',
+            field=models.FileField(help_text='Upload PDF or Word document (Max 5MB)', storage=jobs.storage.ResumeStorage(), upload_to=''),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0004_logo_renditions'),
+        ('jobs', '0011_resume_blobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_job_active_created',
+        ),
+        migrations.RemoveIndex(
+            model_name='jobapplication',
+            name='jobs_app_pending_queue',
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='company',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='companies.company'),
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='job',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.job'),
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='job_applications', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_drop_redundant_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -1,9 +1,80 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
 from datetime import datetime
 
+from jobportal import cache
+from .storage import resume_storage
+
+APPLICATION_STATUSES = ('pending', 'shortlisted', 'interviewed', 'rejected', 'hired')
+
+
+def status_counter_field(status):
+    """Name of the Job counter column that tracks applications in ``status``."""
+    return f'{status}_count'
+
+
+class JobQuerySet(models.QuerySet):
+    def _counter_expressions(self):
+        """Correlated subqueries that count each job's applications from scratch."""
+        def counted(**filters):
+            applications = JobApplication.objects.filter(job=OuterRef('pk'), **filters) \
+                .order_by().values('job').annotate(n=Count('pk')).values('n')
+            return Coalesce(Subquery(applications, output_field=IntegerField()), 0)
+
+        expressions = {'applications_count': counted()}
+        for status in APPLICATION_STATUSES:
+            expressions[status_counter_field(status)] = counted(status=status)
+        return expressions
+
+    def with_counter_drift(self):
+        """Jobs whose stored application counters disagree with the real rows."""
+        expressions = self._counter_expressions()
+        drift = Q()
+        for field in expressions:
+            drift |= ~Q(**{field: models.F(f'expected_{field}')})
+        return self.annotate(**{
+            f'expected_{field}': expr for field, expr in expressions.items()
+        }).filter(drift)
+
+    def update(self, **kwargs):
+        # Bulk updates skip the post_save receivers, so invalidate cached
+        # listings here. Counter-only updates don't: every application moves
+        # a counter, and clearing every listing per apply would defeat the
+        # cache. Applicant counts on cached pages may lag by CACHE_TIMEOUT.
+        updated = super().update(**kwargs)
+        if updated and not set(kwargs) <= set(Job.COUNTER_FIELDS):
+            cache.bump_namespace(cache.JOBS)
+        return updated
+    
+    def expired(self, today=None):
+        """Jobs still marked active whose deadline has passed."""
+        return self.filter(is_active=True, deadline__lt=today or timezone.now().date())
+    
+    def deactivate_expired(self, today=None):
+        """Close every expired job in one UPDATE; returns the number closed."""
+        return self.expired(today).update(is_active=False, updated_at=timezone.now())
+    
+    def refresh_application_counts(self):
+        """Recompute the application counters of these jobs in one UPDATE."""
+        return self.update(**self._counter_expressions())
+
+
+class Skill(models.Model):
+    """A canonical skill; ``slug`` is the normalized key from jobs.skills.skill_key()."""
+    name = models.CharField(max_length=100)
+    slug = models.CharField(max_length=100, unique=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
 class Job(models.Model):
     JOB_TYPE_CHOICES = [
         ('full_time', 'Full Time'),
@@ -12,12 +83,14 @@ class Job(models.Model):
         ('internship', 'Internship'),
     ]
     
-    company = models.ForeignKey('companies.Company', on_delete=models.CASCADE, related_name='jobs')
+    # Indexed by jobs_job_company_created, which starts with it
+    company = models.ForeignKey('companies.Company', on_delete=models.CASCADE, related_name='jobs', db_index=False)
     title = models.CharField(max_length=255)
     description = models.TextField()
     location = models.CharField(max_length=100)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     deadline = models.DateField()
     
     salary_min = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
@@ -26,6 +99,8 @@ class Job(models.Model):
     
     requirements = models.TextField(blank=True, null=True)
     required_skills = models.TextField(blank=True, null=True, help_text="Comma-separated skills")
+    # Indexed copy of required_skills, synced on save (see jobs/skills.py)
+    normalized_skills = models.ManyToManyField(Skill, through='JobSkill', related_name='jobs', blank=True)
     
     job_type = models.CharField(max_length=50, choices=JOB_TYPE_CHOICES, default='full_time')
     is_active = models.BooleanField(default=True)
@@ -33,15 +108,27 @@ class Job(models.Model):
     experience_required = models.CharField(max_length=100, blank=True, null=True)
     positions_available = models.PositiveIntegerField(default=1)
     
+    # Denormalized application counters, maintained by jobs/signals.py and
+    # JobApplicationQuerySet.update(); repair with `manage.py recount_applications`.
+    applications_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    shortlisted_count = models.PositiveIntegerField(default=0, editable=False)
+    interviewed_count = models.PositiveIntegerField(default=0, editable=False)
+    rejected_count = models.PositiveIntegerField(default=0, editable=False)
+    hired_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    COUNTER_FIELDS = ('applications_count',) + tuple(
+        status_counter_field(status) for status in APPLICATION_STATUSES
+    )
+    
+    objects = JobQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.title} at {self.company.company_name}"
     
     def get_absolute_url(self):
         return reverse('jobs:job_detail', kwargs={'job_id': self.id})
     
-    # ✅ REMOVED: @property applications_count to avoid conflict with .annotate()
-    # This prevents the "property has no setter" error
-    
     @property 
     def is_expired(self):
         return self.deadline < timezone.now().date()
@@ -70,10 +157,60 @@ class Job(models.Model):
         
         super().save(*args, **kwargs)
     
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, *args, **kwargs):
+        # Never write back application counters loaded earlier: they are
+        # maintained in the database and may have moved since this row was read.
+        # Only the UPDATE leaves them out, so a row deleted meanwhile is still
+        # inserted again like any other model's.
+        if update_fields is None:
+            values = [value for value in values if value[0].name not in self.COUNTER_FIELDS]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, *args, **kwargs)
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Job'
         verbose_name_plural = 'Jobs'
+        indexes = [
+            # Public listing: open jobs, newest first (keyset pages included)
+            models.Index(fields=['-created_at', '-id'], name='jobs_job_open_newest',
+                         condition=Q(is_active=True)),
+            # Company dashboard / manage_jobs
+            models.Index(fields=['company', 'created_at'], name='jobs_job_company_created'),
+            # Only open jobs are swept by `manage.py expire_jobs`.
+            models.Index(fields=['is_active', 'deadline'], name='jobs_job_active_deadline',
+                         condition=Q(is_active=True)),
+        ]
+
+
+class JobSkill(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='job_links')
+    
+    class Meta:
+        unique_together = ['job', 'skill']
+        indexes = [models.Index(fields=['skill', 'job'], name='jobs_jobskill_skill_job')]
+    
+    def __str__(self):
+        return f"{self.job_id} needs {self.skill_id}"
+
+
+class JobApplicationQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Bulk status changes bypass the per-row signals, so recount the
+        counters of every job they touch in the same transaction.
+        """
+        if 'status' not in kwargs:
+            updated = super().update(**kwargs)
+        else:
+            with transaction.atomic(using=self.db):
+                job_ids = list(self.order_by().values_list('job_id', flat=True).distinct())
+                updated = super().update(**kwargs)
+                if job_ids:
+                    Job.objects.filter(pk__in=job_ids).refresh_application_counts()
+        # ...and they skip the cache invalidation receivers as well.
+        cache.bump_namespace(cache.APPLICATIONS)
+        return updated
 
 
 class JobApplication(models.Model):
@@ -85,11 +222,13 @@ class JobApplication(models.Model):
         ('hired', 'Hired'),
     ]
     
-    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
-    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_applications')
+    # Both indexed by composite indexes that start with them (see Meta)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications', db_index=False)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_applications', db_index=False)
     
     cover_letter = models.TextField(help_text="Tell us why you're perfect for this role")
-    resume = models.FileField(upload_to='applications/resumes/%Y/%m/', 
+    # Stored once per distinct file, named by its SHA-256 (see jobs/storage.py)
+    resume = models.FileField(storage=resume_storage,
                              help_text="Upload PDF or Word document (Max 5MB)")
     portfolio_url = models.URLField(blank=True, null=True, 
                                    help_text="Link to your portfolio or website")
@@ -104,11 +243,22 @@ class JobApplication(models.Model):
     notes = models.TextField(blank=True, null=True, 
                            help_text="Internal notes from recruiter")
     
+    objects = JobApplicationQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['student', 'job']
         ordering = ['-applied_at']
         verbose_name = 'Job Application'
         verbose_name_plural = 'Job Applications'
+        indexes = [
+            # Status counts and filters per job
+            models.Index(fields=['job', 'status'], name='jobs_app_job_status'),
+            # Newest applications per job (view_applications, manage_jobs
+            # previews, the pending-review queue)
+            models.Index(fields=['job', '-applied_at'], name='jobs_app_job_applied'),
+            # A student's own applications, by status
+            models.Index(fields=['student', 'status', 'applied_at'], name='jobs_app_student_status'),
+        ]
 
     def __str__(self):
         return f"{self.student.get_full_name() or self.student.username} → {self.job.title}"
@@ -137,3 +287,19 @@ class JobBookmark(models.Model):
     
     def __str__(self):
         return f"{self.student.username} bookmarked {self.job.title}"
+
+
+class ResumeBlob(models.Model):
+    """
+    One stored resume file (see jobs/resumes.py). Applications and profiles
+    with the same bytes share it; ``reference_count`` counts them, and the file
+    is deleted together with the row when the last one goes.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    reference_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.reference_count} references)"
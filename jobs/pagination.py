@@ -0,0 +1,135 @@
+"""
+Keyset (cursor) pagination for newest-first listings.
+
+``Paginator`` needs a ``COUNT(*)`` and an ``OFFSET`` scan that grows with the
+page number. ``KeysetPaginator`` instead seeks past the last row it served,
+using the ``(created_at, id)`` pair as the key, so every page costs the same.
+Cursors are opaque url-safe tokens; a tampered or stale token simply yields
+the first page.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(obj, direction):
+    payload = {'c': obj.created_at.isoformat(), 'i': obj.pk, 'd': direction}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return ``(created_at, id, direction)`` or ``None`` for a bad token."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        created_at = parse_datetime(payload['c'])
+        pk = int(payload['i'])
+        direction = payload['d']
+    except (ValueError, TypeError, KeyError):
+        return None
+    if created_at is None or direction not in ('next', 'prev'):
+        return None
+    return created_at, pk, direction
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1], 'next')
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0], 'prev')
+        return None
+
+
+class KeysetPaginator:
+    """Paginate a queryset newest-first on ``(created_at, id)``."""
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def get_page(self, cursor=None):
+        position = decode_cursor(cursor)
+        if position is None:
+            rows = list(self.queryset.order_by('-created_at', '-id')[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], len(rows) > self.per_page, False)
+
+        created_at, pk, direction = position
+        if direction == 'next':
+            rows = list(
+                self.queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                ).order_by('-created_at', '-id')[:self.per_page + 1]
+            )
+            return KeysetPage(rows[:self.per_page], len(rows) > self.per_page, True)
+
+        # Walking backwards: read ascending from the cursor, then flip.
+        rows = list(
+            self.queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            ).order_by('created_at', 'id')[:self.per_page + 1]
+        )
+        page_rows = rows[:self.per_page]
+        page_rows.reverse()
+        return KeysetPage(page_rows, True, len(rows) > self.per_page)
+
+
+def approximate_count(queryset, cap=None):
+    """
+    Return ``(count, is_approximate)`` without an unbounded ``COUNT(*)``.
+
+    PostgreSQL uses the planner's row estimate and only counts exactly when
+    the estimate is below ``cap``. Other databases count at most ``cap`` rows,
+    so large result sets show as "cap+".
+    """
+    if cap is None:
+        cap = getattr(settings, 'JOB_LIST_COUNT_CAP', 1000)
+
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate >= cap:
+            return estimate, True
+        return queryset.count(), False
+
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, True
+    return count, False
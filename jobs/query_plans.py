@@ -0,0 +1,62 @@
+"""
+EXPLAIN helpers for checking that queries use indexes.
+
+``explain(sql, params)`` returns the plan of one statement as text lines
+(``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` on PostgreSQL), and
+``full_scans(sql, plan, tables)`` picks out the lines where one of ``tables``
+is read by a sequential scan instead of through an index. The query plan
+tests run every query a view makes through both.
+"""
+import re
+
+from django.db import connections
+
+# Tables whose full scans we treat as a bug: they grow with the site.
+LARGE_TABLES = ('jobs_job', 'jobs_jobapplication')
+
+_ALIAS_RE = re.compile(r'"(\w+)" (?:AS )?"?([A-Z]\d+)"?')
+_SQLITE_SCAN_RE = re.compile(r'^SCAN (\w+)(.*)$')
+_PG_SEQ_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+
+
+def explain(sql, params=None, using='default', force_indexes=False, analyze=False):
+    """
+    Return the query plan for ``sql`` as a list of lines ([] on backends
+    without a supported EXPLAIN). Leave ``params`` as None for SQL that is
+    already interpolated, e.g. from ``connection.queries``. With
+    ``force_indexes`` PostgreSQL is told to avoid sequential scans for the
+    rest of the transaction, so a small test table still shows whether an
+    index *could* be used. ``analyze`` runs EXPLAIN ANALYZE on PostgreSQL,
+    which executes the statement: only pass it for SELECTs.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+        if connection.vendor == 'postgresql':
+            if force_indexes:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {"ANALYZE " if analyze else ""}{sql}', params)
+            return [row[0] for row in cursor.fetchall()]
+    return []
+
+
+def full_scans(sql, plan, tables=LARGE_TABLES):
+    """Plan lines that read one of ``tables`` by a full (sequential) scan."""
+    # Subqueries alias tables as U0, T3, ...; map them back to table names.
+    aliases = {alias: table for table, alias in _ALIAS_RE.findall(sql)}
+    found = []
+    for line in plan:
+        line = line.strip()
+        match = _SQLITE_SCAN_RE.match(line)
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            # "SCAN t USING [COVERING] INDEX i" walks an index, not the table.
+            if table in tables and 'USING' not in match.group(2):
+                found.append(line)
+            continue
+        match = _PG_SEQ_SCAN_RE.search(line)
+        if match and match.group(1) in tables:
+            found.append(line)
+    return found
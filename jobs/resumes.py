@@ -0,0 +1,189 @@
+"""
+Reference counting for content-addressed resumes.
+
+``JobApplication.resume`` and ``StudentProfile.resume`` are stored in
+``resume_storage`` (jobs/storage.py), one file per distinct content, shared
+by every row with the same bytes. Each stored file has a ``ResumeBlob`` row
+counting the applications and profiles pointing at it. Signals (jobs/signals.py, students/signals.py) call
+``acquire()`` / ``release()`` as rows are saved and deleted; when the count
+reaches zero the row and the file go, once the transaction commits.
+
+Storing an upload whose file already exists writes nothing, so a release
+committing between that and the upload's ``acquire()`` could delete the file
+under it. Both sides therefore lock the ``ResumeBlob`` row: the deletion
+only happens if the count is still zero, and ``acquire()`` writes the file
+again from the upload when it finds it gone.
+
+Rows written without signals (``bulk_create``, ``update()``) are put right
+with ``recount_references()``. ``dedupe_media()`` moves files stored under
+the old per-upload names into this layout (``manage.py dedupe_resumes``).
+"""
+import os
+
+from django.apps import apps
+from django.core.files.move import file_move_safe
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import ResumeBlob
+from .storage import BLOB_DIR, digest_of, resume_storage
+
+# Models and fields that hold a resume_storage name.
+REFERRERS = [('jobs.JobApplication', 'resume'), ('students.StudentProfile', 'resume')]
+
+
+def acquire(name, upload=None):
+    """
+    Count one more row referring to blob ``name``. ``upload``, the file it
+    was just stored from, is written again if the blob's file has gone.
+    """
+    digest = digest_of(name)
+    if digest is None:
+        return
+    with transaction.atomic():
+        if not ResumeBlob.objects.select_for_update().filter(sha256=digest).exists():
+            try:
+                with transaction.atomic():
+                    ResumeBlob.objects.create(sha256=digest, name=name)
+            except IntegrityError:
+                # Another request created the row first: wait for its lock too.
+                ResumeBlob.objects.select_for_update().get(sha256=digest)
+        if upload is not None and not resume_storage.exists(name):
+            resume_storage.save(name, upload)
+        ResumeBlob.objects.filter(sha256=digest).update(
+            reference_count=F('reference_count') + 1, size=_size(name))
+
+
+def release(name):
+    """Count one row fewer for blob ``name``; the last one out deletes the file."""
+    digest = digest_of(name)
+    if digest is None:
+        return
+    with transaction.atomic():
+        ResumeBlob.objects.filter(sha256=digest).update(
+            reference_count=Greatest(F('reference_count') - 1, 0))
+        unreferenced = ResumeBlob.objects.filter(sha256=digest, reference_count=0).exists()
+    if unreferenced:
+        transaction.on_commit(lambda: _delete_file(digest, name))
+
+
+def replace(previous, current, upload=None):
+    """A row's resume changed from ``previous`` to ``current`` (either may be empty)."""
+    if previous != current:
+        acquire(current, upload)
+        release(previous)
+
+
+def stored_name(value):
+    """Name of a FileField's raw value (a string, FieldFile or None)."""
+    return getattr(value, 'name', value) or None
+
+
+def pending_upload(field_file):
+    """The file a FieldFile is about to be stored from, or None once it's stored."""
+    if field_file and not field_file._committed:
+        return field_file.file
+    return None
+
+
+def _delete_file(digest, name):
+    with transaction.atomic():
+        # Skip it if the same resume was counted again in the meantime. The
+        # row stays locked until the file is gone.
+        deleted, _ = ResumeBlob.objects.filter(sha256=digest, reference_count=0).delete()
+        if deleted:
+            resume_storage.delete(name)
+
+
+def _size(name):
+    try:
+        return resume_storage.size(name)
+    except OSError:
+        return 0
+
+
+def _referrers():
+    for label, field in REFERRERS:
+        yield apps.get_model(label), field
+
+
+def recount_references(names=None):
+    """
+    Set every blob's count from the rows actually pointing at it, creating
+    missing ``ResumeBlob`` rows and deleting unreferenced ones with their
+    files. ``names`` limits this to those blobs. Returns the number deleted.
+    """
+    counts = {}
+    for model, field in _referrers():
+        rows = model.objects.filter(**{f'{field}__startswith': f'{BLOB_DIR}/'})
+        if names is not None:
+            rows = rows.filter(**{f'{field}__in': list(names)})
+        for name, count in rows.values_list(field).annotate(count=Count('pk')).order_by():
+            if digest_of(name):
+                counts[name] = counts.get(name, 0) + count
+
+    with transaction.atomic():
+        for name, count in counts.items():
+            ResumeBlob.objects.update_or_create(
+                sha256=digest_of(name),
+                defaults={'name': name, 'reference_count': count},
+                create_defaults={'name': name, 'reference_count': count, 'size': _size(name)},
+            )
+        orphans = ResumeBlob.objects.exclude(name__in=list(counts))
+        if names is not None:
+            orphans = orphans.filter(name__in=list(names))
+        orphans = list(orphans.values_list('sha256', 'name'))
+        ResumeBlob.objects.filter(sha256__in=[digest for digest, _ in orphans]).update(reference_count=0)
+    for digest, name in orphans:
+        _delete_file(digest, name)
+    return len(orphans)
+
+
+def dedupe_media(dry_run=False, progress=None):
+    """
+    Move every resume still stored under its upload name into the
+    content-addressed layout, in place: the first copy of each file is
+    renamed, later copies are deleted, and the rows are pointed at the blob.
+    Returns counts of what was (or, with ``dry_run``, would be) done.
+    """
+    report = progress or (lambda message: None)
+    stats = {'files': 0, 'duplicates': 0, 'bytes_freed': 0, 'missing': 0, 'orphans': 0}
+
+    legacy = set()
+    for model, field in _referrers():
+        legacy.update(model.objects.exclude(**{f'{field}__startswith': f'{BLOB_DIR}/'})
+                      .exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+                      .values_list(field, flat=True).distinct())
+
+    moved = set()
+    for old_name in sorted(legacy):
+        if not default_storage.exists(old_name):
+            stats['missing'] += 1
+            report(f"Missing, left as is: {old_name}")
+            continue
+        with default_storage.open(old_name, 'rb') as content:
+            new_name = resume_storage.blob_name(content, old_name)
+        size = default_storage.size(old_name)
+        stats['files'] += 1
+        duplicate = new_name in moved or resume_storage.exists(new_name)
+        if duplicate:
+            stats['duplicates'] += 1
+            stats['bytes_freed'] += size
+        moved.add(new_name)
+        if dry_run:
+            continue
+
+        if duplicate:
+            default_storage.delete(old_name)
+        else:
+            target = resume_storage.path(new_name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            file_move_safe(default_storage.path(old_name), target)
+        for model, field in _referrers():
+            model.objects.filter(**{field: old_name}).update(**{field: new_name})
+
+    if not dry_run:
+        stats['orphans'] = recount_references()
+    return stats
@@ -0,0 +1,183 @@
+"""
+Full-text search for job listings.
+
+PostgreSQL keeps a weighted ``tsvector`` column on ``jobs_job`` with a GIN
+index; SQLite keeps an FTS5 table (``jobs_job_fts``) keyed by job id. Both are
+created by migration 0005 and kept in sync from the signals in
+``jobs/signals.py``. Any other database falls back to ``icontains`` filters.
+
+Views only need ``search_jobs(queryset, query)``, which filters the queryset
+to matching jobs and orders them by relevance (``search_rank``, highest first).
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'jobs_job_fts'
+PG_CONFIG = 'english'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _job_document(job):
+    """Return the searchable text fields of a job as a dict."""
+    return {
+        'title': job.title or '',
+        'description': job.description or '',
+        'company_name': job.company.company_name if job.company_id else '',
+        'required_skills': job.required_skills or '',
+    }
+
+
+class BaseJobSearch:
+    vendor = None
+
+    def index_job(self, job):
+        pass
+
+    def remove_job(self, job_id):
+        pass
+
+    def rebuild(self):
+        """Reindex every job. Returns the number of jobs indexed."""
+        from .models import Job
+        count = 0
+        for job in Job.objects.select_related('company').iterator(chunk_size=500):
+            self.index_job(job)
+            count += 1
+        return count
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class FallbackJobSearch(BaseJobSearch):
+    """Substring search for databases without a full-text backend."""
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(company__company_name__icontains=query) |
+            Q(required_skills__icontains=query)
+        )
+
+
+class PostgresJobSearch(BaseJobSearch):
+    vendor = 'postgresql'
+
+    # Title matters most, then skills and company name, then the description.
+    _VECTOR_SQL = (
+        "setweight(to_tsvector('{cfg}', coalesce(%s, '')), 'A') || "
+        "setweight(to_tsvector('{cfg}', coalesce(%s, '')), 'B') || "
+        "setweight(to_tsvector('{cfg}', coalesce(%s, '')), 'B') || "
+        "setweight(to_tsvector('{cfg}', coalesce(%s, '')), 'C')"
+    ).format(cfg=PG_CONFIG)
+
+    def index_job(self, job):
+        doc = _job_document(job)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE jobs_job SET search_vector = {self._VECTOR_SQL} WHERE id = %s",
+                [doc['title'], doc['required_skills'], doc['company_name'],
+                 doc['description'], job.pk],
+            )
+
+    def rebuild(self):
+        # One set-based UPDATE instead of a round trip per job.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE jobs_job AS j SET search_vector = "
+                f"setweight(to_tsvector('{PG_CONFIG}', coalesce(j.title, '')), 'A') || "
+                f"setweight(to_tsvector('{PG_CONFIG}', coalesce(j.required_skills, '')), 'B') || "
+                f"setweight(to_tsvector('{PG_CONFIG}', coalesce(c.company_name, '')), 'B') || "
+                f"setweight(to_tsvector('{PG_CONFIG}', coalesce(j.description, '')), 'C') "
+                "FROM companies_company AS c WHERE c.id = j.company_id"
+            )
+            return cursor.rowcount
+
+    def search(self, queryset, query):
+        tsquery = f"websearch_to_tsquery('{PG_CONFIG}', %s)"
+        return queryset.extra(
+            select={'search_rank': f"ts_rank_cd(jobs_job.search_vector, {tsquery})"},
+            select_params=(query,),
+            where=[f"jobs_job.search_vector @@ {tsquery}"],
+            params=[query],
+        ).order_by('-search_rank', '-created_at')
+
+
+class SQLiteJobSearch(BaseJobSearch):
+    vendor = 'sqlite'
+
+    # bm25() column weights: title, description, company_name, required_skills
+    _BM25 = f"bm25({FTS_TABLE}, 10.0, 1.0, 4.0, 6.0)"
+
+    @staticmethod
+    def build_match(query):
+        """
+        Turn free text into a safe FTS5 MATCH expression.
+        Every word becomes a quoted prefix term, so user input can never be
+        parsed as FTS5 syntax.
+        """
+        tokens = _TOKEN_RE.findall(query)
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def index_job(self, job):
+        doc = _job_document(job)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [job.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description, company_name, required_skills) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [job.pk, doc['title'], doc['description'], doc['company_name'], doc['required_skills']],
+            )
+
+    def remove_job(self, job_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [job_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description, company_name, required_skills) "
+                "SELECT j.id, j.title, j.description, c.company_name, coalesce(j.required_skills, '') "
+                "FROM jobs_job j JOIN companies_company c ON c.id = j.company_id"
+            )
+            return cursor.rowcount
+
+    def search(self, queryset, query):
+        match = self.build_match(query)
+        if not match:
+            return queryset.none()
+        # bm25() is "lower is better", so negate it to share the ordering
+        # convention of ts_rank_cd on PostgreSQL.
+        return queryset.extra(
+            select={'search_rank': (
+                f"SELECT -{self._BM25} FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = jobs_job.id"
+            )},
+            select_params=(match,),
+            where=[f"jobs_job.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)"],
+            params=[match],
+        ).order_by('-search_rank', '-created_at')
+
+
+_BACKENDS = {
+    'postgresql': PostgresJobSearch,
+    'sqlite': SQLiteJobSearch,
+}
+
+
+def get_search_backend():
+    """Return the search backend for the default database connection."""
+    return _BACKENDS.get(connection.vendor, FallbackJobSearch)()
+
+
+def search_jobs(queryset, query):
+    """Filter ``queryset`` to jobs matching ``query``, most relevant first."""
+    query = (query or '').strip()
+    if not query:
+        return queryset
+    return get_search_backend().search(queryset, query)
@@ -0,0 +1,267 @@
+"""
+Synthetic data for load and scale testing (``manage.py seed_portal``).
+
+``seed_portal()`` bulk-creates company and student users, ``Company``,
+``StudentProfile`` (skills, education and projects JSON), ``Job`` and
+``JobApplication`` rows. Everything comes from one ``random.Random(seed)``,
+so the same arguments always produce the same data. Rows go in with
+``bulk_create`` batches and never pass through ``save()``, so the work the
+signals normally do (skill links, application counters, resume reference
+counts, the search index, cache versions) is done once at the end, in bulk.
+
+All seeded users share one password (``SEED_PASSWORD``), hashed once.
+"""
+import json
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from companies.models import Company
+from jobportal import cache
+from .models import Job, JobApplication, JobSkill
+from .resumes import recount_references
+from .search import FallbackJobSearch, get_search_backend
+from .skills import get_or_create_skills, parse_skills
+from .storage import resume_storage
+
+BATCH_SIZE = 2000
+RESUME_FILES = 20
+SEED_PASSWORD = 'seed-pass-123'
+
+SKILLS = [
+    'Python', 'Django', 'JavaScript', 'TypeScript', 'React', 'Vue', 'Angular',
+    'Node.js', 'Express', 'Java', 'Spring', 'Go', 'C++', 'C#', 'SQL',
+    'PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'Docker', 'Kubernetes', 'AWS',
+    'Google Cloud', 'Git', 'Linux', 'HTML', 'CSS', 'Figma', 'Machine Learning',
+    'Pandas', 'Excel', 'Tableau', 'Communication', 'Testing', 'REST APIs',
+]
+CITIES = [
+    'Mumbai', 'Pune', 'Bengaluru', 'Hyderabad', 'Chennai', 'Delhi', 'Noida',
+    'Gurugram', 'Ahmedabad', 'Kolkata', 'Jaipur', 'Kochi', 'Remote',
+]
+ROLES = [
+    'Backend Developer', 'Frontend Developer', 'Full Stack Developer',
+    'Data Analyst', 'Data Scientist', 'DevOps Engineer', 'QA Engineer',
+    'Mobile Developer', 'UI/UX Designer', 'Product Analyst', 'Cloud Engineer',
+    'Machine Learning Engineer', 'Business Analyst', 'Support Engineer',
+]
+LEVELS = ['Junior', 'Associate', 'Senior', 'Lead', 'Trainee', '']
+INDUSTRIES = ['Software', 'Fintech', 'E-commerce', 'Healthcare', 'EdTech', 'Logistics', 'Media']
+COMPANY_SIZES = ['1-10', '11-50', '51-200', '201-500', '500+']
+NAME_PARTS = ['Nova', 'Blue', 'Peak', 'Bright', 'Core', 'Pixel', 'Quantum', 'River',
+              'Stack', 'Summit', 'Vertex', 'Orbit', 'Cedar', 'Signal', 'Harbor']
+NAME_SUFFIXES = ['Labs', 'Systems', 'Technologies', 'Solutions', 'Works', 'Digital']
+FIRST_NAMES = ['Aarav', 'Diya', 'Ishaan', 'Ananya', 'Kabir', 'Meera', 'Rohan',
+               'Saanvi', 'Arjun', 'Kavya', 'Vihaan', 'Nisha', 'Aditya', 'Priya']
+LAST_NAMES = ['Sharma', 'Patel', 'Iyer', 'Reddy', 'Gupta', 'Nair', 'Mehta',
+              'Das', 'Joshi', 'Khan', 'Singh', 'Rao', 'Kulkarni', 'Bose']
+COLLEGES = ['IIT Bombay', 'NIT Trichy', 'BITS Pilani', 'VIT Vellore',
+            'COEP Pune', 'Anna University', 'Delhi University', 'Manipal Institute']
+DEGREES = ['B.Tech Computer Science', 'B.E. Information Technology', 'BCA',
+           'MCA', 'B.Sc Data Science', 'M.Tech Software Engineering']
+# Weights roughly match a live portal: most applications are never reviewed.
+STATUS_WEIGHTS = {'pending': 50, 'shortlisted': 20, 'interviewed': 10, 'rejected': 15, 'hired': 5}
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bulk_create(model, rows, batch_size):
+    """bulk_create a (lazy) iterable of rows; returns the created objects' pks."""
+    pks = []
+    for batch in _batches(rows, batch_size):
+        pks.extend(obj.pk for obj in model.objects.bulk_create(batch))
+    return pks
+
+
+def _bulk_insert(model, rows, batch_size):
+    """Like _bulk_create, but only counts the rows (no pks kept in memory)."""
+    count = 0
+    for batch in _batches(rows, batch_size):
+        model.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def _write_resumes(prefix, count):
+    """Store ``count`` stub PDFs (existing ones are reused) and return their names."""
+    names = []
+    for n in range(count):
+        content = f'%PDF-1.4\n% {prefix} stub resume {n}\n%%EOF\n'.encode()
+        names.append(resume_storage.save(f'{prefix}-{n}.pdf', ContentFile(content)))
+    return names
+
+
+def seed_portal(companies, jobs, students, applications, seed=0, prefix='seed',
+                batch_size=BATCH_SIZE, resume_files=RESUME_FILES, progress=None):
+    """
+    Create the requested number of rows and return a dict of counts.
+
+    Usernames are ``<prefix>_company_<n>`` and ``<prefix>_student_<n>``; a
+    prefix can only be seeded once. Each student applies to a distinct set of
+    jobs, so ``applications`` may not exceed ``students * jobs``.
+    """
+    if companies < 1 and jobs:
+        raise ValueError("Jobs need at least one company.")
+    if applications > students * jobs:
+        raise ValueError(f"At most {students * jobs} unique applications fit "
+                         f"{students} student(s) and {jobs} job(s).")
+    if User.objects.filter(username__startswith=f'{prefix}_').exists():
+        raise ValueError(f"Users with the prefix '{prefix}_' already exist; pick another --prefix.")
+
+    rng = random.Random(seed)
+    today = timezone.now().date()
+    password = make_password(SEED_PASSWORD)
+    report = progress or (lambda message: None)
+
+    skill_rows = {skill.name: skill.pk for skill in get_or_create_skills(parse_skills(', '.join(SKILLS)))}
+    skill_names = list(skill_rows)
+
+    with transaction.atomic():
+        # ── companies ──
+        user_ids = _bulk_create(User, (
+            User(username=f'{prefix}_company_{n}', email=f'{prefix}_company_{n}@example.com',
+                 password=password)
+            for n in range(companies)
+        ), batch_size)
+        company_ids = _bulk_create(Company, (
+            Company(
+                user_id=user_id,
+                company_name=f'{rng.choice(NAME_PARTS)} {rng.choice(NAME_SUFFIXES)} {n}',
+                description='We build products people rely on every day.',
+                location=rng.choice(CITIES),
+                industry=rng.choice(INDUSTRIES),
+                company_size=rng.choice(COMPANY_SIZES),
+                founded_year=rng.randint(1990, today.year),
+            )
+            for n, user_id in enumerate(user_ids)
+        ), batch_size)
+        report(f"Created {len(company_ids)} companies.")
+
+        # ── jobs ──
+        job_skills = []
+
+        def job_rows():
+            for n in range(jobs):
+                skills = rng.sample(skill_names, rng.randint(3, 6))
+                deadline = today + timedelta(days=rng.randint(-30, 90))
+                salary_min = rng.randrange(200000, 1500000, 50000)
+                job_skills.append(skills)
+                yield Job(
+                    company_id=company_ids[n % len(company_ids)],
+                    title=f'{rng.choice(LEVELS)} {rng.choice(ROLES)}'.strip(),
+                    description=f"Work with {', '.join(skills[:3])} on a small product team.",
+                    location=rng.choice(CITIES),
+                    deadline=deadline,
+                    salary_min=salary_min,
+                    salary_max=salary_min + rng.randrange(100000, 800000, 50000),
+                    requirements='Strong fundamentals and a willingness to learn.',
+                    required_skills=', '.join(skills),
+                    job_type=rng.choice(Job.JOB_TYPE_CHOICES)[0],
+                    # Past deadlines are closed, like Job.save() would do.
+                    is_active=deadline >= today and rng.random() > 0.05,
+                    experience_required=f'{rng.randint(0, 5)}+ years',
+                    positions_available=rng.randint(1, 5),
+                )
+        job_ids = _bulk_create(Job, job_rows(), batch_size)
+        _bulk_insert(JobSkill, (
+            JobSkill(job_id=job_id, skill_id=skill_rows[name])
+            for job_id, skills in zip(job_ids, job_skills) for name in skills
+        ), batch_size)
+        report(f"Created {len(job_ids)} jobs.")
+
+        # ── students ──
+        from students.models import StudentProfile, StudentSkill
+
+        student_ids = _bulk_create(User, (
+            User(username=f'{prefix}_student_{n}', email=f'{prefix}_student_{n}@example.com',
+                 first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                 password=password)
+            for n in range(students)
+        ), batch_size)
+        profile_skills = []
+
+        def profile_rows():
+            for user_id in student_ids:
+                skills = rng.sample(skill_names, rng.randint(3, 8))
+                graduation_year = today.year + rng.randint(-2, 3)
+                college, degree = rng.choice(COLLEGES), rng.choice(DEGREES)
+                profile_skills.append(skills)
+                yield StudentProfile(
+                    user_id=user_id,
+                    location=rng.choice(CITIES) if rng.random() > 0.1 else None,
+                    college_name=college,
+                    degree=degree,
+                    graduation_year=graduation_year,
+                    gpa=Decimal(rng.randint(550, 1000)) / 100,
+                    bio='Student looking for the next challenge.',
+                    skills=', '.join(skills),
+                    education=json.dumps([{
+                        'degree': degree, 'institute': college,
+                        'start_year': str(graduation_year - 4), 'end_year': str(graduation_year),
+                        'cgpa': '', 'description': '',
+                    }]),
+                    projects=json.dumps([
+                        {'title': f'{skill} project', 'description': f'A side project built with {skill}.'}
+                        for skill in skills[:rng.randint(1, 3)]
+                    ]),
+                )
+        profile_ids = _bulk_create(StudentProfile, profile_rows(), batch_size)
+        _bulk_insert(StudentSkill, (
+            StudentSkill(profile_id=profile_id, skill_id=skill_rows[name])
+            for profile_id, skills in zip(profile_ids, profile_skills) for name in skills
+        ), batch_size)
+        report(f"Created {len(profile_ids)} students.")
+
+        # ── applications ──
+        resumes = _write_resumes(prefix, max(resume_files, 1)) if applications else []
+        statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+
+        def application_rows():
+            # Spread the applications evenly over the students; each one picks
+            # distinct jobs, which keeps (student, job) unique.
+            per_student, extra = divmod(applications, students) if students else (0, 0)
+            for n, student_id in enumerate(student_ids):
+                count = per_student + (n < extra)
+                for index in rng.sample(range(len(job_ids)), count):
+                    yield JobApplication(
+                        student_id=student_id,
+                        job_id=job_ids[index],
+                        cover_letter='I would love to join your team.',
+                        resume=resumes[(n + index) % len(resumes)],
+                        status=rng.choices(statuses, weights)[0],
+                    )
+        application_count = _bulk_insert(JobApplication, application_rows(), batch_size)
+        report(f"Created {application_count} applications.")
+
+        # ── what the signals would have done ──
+        if job_ids:
+            Job.objects.filter(pk__gte=min(job_ids), pk__lte=max(job_ids)).refresh_application_counts()
+        if resumes:
+            recount_references(resumes)
+
+    backend = get_search_backend()
+    if job_ids and not isinstance(backend, FallbackJobSearch):
+        backend.rebuild()
+    cache.bump_namespace(cache.JOBS, cache.COMPANIES, cache.APPLICATIONS)
+
+    return {
+        'companies': len(company_ids),
+        'jobs': len(job_ids),
+        'students': len(profile_ids),
+        'applications': application_count,
+    }
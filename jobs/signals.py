@@ -0,0 +1,141 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from companies.models import Company
+from jobportal import cache
+from . import resumes
+from .models import APPLICATION_STATUSES, Job, JobApplication, status_counter_field
+from .search import get_search_backend
+from .skills import sync_job_skills
+
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, raw=False, **kwargs):
+    """Keep the full-text index in step with every Job.save()."""
+    if raw:
+        return
+    get_search_backend().index_job(instance)
+
+
+@receiver(post_init, sender=Job)
+def remember_required_skills(sender, instance, **kwargs):
+    instance._synced_required_skills = instance.__dict__.get('required_skills')
+
+
+@receiver(post_save, sender=Job)
+def sync_required_skills(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else instance._synced_required_skills
+    if (instance.required_skills or None) != (previous or None):
+        sync_job_skills(instance)
+        instance._synced_required_skills = instance.required_skills
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    get_search_backend().remove_job(instance.pk)
+
+
+@receiver(post_init, sender=Company)
+def remember_company_name(sender, instance, **kwargs):
+    instance._indexed_company_name = instance.company_name
+
+
+@receiver(post_save, sender=Company)
+def reindex_company_jobs(sender, instance, created=False, raw=False, **kwargs):
+    """The company name is part of each job's document, so reindex its jobs."""
+    if created or raw or instance.company_name == instance._indexed_company_name:
+        return
+    backend = get_search_backend()
+    for job in instance.jobs.select_related('company'):
+        backend.index_job(job)
+    instance._indexed_company_name = instance.company_name
+
+
+# ── application counters ─────────────────────────────────────────────────
+def _adjust_counters(job_id, total=0, **status_deltas):
+    """Apply counter deltas with F() expressions so concurrent writers can't lose updates."""
+    changes = {}
+    if total:
+        changes['applications_count'] = Greatest(F('applications_count') + total, 0)
+    for status, delta in status_deltas.items():
+        if status in APPLICATION_STATUSES and delta:
+            field = status_counter_field(status)
+            changes[field] = Greatest(F(field) + delta, 0)
+    if changes:
+        Job.objects.filter(pk=job_id).update(**changes)
+
+
+@receiver(post_init, sender=JobApplication)
+def remember_application_status(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred status field isn't fetched here.
+    instance._counted_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=JobApplication)
+def count_saved_application(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance._counted_status
+    if created:
+        _adjust_counters(instance.job_id, total=1, **{instance.status: 1})
+    elif previous is not None and previous != instance.status:
+        _adjust_counters(instance.job_id, **{previous: -1, instance.status: 1})
+    instance._counted_status = instance.status
+
+
+@receiver(post_delete, sender=JobApplication)
+def count_deleted_application(sender, instance, **kwargs):
+    status = instance._counted_status or instance.status
+    _adjust_counters(instance.job_id, total=-1, **{status: -1})
+
+
+# ── resume references ────────────────────────────────────────────────────
+@receiver(post_init, sender=JobApplication)
+def remember_application_resume(sender, instance, **kwargs):
+    instance._stored_resume = resumes.stored_name(instance.__dict__.get('resume'))
+
+
+@receiver(pre_save, sender=JobApplication)
+def remember_application_upload(sender, instance, **kwargs):
+    instance._resume_upload = resumes.pending_upload(instance.resume)
+
+
+@receiver(post_save, sender=JobApplication)
+def count_application_resume(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    resumes.replace(None if created else instance._stored_resume, instance.resume.name,
+                    instance._resume_upload)
+    instance._stored_resume = instance.resume.name
+    instance._resume_upload = None
+
+
+@receiver(post_delete, sender=JobApplication)
+def release_application_resume(sender, instance, **kwargs):
+    resumes.release(instance._stored_resume)
+
+
+# ── cache invalidation ───────────────────────────────────────────────────
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_caches(sender, **kwargs):
+    cache.bump_namespace(cache.JOBS)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_caches(sender, **kwargs):
+    # Job listings show the company name and logo too.
+    cache.bump_namespace(cache.COMPANIES, cache.JOBS)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_application_caches(sender, **kwargs):
+    # Job listings are left alone: only their applicant counts change, and
+    # JobQuerySet.update() doesn't invalidate them for counter moves.
+    cache.bump_namespace(cache.APPLICATIONS)
@@ -0,0 +1,147 @@
+"""
+Canonical skill index shared by jobs and student profiles.
+
+``Job.required_skills`` and ``StudentProfile.skills`` stay free-text,
+comma-separated strings (that is what the forms and AJAX endpoints edit), but
+every save also syncs them into ``Skill`` rows through ``JobSkill`` /
+``StudentSkill``. Names are matched case-insensitively and through ``ALIASES``,
+so "JS", "javascript" and "Java Script" all land on the same Skill.
+"""
+import re
+
+# normalized spelling -> canonical key
+ALIASES = {
+    'js': 'javascript',
+    'java script': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'python 3': 'python',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'react js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'node js': 'node.js',
+    'expressjs': 'express',
+    'express.js': 'express',
+    'postgres': 'postgresql',
+    'postgre sql': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'mysql db': 'mysql',
+    'golang': 'go',
+    'cpp': 'c++',
+    'c plus plus': 'c++',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'k8s': 'kubernetes',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'drf': 'django rest framework',
+    'html5': 'html',
+    'css3': 'css',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+}
+
+# canonical key -> display name, for keys whose title-case would look wrong
+DISPLAY_NAMES = {
+    'javascript': 'JavaScript',
+    'typescript': 'TypeScript',
+    'node.js': 'Node.js',
+    'postgresql': 'PostgreSQL',
+    'mongodb': 'MongoDB',
+    'mysql': 'MySQL',
+    'c++': 'C++',
+    'c#': 'C#',
+    'html': 'HTML',
+    'css': 'CSS',
+    'aws': 'AWS',
+    'sql': 'SQL',
+    'php': 'PHP',
+    'django rest framework': 'Django REST Framework',
+    'github': 'GitHub',
+}
+
+SKILL_KEY_MAX_LENGTH = 100
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def skill_key(name):
+    """Return the canonical lookup key for a skill name ('' if it is blank)."""
+    key = _WHITESPACE_RE.sub(' ', str(name or '')).strip().strip('.,;').lower()
+    key = ALIASES.get(key, key)
+    return key[:SKILL_KEY_MAX_LENGTH]
+
+
+def display_name(key, original=''):
+    """Pick how a new Skill is shown: known spelling, the user's casing, or title case."""
+    if key in DISPLAY_NAMES:
+        return DISPLAY_NAMES[key]
+    original = _WHITESPACE_RE.sub(' ', str(original or '')).strip()
+    if original.lower() == key and not original.islower():
+        return original
+    return key.title()
+
+
+def parse_skills(text):
+    """
+    Split a comma-separated skills string into ``[(key, display), ...]``,
+    de-duplicated in first-seen order. Understands the legacy "name||percent"
+    entries written by StudentProfile.
+    """
+    seen = {}
+    for item in (text or '').split(','):
+        name = item.split('||', 1)[0]
+        key = skill_key(name)
+        if key and key not in seen:
+            seen[key] = display_name(key, name)
+    return list(seen.items())
+
+
+def get_or_create_skills(parsed):
+    """Return Skill rows for ``[(key, display), ...]``, creating missing ones in bulk."""
+    from .models import Skill
+
+    if not parsed:
+        return []
+    keys = [key for key, _ in parsed]
+    existing = {skill.slug: skill for skill in Skill.objects.filter(slug__in=keys)}
+    missing = [Skill(slug=key, name=name) for key, name in parsed if key not in existing]
+    if missing:
+        Skill.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update(
+            (skill.slug, skill)
+            for skill in Skill.objects.filter(slug__in=[skill.slug for skill in missing])
+        )
+    return [existing[key] for key in keys]
+
+
+def _sync(through_model, owner_field, owner_id, text):
+    wanted = {skill.pk for skill in get_or_create_skills(parse_skills(text))}
+    links = through_model.objects.filter(**{owner_field: owner_id})
+    current = set(links.values_list('skill_id', flat=True))
+    if current - wanted:
+        links.filter(skill_id__in=current - wanted).delete()
+    if wanted - current:
+        through_model.objects.bulk_create(
+            [through_model(**{owner_field: owner_id, 'skill_id': skill_id})
+             for skill_id in wanted - current],
+            ignore_conflicts=True,
+        )
+
+
+def sync_job_skills(job):
+    from .models import JobSkill
+    _sync(JobSkill, 'job_id', job.pk, job.required_skills)
+
+
+def sync_student_skills(profile):
+    from students.models import StudentSkill
+    _sync(StudentSkill, 'profile_id', profile.pk, profile.skills)
@@ -0,0 +1,80 @@
+"""
+Content-addressed file storage for resumes.
+
+``resume_storage`` names every file after the SHA-256 of its bytes:
+``resumes/sha256/ab/abcd....pdf``. Saving a file that is already stored
+writes nothing and returns the existing name, so a student applying to
+twenty jobs with the same CV leaves one file behind, not twenty-one.
+Reference counting lives in jobs/resumes.py.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+from .uploads import DOC, DOCX, PDF, SNIFF_BYTES, sniff_type
+
+BLOB_DIR = 'resumes/sha256'
+EXTENSIONS = {PDF: '.pdf', DOC: '.doc', DOCX: '.docx'}
+
+_BLOB_NAME_RE = re.compile(rf'^{re.escape(BLOB_DIR)}/[0-9a-f]{{2}}/([0-9a-f]{{64}})(\.\w+)?$')
+
+
+def digest_of(name):
+    """SHA-256 a blob name was derived from, or None for any other name."""
+    match = _BLOB_NAME_RE.match(name or '')
+    return match.group(1) if match else None
+
+
+def content_digest(content):
+    """Hex SHA-256 of a file; streamed uploads already carry it (jobs/uploads.py)."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+@deconstructible
+class ResumeStorage(FileSystemStorage):
+    """MEDIA_ROOT storage that files each resume under the SHA-256 of its bytes."""
+
+    def blob_name(self, content, name=''):
+        digest = content_digest(content)
+        content.seek(0)
+        extension = EXTENSIONS.get(sniff_type(content.read(SNIFF_BYTES)))
+        content.seek(0)
+        if extension is None:
+            extension = os.path.splitext(name or '')[1].lower()[:10]
+        return f'{BLOB_DIR}/{digest[:2]}/{digest}{extension}'
+
+    def get_available_name(self, name, max_length=None):
+        # Same name means same bytes, so an existing file is the one we want.
+        if digest_of(name) and self.exists(name):
+            raise FileExistsError(name)
+        return super().get_available_name(name, max_length)
+
+    def _save(self, name, content):
+        if hasattr(content, 'temporary_file_path'):
+            # Copied, not moved: acquire() (jobs/resumes.py) writes the upload
+            # again if the blob is deleted before the new row is counted.
+            content = File(content.file, content.name)
+        return super()._save(name, content)
+
+    def save(self, name, content, max_length=None):
+        name = self.blob_name(content, name or getattr(content, 'name', ''))
+        try:
+            return super().save(name, content, max_length)
+        except FileExistsError:
+            # Stored already, possibly by a concurrent request a moment ago.
+            return name
+
+
+resume_storage = ResumeStorage()
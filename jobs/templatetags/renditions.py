@@ -0,0 +1,50 @@
+"""
+``{% responsive_image %}``: serve an avatar or logo from its renditions.
+
+    {% load renditions %}
+    {% responsive_image company.logo company.renditions 50 alt=company.company_name class="logo" %}
+
+renders a ``<picture>`` whose WebP ``<source>`` and JPEG ``<img>`` offer the
+smallest rendition covering ``size`` CSS px (1x) and twice that (2x). Images
+without renditions (not processed yet) fall back to a plain ``<img>`` of the
+original.
+"""
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from jobportal.renditions import image_url
+
+register = template.Library()
+
+
+def pick_rendition(renditions, pixels):
+    """The smallest rendition at least ``pixels`` wide, else the largest one."""
+    sizes = sorted(renditions, key=int)
+    for size in sizes:
+        if int(size) >= pixels:
+            return renditions[size]
+    return renditions[sizes[-1]]
+
+
+def srcset(renditions, size, key):
+    one_x = pick_rendition(renditions, size)[key]
+    two_x = pick_rendition(renditions, size * 2)[key]
+    if two_x == one_x:
+        return one_x
+    return f'{one_x} 1x, {two_x} 2x'
+
+
+@register.simple_tag
+def responsive_image(image, renditions, size, **attrs):
+    """``image`` is the ImageField, ``size`` its displayed width in CSS px; ``attrs`` go on the ``<img>``."""
+    attributes = format_html_join('', ' {}="{}"', attrs.items())
+    if not renditions:
+        return format_html('<img src="{}"{}>', image_url(image), attributes)
+    size = int(size)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}"><img src="{}" srcset="{}"{}></picture>',
+        srcset(renditions, size, 'webp'),
+        pick_rendition(renditions, size)['jpeg'],
+        srcset(renditions, size, 'jpeg'),
+        attributes,
+    )
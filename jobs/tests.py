@@ -1,3 +1,1158 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import io
+import os
+import subprocess
+import zipfile
+import sys
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+import fakeredis
+import numpy as np
+from PIL import Image
+from prometheus_client import REGISTRY
+
+from companies.models import Company
+from jobportal import cache, instrumentation, metrics, profiling, renditions, slow_queries
+from students.models import StudentProfile
+
+from . import resumes
+from .matching import WEIGHTS, JobFeatures, ProfileFeatures, match_matrix, score_pairs
+from .models import APPLICATION_STATUSES, Job, JobApplication, ResumeBlob, Skill
+from .pagination import KeysetPaginator, approximate_count
+from .query_plans import explain, full_scans
+from .search import SQLiteJobSearch, search_jobs
+from .skills import parse_skills, skill_key
+from .storage import digest_of, resume_storage
+from .uploads import DOCX, PDF, SIZE_ERROR, TYPE_ERROR, ResumeUploadedFile, detect_resume_type
+
+
+def make_company(username='acme', name='Acme Corp'):
+    user = User.objects.create_user(username=username, password='pass12345')
+    return Company.objects.create(user=user, company_name=name)
+
+
+def make_job(company, **fields):
+    defaults = {
+        'title': 'Backend Developer',
+        'description': 'Build APIs.',
+        'location': 'Pune',
+        'deadline': timezone.now().date() + timedelta(days=30),
+        'is_active': True,
+    }
+    defaults.update(fields)
+    return Job.objects.create(company=company, **defaults)
+
+
+class JobSearchTests(TestCase):
+    def setUp(self):
+        self.company = make_company()
+
+    def test_ranks_title_match_above_description_match(self):
+        in_description = make_job(self.company, title='Data Analyst',
+                                  description='Some Python scripting required.')
+        in_title = make_job(self.company, title='Python Engineer', description='Build services.')
+        make_job(self.company, title='Designer', description='Figma all day.')
+
+        results = list(search_jobs(Job.objects.all(), 'python'))
+
+        self.assertEqual(results, [in_title, in_description])
+
+    def test_index_follows_save_and_delete(self):
+        job = make_job(self.company, title='Golang Developer')
+        self.assertEqual(list(search_jobs(Job.objects.all(), 'golang')), [job])
+
+        job.title = 'Rust Developer'
+        job.save()
+        self.assertFalse(search_jobs(Job.objects.all(), 'golang').exists())
+        self.assertEqual(list(search_jobs(Job.objects.all(), 'rust')), [job])
+
+        job.delete()
+        self.assertFalse(search_jobs(Job.objects.all(), 'rust').exists())
+
+    def test_search_page_renders_paginated_results(self):
+        match = make_job(self.company, title='Python Engineer')
+        make_job(self.company, title='Designer')
+
+        response = self.client.get(reverse('jobs:job_search'), {'q': 'python'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['jobs']), [match])
+        self.assertEqual(response.context['search_query'], 'python')
+
+    def test_company_rename_reindexes_jobs(self):
+        job = make_job(self.company)
+        self.company.company_name = 'Globex'
+        self.company.save()
+
+        self.assertEqual(list(search_jobs(Job.objects.all(), 'globex')), [job])
+
+    def test_match_expression_escapes_fts_syntax(self):
+        self.assertEqual(SQLiteJobSearch.build_match('c++ "OR" NEAR('), '"c"* "OR"* "NEAR"*')
+        self.assertFalse(search_jobs(Job.objects.all(), '!!!').exists())
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        company = make_company()
+        self.jobs = [make_job(company, title=f'Job {i}') for i in range(7)]
+        # Newest first, as the listing shows them.
+        self.jobs.reverse()
+
+    def test_walks_forward_and_back_with_cursors(self):
+        paginator = KeysetPaginator(Job.objects.all(), 3)
+
+        first = paginator.get_page(None)
+        self.assertEqual(first.object_list, self.jobs[0:3])
+        self.assertTrue(first.has_next())
+        self.assertFalse(first.has_previous())
+
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual(second.object_list, self.jobs[3:6])
+
+        last = paginator.get_page(second.next_cursor)
+        self.assertEqual(last.object_list, self.jobs[6:7])
+        self.assertFalse(last.has_next())
+
+        back = paginator.get_page(last.previous_cursor)
+        self.assertEqual(back.object_list, self.jobs[3:6])
+        back = paginator.get_page(back.previous_cursor)
+        self.assertEqual(back.object_list, self.jobs[0:3])
+        self.assertFalse(back.has_previous())
+
+    def test_ties_on_created_at_are_broken_by_id(self):
+        Job.objects.update(created_at=timezone.now())
+        paginator = KeysetPaginator(Job.objects.all(), 4)
+        first = paginator.get_page(None)
+        second = paginator.get_page(first.next_cursor)
+        seen = [job.pk for job in first] + [job.pk for job in second]
+        self.assertEqual(sorted(seen, reverse=True), seen)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        page = KeysetPaginator(Job.objects.all(), 3).get_page('not-a-cursor')
+        self.assertEqual(page.object_list, self.jobs[0:3])
+
+    def test_approximate_count_caps_large_results(self):
+        self.assertEqual(approximate_count(Job.objects.all(), cap=5), (5, True))
+        self.assertEqual(approximate_count(Job.objects.all(), cap=50), (7, False))
+
+
+class ApplicationCounterTests(TestCase):
+    def setUp(self):
+        self.company = make_company()
+        self.job = make_job(self.company)
+        self.other_job = make_job(self.company, title='Frontend Developer')
+
+    def apply(self, username, job=None, **fields):
+        student = User.objects.create_user(username=username)
+        return JobApplication.objects.create(
+            student=student, job=job or self.job, cover_letter='Hire me please.',
+            resume='applications/resumes/cv.pdf', **fields
+        )
+
+    def counters(self, job=None):
+        job = Job.objects.get(pk=(job or self.job).pk)
+        return {field: getattr(job, field) for field in Job.COUNTER_FIELDS if getattr(job, field)}
+
+    def test_create_status_change_and_delete(self):
+        first = self.apply('ann')
+        self.apply('bob', status='hired')
+        self.assertEqual(self.counters(), {'applications_count': 2, 'pending_count': 1, 'hired_count': 1})
+
+        first.status = 'shortlisted'
+        first.save()
+        self.assertEqual(self.counters(),
+                         {'applications_count': 2, 'shortlisted_count': 1, 'hired_count': 1})
+
+        first.delete()
+        self.assertEqual(self.counters(), {'applications_count': 1, 'hired_count': 1})
+
+    def test_queryset_update_recounts_touched_jobs(self):
+        self.apply('ann')
+        self.apply('bob')
+        self.apply('cat', job=self.other_job)
+
+        JobApplication.objects.filter(job__company=self.company).update(status='rejected')
+
+        self.assertEqual(self.counters(), {'applications_count': 2, 'rejected_count': 2})
+        self.assertEqual(self.counters(self.other_job), {'applications_count': 1, 'rejected_count': 1})
+
+    def test_stale_job_save_keeps_counters(self):
+        stale = Job.objects.get(pk=self.job.pk)
+        self.apply('ann')
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(self.counters(), {'applications_count': 1, 'pending_count': 1})
+
+    def test_saving_a_deleted_job_inserts_it_again(self):
+        job = Job.objects.get(pk=self.job.pk)
+        Job.objects.filter(pk=job.pk).delete()
+        job.title = 'Back again'
+        job.save()
+        self.assertEqual(Job.objects.get(pk=job.pk).title, 'Back again')
+
+    def test_recount_command_repairs_drift(self):
+        self.apply('ann')
+        Job.objects.filter(pk=self.job.pk).update(applications_count=9, pending_count=0)
+        self.assertEqual(list(Job.objects.with_counter_drift()), [self.job])
+
+        call_command('recount_applications', stdout=StringIO())
+
+        self.assertFalse(Job.objects.with_counter_drift().exists())
+        self.assertEqual(self.counters(), {'applications_count': 1, 'pending_count': 1})
+
+
+class SkillIndexTests(TestCase):
+    def test_parse_normalizes_case_aliases_and_duplicates(self):
+        self.assertEqual(
+            parse_skills('JS, javascript , React.js,, python||80, Machine  learning'),
+            [('javascript', 'JavaScript'), ('react', 'React'), ('python', 'Python'),
+             ('machine learning', 'Machine learning')],
+        )
+
+    def test_job_save_syncs_normalized_skills(self):
+        job = make_job(make_company(), required_skills='Python, Django, js')
+        self.assertEqual(sorted(job.normalized_skills.values_list('slug', flat=True)),
+                         ['django', 'javascript', 'python'])
+
+        job.required_skills = 'Python, Postgres'
+        job.save()
+        self.assertEqual(sorted(job.normalized_skills.values_list('slug', flat=True)),
+                         ['postgresql', 'python'])
+        self.assertEqual(Skill.objects.filter(slug='python').count(), 1)
+
+    def test_skill_filter_is_a_join(self):
+        company = make_company()
+        react_job = make_job(company, required_skills='ReactJS, CSS')
+        make_job(company, required_skills='Java')
+        self.assertEqual(list(Job.objects.filter(skill_links__skill__slug=skill_key('react'))),
+                         [react_job])
+
+
+class MatchScoringTests(TestCase):
+    def setUp(self):
+        self.company = make_company()
+        self.today = timezone.now().date().replace(month=6, day=1)
+
+    def profile(self, username, **fields):
+        from students.models import StudentProfile
+        return StudentProfile.objects.create(user=User.objects.create_user(username=username), **fields)
+
+    def test_skill_coverage_drives_the_score(self):
+        job = make_job(self.company, required_skills='Python, Django, PostgreSQL, Docker')
+        full = self.profile('full', skills='python, django, postgres, docker, react')
+        half = self.profile('half', skills='JS, Python, Django')
+        none = self.profile('none', skills='Excel')
+
+        scores = score_pairs([(job.pk, full.pk), (job.pk, half.pk), (job.pk, none.pk)], today=self.today)
+
+        # Only skills differ, so the gaps are the skills weight times the coverage gap.
+        self.assertAlmostEqual(scores[0] - scores[1], WEIGHTS['skills'] * 0.5)
+        self.assertAlmostEqual(scores[1] - scores[2], WEIGHTS['skills'] * 0.5)
+
+    def test_profile_features(self):
+        job = make_job(self.company, location='Pune, MH', job_type='full_time')
+        year = self.today.year
+        strong = self.profile('strong', gpa=9.0, graduation_year=year, location='pune')
+        weak = self.profile('weak', gpa=2.0, graduation_year=year + 2, location='Delhi')
+
+        scores = score_pairs([(job.pk, strong.pk), (job.pk, weak.pk), (job.pk, None)], today=self.today)
+
+        neutral = WEIGHTS['skills'] * 0.5
+        self.assertAlmostEqual(scores[0], neutral + WEIGHTS['gpa'] * 0.9 + WEIGHTS['grad'] + WEIGHTS['location'])
+        self.assertAlmostEqual(scores[1], neutral + WEIGHTS['gpa'] * 0.5 + WEIGHTS['grad'] * 0.5)
+        self.assertAlmostEqual(scores[2], 0.5)  # no profile: every feature is neutral
+
+    def test_internships_prefer_current_students(self):
+        year = self.today.year
+        internship = make_job(self.company, job_type='internship')
+        full_time = make_job(self.company, job_type='full_time')
+        studying = self.profile('studying', graduation_year=year + 1)
+
+        scores = score_pairs([(internship.pk, studying.pk), (full_time.pk, studying.pk)], today=self.today)
+        self.assertGreater(scores[0], scores[1])
+
+    def test_matrix_agrees_with_pairs(self):
+        jobs = [make_job(self.company, required_skills=skills, location=location)
+                for skills, location in [('Python, Django', 'Pune'), ('Figma', 'Remote'), ('', 'Delhi')]]
+        profiles = [self.profile('ann', skills='python, react', location='Pune', gpa=3.2),
+                    self.profile('bob', skills='figma', graduation_year=self.today.year)]
+        profile_features = ProfileFeatures([profile.pk for profile in profiles])
+        job_features = JobFeatures([job.pk for job in jobs])
+
+        scores = match_matrix(profile_features, job_features, today=self.today)
+
+        # Rows and columns follow the features' owner_ids
+        pairs = [(job_id, profile_id) for profile_id in profile_features.skills.owner_ids
+                 for job_id in job_features.skills.owner_ids]
+        self.assertEqual(scores.shape, (2, 3))
+        np.testing.assert_allclose(scores.ravel(), score_pairs(pairs, today=self.today))
+
+
+class CacheLayerTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.company = make_company()
+
+    def test_cached_queryset_is_served_until_invalidated(self):
+        make_job(self.company, title='First')
+        jobs = Job.objects.order_by('title')
+        self.assertEqual([job.title for job in cache.cached_queryset(cache.JOBS, ['all'], jobs)], ['First'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(cache.cached_queryset(cache.JOBS, ['all'], jobs)), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.filter(title='First').update(title='Renamed')  # bulk update still invalidates
+        self.assertEqual([job.title for job in cache.cached_queryset(cache.JOBS, ['all'], jobs)], ['Renamed'])
+
+        with self.assertNumQueries(0):
+            cache.cached_queryset(cache.JOBS, ['all'], jobs)
+
+    def test_saves_and_deletes_bump_the_right_namespaces(self):
+        versions = lambda: {ns: cache.namespace_version(ns)
+                            for ns in (cache.JOBS, cache.COMPANIES, cache.APPLICATIONS)}
+        before = versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            job = make_job(self.company)
+        after_job = versions()
+        self.assertGreater(after_job[cache.JOBS], before[cache.JOBS])
+        self.assertEqual(after_job[cache.COMPANIES], before[cache.COMPANIES])
+
+        self.company.company_name = 'Acme Inc'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company.save()
+        after_company = versions()
+        self.assertGreater(after_company[cache.COMPANIES], after_job[cache.COMPANIES])
+        self.assertGreater(after_company[cache.JOBS], after_job[cache.JOBS])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            application = JobApplication.objects.create(
+                student=User.objects.create_user(username='ann'), job=job,
+                cover_letter='Hi', resume='applications/resumes/cv.pdf')
+        after_apply = versions()
+        self.assertGreater(after_apply[cache.APPLICATIONS], after_company[cache.APPLICATIONS])
+        # Counter moves don't retire every cached listing
+        self.assertEqual(after_apply[cache.JOBS], after_company[cache.JOBS])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            application.delete()
+        self.assertGreater(versions()[cache.APPLICATIONS], after_apply[cache.APPLICATIONS])
+
+    def test_main_page_reads_listings_from_cache(self):
+        make_job(self.company, title='Cached Job')
+        self.client.get('/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/')
+        self.assertContains(response, 'Cached Job')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_job(self.company, title='Fresh Job')
+        self.assertContains(self.client.get('/'), 'Fresh Job')
+
+    def test_bumps_wait_for_the_transaction_to_commit(self):
+        version = cache.listing_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            make_job(self.company, title='Uncommitted')
+            # A reader now would still cache under the old version
+            self.assertEqual(cache.listing_version(), version)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(cache.listing_version(), version)
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.company = make_company()
+        self.job = make_job(self.company, title='Python Engineer')
+        self.list_url = reverse('jobs:job_list')
+
+    def test_job_list_is_cached_per_query_string(self):
+        first = self.client.get(self.list_url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+
+        self.assertEqual(self.client.get(self.list_url, {'location': 'pune'})['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.list_url, {'location': 'pune'})['X-Cache'], 'HIT')
+
+    def test_job_writes_move_the_listing_version(self):
+        detail_url = reverse('jobs:job_detail', args=[self.job.pk])
+        self.client.get(self.list_url)
+        self.client.get(detail_url)
+        version = cache.listing_version()
+
+        self.job.title = 'Senior Python Engineer'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        self.assertGreater(cache.listing_version(), version)
+        listing = self.client.get(self.list_url)
+        self.assertEqual(listing['X-Cache'], 'MISS')
+        self.assertContains(listing, 'Senior Python Engineer')
+        self.assertContains(self.client.get(detail_url), 'Senior Python Engineer')
+
+        self.job.is_active = False  # toggled off
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        self.assertEqual(self.client.get(detail_url).status_code, 404)
+
+    def test_logged_in_users_and_pending_messages_skip_the_cache(self):
+        self.client.cookies['messages'] = 'pending'
+        self.assertNotIn('X-Cache', self.client.get(self.list_url))
+        del self.client.cookies['messages']
+
+        self.client.force_login(User.objects.create_user(username='ann'))
+        self.assertNotIn('X-Cache', self.client.get(self.list_url))
+        self.assertNotIn('X-Cache', self.client.get(self.list_url))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.company = make_company()
+        self.job = make_job(self.company)
+        self.detail_url = reverse('jobs:job_detail', args=[self.job.pk])
+        self.list_url = reverse('jobs:job_list')
+
+    def test_job_detail_answers_304_from_its_validators(self):
+        first = self.client.get(self.detail_url)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn('Last-Modified', first)
+
+        with self.assertNumQueries(1):  # the timestamp lookup only
+            revalidated = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], first['ETag'])
+        # updated_at doesn't cover a company rename, so it isn't a validator
+        since = http_date(timezone.now().timestamp() + 60)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+        self.job.description = 'Build better APIs.'
+        self.job.save()
+        changed = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_job_list_etag_follows_listing_version_and_query(self):
+        etag = self.client.get(self.list_url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.list_url, {'search': 'python'},
+                                         HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_job(self.company, title='Another Job')
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_logged_in_pages_get_no_validators(self):
+        self.client.force_login(User.objects.create_user(username='ann'))
+        response = self.client.get(self.detail_url)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+
+class ExpireJobsTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.company = make_company()
+
+    def test_deactivates_expired_jobs_once_and_invalidates_listings(self):
+        open_job = make_job(self.company, title='Open')
+        expired = [make_job(self.company, title=f'Old {n}') for n in range(3)]
+        # Job.save() would close them itself, so backdate the deadline in bulk.
+        Job.objects.filter(pk__in=[job.pk for job in expired]).update(
+            deadline=timezone.now().date() - timedelta(days=1))
+        version = cache.listing_version()
+
+        out = StringIO()
+        call_command('expire_jobs', '--dry-run', stdout=out)
+        self.assertIn('3 expired job(s) would be deactivated', out.getvalue())
+        self.assertEqual(Job.objects.filter(is_active=True).count(), 4)
+
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('expire_jobs', stdout=out)
+        self.assertIn('Deactivated 3 expired job(s); 1 active job(s) remain.', out.getvalue())
+        self.assertEqual(list(Job.objects.filter(is_active=True)), [open_job])
+        self.assertGreater(cache.listing_version(), version)
+
+        out = StringIO()
+        call_command('expire_jobs', stdout=out)
+        self.assertIn('Deactivated 0 expired job(s)', out.getvalue())
+
+
+class SeedPortalTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def seed(self, prefix, seed=7):
+        out = StringIO()
+        call_command('seed_portal', companies=3, jobs=20, students=10, applications=45,
+                     seed=seed, prefix=prefix, batch_size=8, stdout=out)
+        return out.getvalue()
+
+    def test_seeds_consistent_rows(self):
+        from students.models import StudentProfile
+
+        self.assertIn('Seeded 3 companies, 20 jobs, 10 students and 45 applications', self.seed('a'))
+        jobs = Job.objects.filter(company__user__username__startswith='a_')
+        self.assertEqual(jobs.count(), 20)
+        self.assertEqual(JobApplication.objects.count(), 45)
+        # Work normally done by the signals happened in bulk.
+        self.assertFalse(Job.objects.with_counter_drift().exists())
+        self.assertTrue(all(job.normalized_skills.exists() for job in jobs))
+        self.assertTrue(search_jobs(Job.objects.all(), jobs[0].title.split()[-1]).exists())
+        profile = StudentProfile.objects.first()
+        self.assertTrue(profile.get_education_list())
+        self.assertTrue(profile.get_projects_list())
+        self.assertTrue(profile.normalized_skills.exists())
+        resume = JobApplication.objects.first().resume
+        self.assertTrue(resume.storage.exists(resume.name))
+
+    def test_same_seed_gives_same_data(self):
+        self.seed('a')
+        self.seed('b')
+
+        def snapshot(prefix):
+            return list(Job.objects.filter(company__user__username__startswith=prefix)
+                        .order_by('pk').values_list('title', 'required_skills', 'deadline'))
+        self.assertEqual(snapshot('a_'), snapshot('b_'))
+
+    def test_rejects_impossible_or_repeated_runs(self):
+        with self.assertRaisesMessage(CommandError, 'At most 20 unique applications'):
+            call_command('seed_portal', jobs=4, students=5, applications=21, stdout=StringIO())
+        self.seed('a')
+        with self.assertRaisesMessage(CommandError, "prefix 'a_' already exist"):
+            self.seed('a')
+
+
+class QueryPlanTests(TestCase):
+    """
+    Run each view's queries through EXPLAIN on a seeded dataset and fail on
+    any full scan of jobs_job or jobs_jobapplication.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        from students.models import StudentProfile
+
+        companies = [make_company(f'company{n}', f'Company {n}') for n in range(3)]
+        jobs = [
+            make_job(companies[n % 3], title=f'Job {n}', required_skills='Python, Django')
+            for n in range(30)
+        ]
+        cls.students = [User.objects.create_user(username=f'student{n}') for n in range(20)]
+        for n, student in enumerate(cls.students):
+            StudentProfile.objects.create(user=student, skills='python')
+            for job in jobs[n % 10:n % 10 + 4]:
+                JobApplication.objects.create(student=student, job=job, cover_letter='Hi',
+                                              resume='applications/resumes/cv.pdf',
+                                              status=APPLICATION_STATUSES[n % 5])
+        cls.company_user = companies[0].user
+        cls.job = jobs[0]
+
+    def pages(self):
+        job_list = reverse('jobs:job_list')
+        applications = reverse('companies:view_applications')
+        return [
+            (None, reverse('jobs:main')),
+            (None, job_list),
+            (None, f'{job_list}?skill=python'),
+            (None, f'{job_list}?search=job'),
+            (None, reverse('jobs:job_detail', args=[self.job.pk])),
+            (self.company_user, reverse('companies:company_dashboard')),
+            (self.company_user, reverse('companies:manage_jobs')),
+            (self.company_user, applications),
+            (self.company_user, f'{applications}?status_filter=pending'),
+            (self.company_user, f'{applications}?sort=match'),
+            (self.students[0], reverse('students:student_dashboard')),
+            (self.students[0], reverse('students:student_applications')),
+        ]
+
+    def test_views_do_not_scan_large_tables(self):
+        for user, url in self.pages():
+            with self.subTest(url=url):
+                cache.get_cache().clear()
+                self.client.logout()
+                if user:
+                    self.client.force_login(user)
+                with CaptureQueriesContext(connection) as queries:
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+                scans = []
+                for query in queries.captured_queries:
+                    if query['sql'].startswith('SELECT'):
+                        plan = explain(query['sql'], force_indexes=True)
+                        scans += [(line, query['sql']) for line in full_scans(query['sql'], plan)]
+                self.assertEqual(scans, [])
+
+    def test_harness_detects_a_full_scan(self):
+        # Nothing indexes the title, so this has to read the whole table.
+        sql, params = Job.objects.filter(title='Job 1').query.sql_with_params()
+        self.assertTrue(full_scans(sql, explain(sql, params, force_indexes=True)))
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True, INSTRUMENTATION_MAX_QUERIES=100,
+                   INSTRUMENTATION_MAX_MS=60000, INSTRUMENTATION_DUPLICATE_QUERIES=3)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        instrumentation.stats.reset()
+        self.addCleanup(instrumentation.stats.reset)
+        self.company = make_company()
+
+    def stats_for(self, view):
+        return next(row for row in instrumentation.stats.snapshot() if row['view'] == view)
+
+    def test_records_queries_and_timings_per_url_name(self):
+        make_job(self.company)
+        response = self.client.get(reverse('jobs:job_list'))
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        row = self.stats_for('jobs:job_list')
+        self.assertEqual(row['requests'], 1)
+        self.assertEqual(row['flagged'], 0)
+        self.assertGreater(row['queries'], 0)
+        self.assertGreater(row['template_ms'], 0)
+        self.assertEqual(row['bytes'], len(response.content))
+
+    def test_flags_requests_over_the_query_budget(self):
+        with override_settings(INSTRUMENTATION_MAX_QUERIES=0), \
+                self.assertLogs('jobportal.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('jobs:job_list'))
+
+        self.assertIn('(jobs:job_list)', logs.output[0])
+        self.assertEqual(self.stats_for('jobs:job_list')['flagged'], 1)
+
+    def test_detects_repeated_statements(self):
+        jobs = [make_job(self.company, title=f'Job {n}') for n in range(3)]
+        with instrumentation.RequestRecord() as record, \
+                connection.execute_wrapper(instrumentation.record_query):
+            for job in jobs:
+                Job.objects.get(pk=job.pk)
+
+        [(sql, count)] = record.duplicates(3)
+        self.assertEqual(count, 3)
+        self.assertIn('FROM "jobs_job"', sql)
+
+    @override_settings(INSTRUMENTATION_ENABLED=False)
+    def test_disabled_middleware_is_not_loaded(self):
+        response = self.client.get(reverse('jobs:job_list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(instrumentation.stats.snapshot(), [])
+
+    def test_endpoint_is_staff_only(self):
+        url = reverse('instrumentation')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        staff = User.objects.create_user(username='ops', is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(reverse('jobs:job_list'))
+        views = [row['view'] for row in self.client.get(url).json()['views']]
+        self.assertIn('jobs:job_list', views)
+
+        self.client.post(url)
+        self.assertEqual([row['view'] for row in self.client.get(url).json()['views']],
+                         ['instrumentation'])
+
+
+@override_settings(METRICS_TOKEN='s3cret')
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+
+    def scrape(self):
+        return self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer s3cret'}).content.decode()
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_counts_responses_queries_and_cache_lookups(self):
+        labels = {'view': 'jobs:job_list', 'method': 'GET'}
+        responses = self.sample('jobportal_responses_total', status='200', **labels)
+        requests = self.sample('jobportal_request_duration_seconds_count', **labels)
+        hits = self.sample('jobportal_cache_requests_total', kind='page', result='hit')
+
+        self.client.get(reverse('jobs:job_list'))
+        self.client.get(reverse('jobs:job_list'))
+
+        self.assertEqual(self.sample('jobportal_responses_total', status='200', **labels), responses + 2)
+        self.assertEqual(self.sample('jobportal_request_duration_seconds_count', **labels), requests + 2)
+        self.assertEqual(self.sample('jobportal_cache_requests_total', kind='page', result='hit'), hits + 1)
+        body = self.scrape()
+        self.assertIn('jobportal_db_queries_per_request_bucket{le="5.0",view="jobs:job_list"}', body)
+
+    def test_upload_metrics_only_count_bytes_that_were_stored(self):
+        stored = self.sample('jobportal_upload_bytes_total', backend='local')
+        failed = self.sample('jobportal_upload_duration_seconds_count', backend='local', outcome='error')
+
+        with metrics.observe_upload('local', 100):
+            pass
+        with self.assertRaises(OSError), metrics.observe_upload('local', 50):
+            raise OSError
+
+        self.assertEqual(self.sample('jobportal_upload_bytes_total', backend='local'), stored + 100)
+        self.assertEqual(self.sample('jobportal_upload_duration_seconds_count',
+                                     backend='local', outcome='error'), failed + 1)
+
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer nope'})
+                         .status_code, 403)
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_token_is_only_served_in_debug(self):
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+            with override_settings(DEBUG=True):
+                self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    def test_sums_samples_from_every_worker_process(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        worker = "from jobportal import metrics; metrics.record_cache('page', hit=True)"
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', worker], check=True, cwd=settings.BASE_DIR,
+                           env={**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory.name})
+
+        with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory.name}):
+            body = self.scrape()
+
+        self.assertIn('jobportal_cache_requests_total{kind="page",result="hit"} 2.0', body)
+
+
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log = os.path.join(directory.name, 'slow.log')
+        # Any positive threshold below a real query's duration logs everything.
+        self.enterContext(override_settings(
+            SLOW_QUERY_MS=0.0001, SLOW_QUERY_EXPLAIN_RATE=1, SLOW_QUERY_LOG=self.log,
+        ))
+        make_job(make_company())
+
+    def test_logs_view_sql_params_and_plan(self):
+        self.client.get(reverse('jobs:job_list'), {'skill': 'python'})
+
+        entries = list(slow_queries.read_entries())
+        self.assertTrue(entries)
+        self.assertEqual({entry['view'] for entry in entries}, {'jobs:job_list'})
+        listing = next(entry for entry in entries if 'jobs_jobskill' in entry['sql'])
+        self.assertIn("'python'", listing['params'])
+        self.assertTrue(any('INDEX' in line for line in listing['plan']))
+
+        out = StringIO()
+        call_command('slow_query_report', '--plans', '--view', 'jobs:job_list', stdout=out)
+        self.assertIn('jobs:job_list', out.getvalue())
+        self.assertIn(f'{len(entries)} slow queries', out.getvalue())
+
+    def test_rotated_files_are_read_too(self):
+        with override_settings(SLOW_QUERY_EXPLAIN_RATE=0):
+            self.client.get(reverse('jobs:job_list'))
+            before_rotation = len(list(slow_queries.read_entries()))
+            # What logrotate does: move the file aside (and compress older copies).
+            os.rename(self.log, f'{self.log}.1')
+            with open(f'{self.log}.1', 'rb') as rotated, gzip.open(f'{self.log}.2.gz', 'wb') as older:
+                older.write(rotated.read())
+            cache.get_cache().clear()
+            self.client.get(reverse('jobs:job_list'))
+
+        self.assertTrue(os.path.exists(self.log))
+        self.assertEqual(slow_queries.log_paths(), [self.log, f'{self.log}.1', f'{self.log}.2.gz'])
+        self.assertEqual(len(list(slow_queries.read_entries())), 3 * before_rotation)
+
+    def test_plan_capture_is_rolled_back(self):
+        recorder = slow_queries.SlowQueryRecorder(None, 0, 1)
+
+        def explain_that_writes(*args, **kwargs):
+            Job.objects.update(title='Changed')
+            return ['plan']
+
+        with mock.patch.object(slow_queries, 'explain', side_effect=explain_that_writes):
+            plan = recorder.capture_plan('SELECT 1', None, connection)
+
+        self.assertEqual(plan, ['plan'])
+        self.assertFalse(Job.objects.filter(title='Changed').exists())
+
+    def test_only_plain_selects_are_analyzed_on_postgresql(self):
+        recorder = slow_queries.SlowQueryRecorder(None, 0, 1)
+        postgresql = mock.Mock(vendor='postgresql', alias='default')
+        with mock.patch.object(slow_queries, 'explain', return_value=['plan']) as explain_mock:
+            self.assertIsNone(recorder.capture_plan(
+                'WITH gone AS (DELETE FROM jobs_job RETURNING id) SELECT * FROM gone', None, postgresql,
+            ))
+            recorder.capture_plan('SELECT 1', None, postgresql)
+        explain_mock.assert_called_once_with('SELECT 1', None, using='default', analyze=True)
+
+    def test_normalize_sql_groups_repeats(self):
+        self.assertEqual(
+            slow_queries.normalize_sql('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21'),
+            slow_queries.normalize_sql('SELECT * FROM t WHERE id IN (%s) LIMIT 5'),
+        )
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.enterContext(override_settings(PROFILE_DIR=self.directory, PROFILE_KEEP=2))
+        make_job(make_company())
+        self.staff = User.objects.create_user(username='ops', is_staff=True)
+
+    def profile(self, **params):
+        return self.client.get(reverse('jobs:job_list'), {'__profile': 'cpu', **params})
+
+    def test_staff_request_is_profiled_with_sql_timeline(self):
+        self.client.force_login(self.staff)
+        response = self.profile()
+
+        self.assertEqual(response.status_code, 200)
+        [meta] = profiling.list_profiles()
+        self.assertEqual(response['X-Profile-Id'], meta['id'])
+        self.assertEqual((meta['view'], meta['mode']), ('jobs:job_list', 'cpu'))
+        self.assertTrue(any('jobs_job' in query['sql'] for query in meta['queries']))
+
+        response = self.profile(__profile_output='text')
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+        self.assertIn('SQL timeline', response.content.decode())
+
+    def test_flag_is_ignored_for_other_users(self):
+        self.assertNotIn('X-Profile-Id', self.profile())
+        self.client.force_login(User.objects.create_user(username='student'))
+        self.assertNotIn('X-Profile-Id', self.profile())
+        self.assertEqual(profiling.list_profiles(), [])
+
+    def test_ring_buffer_and_export(self):
+        self.client.force_login(self.staff)
+        ids = [self.profile()['X-Profile-Id'] for _ in range(3)]
+
+        self.assertEqual([meta['id'] for meta in profiling.list_profiles()], ids[:0:-1])
+        self.assertEqual(len(os.listdir(self.directory)), 4)
+
+        out = StringIO()
+        call_command('request_profiles', 'list', stdout=out)
+        self.assertIn('2 profile(s) stored', out.getvalue())
+
+        target = os.path.join(self.directory, 'out.callgrind')
+        call_command('request_profiles', 'export', ids[-1], '--format', 'callgrind',
+                     '--output', target, stdout=StringIO())
+        with open(target) as exported:
+            content = exported.read()
+        self.assertIn('events: Microseconds', content)
+        self.assertIn('cfn=', content)
+
+        with self.assertRaises(CommandError):
+            call_command('request_profiles', 'export', ids[0], stdout=StringIO())
+
+
+class ResumeUploadTests(TestCase):
+    PDF_BYTES = b'%PDF-1.4\n' + b'x' * 200_000 + b'\n%%EOF'
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.job = make_job(make_company())
+        self.student = User.objects.create_user(username='student')
+        self.client.force_login(self.student)
+
+    def apply(self, content, name='cv.pdf', content_type='application/pdf'):
+        return self.client.post(reverse('jobs:apply_job'), {
+            'job_id': self.job.pk,
+            'cover_letter': 'I would love to work on your APIs.',
+            'resume': SimpleUploadedFile(name, content, content_type=content_type),
+        }, headers={'X-Requested-With': 'XMLHttpRequest'}).json()
+
+    def docx(self, *names):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name in names:
+                archive.writestr(name, '<xml/>')
+        return buffer.getvalue()
+
+    def test_resume_is_streamed_hashed_and_saved(self):
+        with mock.patch('jobs.forms.detect_resume_type', wraps=detect_resume_type) as detect:
+            result = self.apply(self.PDF_BYTES)
+
+        self.assertTrue(result['success'], result)
+        [resume] = [call.args[0] for call in detect.call_args_list]
+        self.assertIsInstance(resume, ResumeUploadedFile)
+        self.assertEqual((resume.content_type, resume.size), (PDF, len(self.PDF_BYTES)))
+        self.assertEqual(resume.sha256, hashlib.sha256(self.PDF_BYTES).hexdigest())
+        application = JobApplication.objects.get()
+        with application.resume.open('rb') as stored:
+            self.assertEqual(stored.read(), self.PDF_BYTES)
+
+    def test_type_comes_from_the_bytes_not_the_header(self):
+        result = self.apply(b'MZ\x90\x00 not a resume' * 100, name='cv.pdf')
+        self.assertEqual(result['message'], TYPE_ERROR)
+
+        result = self.apply(self.docx('word/document.xml'), name='cv.docx', content_type='text/plain')
+        self.assertTrue(result['success'], result)
+        self.assertTrue(JobApplication.objects.get().resume.name.endswith('.docx'))
+
+    def test_zip_without_word_document_is_rejected(self):
+        result = self.apply(self.docx('payload.exe'), name='cv.docx', content_type=DOCX)
+        self.assertEqual(result['errors']['resume'], [TYPE_ERROR])
+        self.assertFalse(JobApplication.objects.exists())
+
+    def test_oversized_resume_is_cut_off(self):
+        result = self.apply(b'%PDF-1.4\n' + b'x' * (5 * 1024 * 1024))
+        self.assertEqual(result['message'], SIZE_ERROR)
+        self.assertFalse(JobApplication.objects.exists())
+
+    def test_tiny_file_is_rejected(self):
+        self.assertEqual(self.apply(b'%P')['errors']['resume'], [TYPE_ERROR])
+
+    def test_other_file_fields_use_default_handlers(self):
+        photo = SimpleUploadedFile('photo.jpg', b'\xff\xd8\xff' + b'0' * 100, content_type='image/jpeg')
+        request = RequestFactory().post('/', {'profile_picture': photo})
+
+        self.assertIsInstance(request.FILES['profile_picture'], InMemoryUploadedFile)
+        self.assertIsNone(detect_resume_type(request.FILES['profile_picture']))
+
+
+class ResumeStorageTests(TestCase):
+    CV = b'%PDF-1.4\n% the same CV everywhere\n%%EOF\n'
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.company = make_company()
+        self.student = User.objects.create_user(username='student')
+
+    def apply(self, job, content=CV):
+        return JobApplication.objects.create(student=self.student, job=job, cover_letter='Hello there!',
+                                             resume=ContentFile(content, name='My CV.PDF'))
+
+    def blob_files(self):
+        root = os.path.join(settings.MEDIA_ROOT, 'resumes', 'sha256')
+        return sorted(name for _, _, names in os.walk(root) for name in names)
+
+    def test_identical_resumes_share_one_counted_file(self):
+        first = self.apply(make_job(self.company))
+        second = self.apply(make_job(self.company))
+        profile = StudentProfile.objects.create(user=self.student, resume=ContentFile(self.CV, name='cv.pdf'))
+
+        digest = hashlib.sha256(self.CV).hexdigest()
+        self.assertEqual(first.resume.name, f'resumes/sha256/{digest[:2]}/{digest}.pdf')
+        self.assertEqual({second.resume.name, profile.resume.name}, {first.resume.name})
+        self.assertEqual(self.blob_files(), [f'{digest}.pdf'])
+        blob = ResumeBlob.objects.get()
+        self.assertEqual((blob.reference_count, blob.size), (3, len(self.CV)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(ResumeBlob.objects.get().reference_count, 2)
+        self.assertTrue(resume_storage.exists(blob.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.delete()
+        self.assertFalse(ResumeBlob.objects.exists())
+        self.assertEqual(self.blob_files(), [])
+
+    def test_replacing_a_profile_resume_releases_the_old_one(self):
+        profile = StudentProfile.objects.create(user=self.student, resume=ContentFile(self.CV, name='cv.pdf'))
+        old_name = profile.resume.name
+
+        profile = StudentProfile.objects.get(pk=profile.pk)
+        profile.resume = ContentFile(b'%PDF-1.4\n% rewritten\n', name='cv.pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+
+        self.assertFalse(resume_storage.exists(old_name))
+        self.assertEqual(list(ResumeBlob.objects.values_list('name', 'reference_count')),
+                         [(profile.resume.name, 1)])
+
+    def test_a_file_deleted_before_its_upload_is_counted_is_written_again(self):
+        first = self.apply(make_job(self.company))
+        name = first.resume.name
+        acquire = resumes.acquire
+
+        def release_first_meanwhile(*args):
+            # The upload found the file stored already; the last other
+            # reference goes, and its deletion commits, before it is counted.
+            with self.captureOnCommitCallbacks(execute=True):
+                first.delete()
+            self.assertFalse(resume_storage.exists(name))
+            acquire(*args)
+
+        with mock.patch.object(resumes, 'acquire', side_effect=release_first_meanwhile):
+            second = self.apply(make_job(self.company))
+
+        self.assertEqual(second.resume.name, name)
+        self.assertTrue(resume_storage.exists(name))
+        self.assertEqual(ResumeBlob.objects.get().reference_count, 1)
+
+    def test_a_streamed_upload_can_be_written_again(self):
+        upload = ResumeUploadedFile('cv.pdf', 'application/pdf', len(self.CV), None)
+        upload.write(self.CV)
+        upload.seek(0)
+        acquire = resumes.acquire
+
+        def delete_file_meanwhile(name, *args):
+            # Newly written, then removed by the deletion of an earlier blob
+            # with the same bytes before this upload was counted.
+            resume_storage.delete(name)
+            acquire(name, *args)
+
+        with mock.patch.object(resumes, 'acquire', side_effect=delete_file_meanwhile), upload:
+            application = JobApplication.objects.create(student=self.student, job=make_job(self.company),
+                                                        cover_letter='Hello there!', resume=upload)
+
+        with resume_storage.open(application.resume.name) as stored:
+            self.assertEqual(stored.read(), self.CV)
+
+    def test_a_blob_counted_again_before_its_deletion_commits_is_kept(self):
+        first = self.apply(make_job(self.company))
+        with self.captureOnCommitCallbacks() as callbacks:
+            first.delete()
+        self.apply(make_job(self.company))
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(ResumeBlob.objects.get().reference_count, 1)
+        self.assertTrue(resume_storage.exists(first.resume.name))
+
+    def test_dedupe_command_moves_legacy_files_in_place(self):
+        legacy = [default_storage.save(name, ContentFile(content)) for name, content in [
+            ('applications/resumes/2025/01/cv.pdf', self.CV),
+            ('applications/resumes/2025/02/cv_copy.pdf', self.CV),
+            ('resumes/other.pdf', b'%PDF-1.4\n% another one\n'),
+        ]]
+        jobs = [make_job(self.company) for _ in range(2)]
+        for job, name in zip(jobs, legacy):
+            JobApplication.objects.create(student=self.student, job=job, cover_letter='Hello there!')
+            JobApplication.objects.filter(job=job).update(resume=name)
+        StudentProfile.objects.create(user=self.student)
+        StudentProfile.objects.update(resume=legacy[2])
+        JobApplication.objects.filter(job=jobs[0]).update(resume='applications/resumes/gone.pdf')
+        JobApplication.objects.create(student=User.objects.create_user(username='other'), job=jobs[0],
+                                      cover_letter='Hello there!')
+        JobApplication.objects.filter(student__username='other').update(resume=legacy[0])
+
+        out = StringIO()
+        call_command('dedupe_resumes', '--dry-run', stdout=out)
+        self.assertIn('Dry run: 3 file(s), 1 duplicate(s)', out.getvalue())
+        self.assertTrue(all(default_storage.exists(name) for name in legacy))
+
+        out = StringIO()
+        call_command('dedupe_resumes', stdout=out)
+        self.assertIn('1 missing file(s)', out.getvalue())
+        self.assertFalse(any(default_storage.exists(name) for name in legacy))
+        self.assertEqual(len(self.blob_files()), 2)
+        names = set(JobApplication.objects.exclude(resume__contains='gone').values_list('resume', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertIsNotNone(digest_of(names.pop()))
+        counts = dict(ResumeBlob.objects.values_list('name', 'reference_count'))
+        self.assertEqual(sorted(counts.values()), [1, 2])
+        self.assertEqual(counts[StudentProfile.objects.get().resume.name], 1)
+
+
+class ImageRenditionTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def generate(self, size, mode='RGBA'):
+        image = Image.new(mode, size, (10, 120, 200, 128)[:len(mode)])
+        return renditions.generate_renditions(image, 'company_logos/acme.png', renditions.local_saver())
+
+    def test_every_size_is_stored_as_webp_and_jpeg_next_to_the_original(self):
+        sizes = self.generate((800, 400))
+
+        self.assertEqual(list(sizes), ['48', '128', '512'])
+        self.assertEqual(sizes['48'], {'webp': '/media/company_logos/acme.48.webp',
+                                       'jpeg': '/media/company_logos/acme.48.jpg'})
+        with default_storage.open('company_logos/acme.512.webp') as webp:
+            image = Image.open(webp)
+            self.assertEqual((image.format, image.size), ('WEBP', (512, 256)))
+        with default_storage.open('company_logos/acme.128.jpg') as jpeg:
+            image = Image.open(jpeg)
+            self.assertEqual((image.format, image.mode, image.size), ('JPEG', 'RGB', (128, 64)))
+
+    def test_small_originals_are_not_upscaled(self):
+        self.assertEqual(list(self.generate((200, 150), mode='P')), ['48', '128'])
+        self.assertEqual(list(self.generate((20, 20))), ['48'])
+        with default_storage.open('company_logos/acme.48.jpg') as jpeg:
+            self.assertEqual(Image.open(jpeg).size, (20, 20))
+
+    def test_delete_removes_every_rendition(self):
+        self.generate((800, 400))
+        renditions.delete_local_renditions('company_logos/acme.png')
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, 'company_logos')), [])
+
+    def render(self, image, sizes, size):
+        template = Template('{% load renditions %}{% responsive_image image sizes size alt="Acme" class="logo" %}')
+        return template.render(Context({'image': image, 'sizes': sizes, 'size': size}))
+
+    def test_tag_offers_the_smallest_covering_renditions(self):
+        sizes = {str(size): {'webp': f'/{size}.webp', 'jpeg': f'/{size}.jpg'} for size in renditions.SIZES}
+        image = Company(logo='company_logos/acme.png').logo
+
+        # 128px covers both 1x (50px) and 2x (100px)
+        self.assertHTMLEqual(self.render(image, sizes, 50), (
+            '<picture><source type="image/webp" srcset="/128.webp">'
+            '<img src="/128.jpg" srcset="/128.jpg" alt="Acme" class="logo"></picture>'
+        ))
+        self.assertInHTML('<source type="image/webp" srcset="/48.webp 1x, /128.webp 2x">',
+                          self.render(image, sizes, 40))
+        # Nothing big enough: the largest there is
+        self.assertIn('src="/512.jpg"', self.render(image, sizes, 600))
+
+    def test_tag_falls_back_to_the_original(self):
+        local = Company(logo='company_logos/acme.png').logo
+        self.assertHTMLEqual(self.render(local, {}, 50),
+                             '<img src="/media/company_logos/acme.png" alt="Acme" class="logo">')
+        remote = StudentProfile(profile_picture='https://cdn.example.com/users/1/a.png').profile_picture
+        self.assertIn('src="https://cdn.example.com/users/1/a.png"', self.render(remote, {}, 50))
+
+
+class RedisCacheLayerTests(CacheLayerTests):
+    """The same behaviour against the Redis backend, served by an in-process fake."""
+
+    def setUp(self):
+        redis_cache = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                'LOCATION': 'redis://localhost:6379/0',
+                'KEY_PREFIX': 'jobportal',
+                'OPTIONS': {
+                    'connection_class': fakeredis.FakeConnection,
+                    'server': fakeredis.FakeServer(),
+                },
+            },
+        }
+        self.settings_override = override_settings(CACHES=redis_cache)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.assertEqual(type(cache.get_cache()).__name__, 'RedisCache')
+        super().setUp()
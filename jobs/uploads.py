@@ -0,0 +1,160 @@
+"""
+Streaming resume uploads.
+
+``ResumeUploadHandler`` is the first entry in ``FILE_UPLOAD_HANDLERS``. For
+file fields named in ``RESUME_FIELDS`` it takes over from Django's handlers
+and, chunk by chunk as the request body is read:
+
+* checks the first bytes against the PDF / Word signatures (the client's
+  ``Content-Type`` is ignored) and rejects anything else straight away,
+* stops reading once the file passes ``RESUME_MAX_BYTES``,
+* feeds a SHA-256 of the contents, and
+* writes the chunk to a temporary file, never holding the whole upload in
+  memory.
+
+The result is a ``ResumeUploadedFile`` whose ``content_type`` is the sniffed
+type and whose ``sha256`` is the digest. Saving it to the default
+(filesystem) storage moves the temporary file into place instead of copying
+it. Rejected uploads are left out of ``request.FILES``; ``upload_error()``
+returns the reason.
+
+Other file fields pass through untouched to the handlers after this one.
+"""
+import hashlib
+import os
+import zipfile
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+
+RESUME_FIELDS = ('resume',)
+RESUME_MAX_BYTES = 5 * 1024 * 1024
+
+PDF = 'application/pdf'
+DOC = 'application/msword'
+DOCX = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Leading bytes -> type. A .docx is a ZIP; detect_resume_type() checks it holds a Word document.
+SIGNATURES = [
+    (b'%PDF-', PDF),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', DOC),
+    (b'PK\x03\x04', DOCX),
+]
+SNIFF_BYTES = max(len(signature) for signature, _ in SIGNATURES)
+
+TYPE_ERROR = 'Only PDF and Word documents are allowed.'
+SIZE_ERROR = 'File size must be under 5MB.'
+
+
+def sniff_type(head):
+    """Content type for a file starting with ``head``, or None if it isn't a resume format."""
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+def _is_word_zip(path_or_file):
+    try:
+        with zipfile.ZipFile(path_or_file) as archive:
+            return 'word/document.xml' in archive.namelist()
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+def detect_resume_type(uploaded):
+    """
+    Content type of any uploaded file by its bytes (None if not PDF/Word).
+    Files that came through ResumeUploadHandler were sniffed while streaming.
+    """
+    position = uploaded.tell()
+    uploaded.seek(0)
+    if isinstance(uploaded, ResumeUploadedFile):
+        content_type = uploaded.content_type
+    else:
+        content_type = sniff_type(uploaded.read(SNIFF_BYTES))
+        uploaded.seek(0)
+    if content_type == DOCX and not _is_word_zip(uploaded):
+        content_type = None
+    uploaded.seek(position)
+    return content_type
+
+
+def upload_error(request, field_name='resume'):
+    """Why the upload in ``field_name`` was rejected while streaming, or None."""
+    for handler in request.upload_handlers:
+        if isinstance(handler, ResumeUploadHandler):
+            return handler.errors.get(field_name)
+    return None
+
+
+class ResumeUploadedFile(TemporaryUploadedFile):
+    """A resume streamed to a temporary file, with its ``sha256`` hex digest."""
+    sha256 = None
+
+
+class ResumeUploadHandler(FileUploadHandler):
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.errors = {}
+        # Not called ``file``: MultiPartParser closes ``handler.file`` on SkipFile.
+        self.upload = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.upload = None
+        if field_name not in RESUME_FIELDS:
+            return
+        self.upload = ResumeUploadedFile(self.file_name, None, 0, self.charset, self.content_type_extra)
+        self.digest = hashlib.sha256()
+        self.head = b''
+        self.received = 0
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload is None:
+            return raw_data
+        self.received += len(raw_data)
+        if self.received > RESUME_MAX_BYTES:
+            self.reject(SIZE_ERROR)
+        if self.upload.content_type is None:
+            self.head += raw_data[:SNIFF_BYTES]
+            if len(self.head) >= SNIFF_BYTES:
+                self.upload.content_type = sniff_type(self.head)
+                if self.upload.content_type is None:
+                    self.reject(TYPE_ERROR)
+        self.digest.update(raw_data)
+        self.upload.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.upload is None:
+            return None
+        # The parser doesn't expect SkipFile from here, so a file too short to
+        # sniff is passed on with no content type and detect_resume_type() turns it down.
+        if self.upload.content_type is None:
+            self.upload.content_type = sniff_type(self.head)
+        self.upload.flush()
+        self.upload.seek(0)
+        self.upload.size = file_size
+        self.upload.sha256 = self.digest.hexdigest()
+        uploaded, self.upload = self.upload, None
+        return uploaded
+
+    def upload_interrupted(self):
+        self.discard()
+
+    def reject(self, message):
+        self.errors[self.field_name] = message
+        self.discard()
+        raise SkipFile(message)
+
+    def discard(self):
+        if self.upload is not None:
+            path = self.upload.temporary_file_path()
+            self.upload.close()
+            if os.path.exists(path):
+                os.remove(path)
+            self.upload = None
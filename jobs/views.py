@@ -1,25 +1,64 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import HttpResponse, JsonResponse
 from django.template import loader
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+import hashlib
 import json
 
 # ✅ FIXED: Correct imports
 from .models import Job, JobApplication, JobBookmark
 from .forms import JobApplicationForm, JobForm
+from .pagination import KeysetPaginator, approximate_count
+from .search import search_jobs
+from .skills import skill_key
+from .uploads import upload_error
 from companies.models import Company
+from jobportal import cache
+from jobportal.cache import cache_anonymous_page, cached_queryset, conditional_page
 from django.views.decorators.http import require_http_methods  # ✅ Added missing import
 
+JOB_LIST_PAGE_SIZE = 12
 
+
+# ── HTTP validators (anonymous pages only: logged-in pages vary per user) ──
+def listing_validators(request, *args, **kwargs):
+    """ETag for listing pages: the listing version plus the query string."""
+    if request.user.is_authenticated:
+        return None, None
+    query = sorted(request.GET.lists())
+    digest = hashlib.md5(repr(query).encode(), usedforsecurity=False).hexdigest()[:16]
+    return f'L{cache.listing_version()}-{digest}', None
+
+
+def job_detail_validators(request, job_id):
+    """ETag for one job from its timestamps, without loading the row."""
+    if request.user.is_authenticated:
+        return None, None
+    row = Job.objects.filter(pk=job_id, is_active=True).values_list('created_at', 'updated_at').first()
+    if row is None:
+        return None, None
+    created_at, updated_at = row
+    # The listing version also covers company renames shown on the page.
+    # No Last-Modified: updated_at alone misses those, so If-Modified-Since
+    # would answer 304 for a page that has changed.
+    etag = f'J{job_id}-{created_at.timestamp():.0f}-{updated_at.timestamp():.6f}-L{cache.listing_version()}'
+    return etag, None
+
+
+@cache_anonymous_page(cache.JOBS, cache.COMPANIES)
 def main(request):
     """Main page with featured jobs and companies"""
     # ✅ FIXED: Use created_at instead of posted_on
-    latest_jobs = Job.objects.filter(is_active=True).order_by('-created_at')[:5]
-    top_companies = Company.objects.all()[:5]
+    # Served from the cache; job/company saves invalidate it (jobs/signals.py)
+    latest_jobs = cached_queryset(
+        cache.JOBS, ['main', 'latest_jobs'],
+        Job.objects.filter(is_active=True).select_related('company').order_by('-created_at')[:5],
+    )
+    top_companies = cached_queryset(cache.COMPANIES, ['main', 'top_companies'], Company.objects.all()[:5])
     
     context = {
         'latest_jobs': latest_jobs,
@@ -38,7 +77,7 @@ def login_view(request):
             return redirect('main')
         else:
             messages.error(request, 'Invalid credentials')
-    return render(request, 'Jobs/login.html')
+    return render(request, 'jobs/login.html')
 
 
 @login_required
@@ -85,21 +124,13 @@ def post_job(request):
         messages.error(request, 'Company profile not found.')
         return redirect('companies:company_dashboard')
     
-def job_list(request):
-    """Public job listings for students"""
-    jobs = Job.objects.filter(is_active=True).select_related('company').annotate(
-        applications_count=Count('applications')  # ✅ FIXED: Use 'applications' related name
-    ).order_by('-created_at')
+def _job_listing_context(request, search_query):
+    """Filtered, paginated open jobs shared by job_list and job_search"""
+    jobs = Job.objects.filter(is_active=True)
     
-    # Search functionality
-    search_query = request.GET.get('search')
+    # Search functionality (ranked full-text search, most relevant first)
     if search_query:
-        jobs = jobs.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(company__company_name__icontains=search_query) |
-            Q(required_skills__icontains=search_query)
-        )
+        jobs = search_jobs(jobs, search_query)
     
     # Filter by location
     location = request.GET.get('location')
@@ -111,10 +142,30 @@ def job_list(request):
     if job_type:
         jobs = jobs.filter(job_type=job_type)
     
-    # Pagination
-    paginator = Paginator(jobs, 12)  # 12 jobs per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Filter by skill (indexed join on the normalized skill table)
+    skill = request.GET.get('skill')
+    if skill:
+        jobs = jobs.filter(skill_links__skill__slug=skill_key(skill))
+    
+    # Result count: approximate by default so large listings skip a full COUNT(*)
+    if getattr(settings, 'JOB_LIST_APPROXIMATE_COUNT', True):
+        result_count, result_count_is_approximate = approximate_count(jobs)
+    else:
+        result_count, result_count_is_approximate = jobs.count(), False
+    
+    # applications_count is a maintained column on Job, no Count() join needed
+    listing = jobs.select_related('company').prefetch_related('normalized_skills')
+    
+    # Pagination: search results are ordered by relevance and use page numbers;
+    # the newest-first listing uses (created_at, id) cursors so deep pages stay cheap.
+    if search_query:
+        paginator = Paginator(listing, JOB_LIST_PAGE_SIZE)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        cursor_pagination = False
+    else:
+        paginator = KeysetPaginator(listing, JOB_LIST_PAGE_SIZE)
+        page_obj = paginator.get_page(request.GET.get('cursor'))
+        cursor_pagination = True
     
     # Get applied jobs for current user
     student_application = []
@@ -128,7 +179,18 @@ def job_list(request):
         'student_application': student_application,
         'is_paginated': page_obj.has_other_pages(),
         'page_obj': page_obj,
+        'cursor_pagination': cursor_pagination,
+        'result_count': result_count,
+        'result_count_is_approximate': result_count_is_approximate,
+        'search_query': search_query or '',
     }
+    return context
+
+@conditional_page(listing_validators)
+@cache_anonymous_page(cache.JOBS)
+def job_list(request):
+    """Public job listings for students"""
+    context = _job_listing_context(request, request.GET.get('search'))
     return render(request, 'jobs/job_list.html', context)
 
 @login_required
@@ -152,6 +214,15 @@ def apply_job(request):
                     'message': 'You have already applied for this job.'
                 })
             
+            # Resume turned down while the upload was streamed in
+            rejected = upload_error(request)
+            if rejected:
+                return JsonResponse({
+                    'success': False,
+                    'message': rejected,
+                    'errors': {'resume': [rejected]}
+                })
+            
             # Create application
             form = JobApplicationForm(request.POST, request.FILES)
             if form.is_valid():
@@ -179,6 +250,8 @@ def apply_job(request):
     
     return JsonResponse({'success': False, 'message': 'Invalid request'})
 
+@conditional_page(job_detail_validators)
+@cache_anonymous_page(cache.JOBS)
 def job_detail(request, job_id):
     """Job detail page"""
     job = get_object_or_404(Job, id=job_id, is_active=True)
@@ -330,33 +403,14 @@ def view_applications(request, job_id=None):
         messages.error(request, 'Company profile not found.')
         return redirect('companies:company_register')
 
+@conditional_page(listing_validators)
+@cache_anonymous_page(cache.JOBS)
 def job_search(request):
-    """Advanced job search with filters"""
-    jobs = Job.objects.filter(is_active=True).select_related('company')
-    
-    # Apply various filters
-    search_query = request.GET.get('q', '')
-    if search_query:
-        jobs = jobs.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(company__company_name__icontains=search_query)
-        )
-    
-    # Additional filters
-    location = request.GET.get('location')
-    if location:
-        jobs = jobs.filter(location__icontains=location)
-    
-    job_type = request.GET.get('job_type')
-    if job_type:
-        jobs = jobs.filter(job_type=job_type)
-    
-    context = {
-        'jobs': jobs,
-        'search_query': search_query,
-    }
-    return render(request, 'jobs/job_search.html', context)
+    """Job search (``?q=``), rendered with the same paginated listing as job_list"""
+    # ✅ FIXED: jobs/job_search.html never existed and the results were unpaginated
+    search_query = request.GET.get('q') or request.GET.get('search')
+    context = _job_listing_context(request, search_query)
+    return render(request, 'jobs/job_list.html', context)
 
 def logout_view(request):
     """Logout view"""
@@ -365,8 +419,8 @@ def logout_view(request):
 
 def aboutus(request):
     """About us page view"""
-    return render(request, 'Jobs/aboutus.html')
+    return render(request, 'jobs/aboutus.html')
 
 def contactus(request):
     """Contact us page view"""
-    return render(request, 'Jobs/contactus.html')
\ No newline at end of file
+    return render(request, 'jobs/contactus.html')
\ No newline at end of file
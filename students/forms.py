@@ -1,9 +1,6 @@
 # students/forms.py
 from django import forms
 from django.core.exceptions import ValidationError
-from PIL import Image
-from io import BytesIO
-import sys
 from .models import StudentProfile
 from django.contrib.auth.models import User
 
@@ -32,46 +29,9 @@ class ProfilePictureForm(forms.ModelForm):
             if picture.content_type not in valid_types:
                 raise ValidationError("Please upload a valid image file (JPG, PNG, GIF).")
             
-            # Check image dimensions and resize if necessary
-            try:
-                img = Image.open(picture)
-                
-                # Resize image if it's too large (max 1000x1000)
-                if img.width > 1000 or img.height > 1000:
-                    # Resize image while maintaining aspect ratio
-                    img.thumbnail((1000, 1000), Image.Resampling.LANCZOS)
-                    
-                    # Save the resized image back to the file
-                    output = BytesIO()
-                    
-                    # Determine format for saving
-                    format_mapping = {
-                        'image/jpeg': 'JPEG',
-                        'image/jpg': 'JPEG',
-                        'image/png': 'PNG',
-                        'image/gif': 'GIF'
-                    }
-                    
-                    save_format = format_mapping.get(picture.content_type, 'JPEG')
-                    
-                    # Convert RGBA to RGB for JPEG format
-                    if save_format == 'JPEG' and img.mode in ('RGBA', 'LA', 'P'):
-                        # Create a white background
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        if img.mode == 'P':
-                            img = img.convert('RGBA')
-                        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                        img = background
-                    
-                    img.save(output, format=save_format, quality=85, optimize=True)
-                    output.seek(0)
-                    
-                    # Update the file object
-                    picture.file = output
-                    picture.size = sys.getsizeof(output.getvalue())
-                    
-            except Exception as e:
-                raise ValidationError("Invalid image file. Please upload a valid image.")
+            # ✅ No decoding or resizing here: forms.ImageField has only verified the
+            # file (content_type above comes from its header). The media queue
+            # (students/media_tasks.py) resizes the picture off the request.
         
         return picture
 
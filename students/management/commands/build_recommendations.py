@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from students.recommendations import CHUNK_SIZE, TOP_N, build_recommendations
+
+
+class Command(BaseCommand):
+    help = "Refresh the precomputed job recommendation feed for student dashboards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help="Rescore every profile instead of only what changed since the last run.")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help=f"Profiles scored per batch (default {CHUNK_SIZE}).")
+        parser.add_argument('--top', type=int, default=TOP_N,
+                            help=f"Recommendations kept per student (default {TOP_N}).")
+
+    def handle(self, *args, **options):
+        run = build_recommendations(full=options['full'], chunk_size=options['chunk_size'],
+                                    top=options['top'])
+        elapsed = (run.finished_at - run.started_at).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Full' if run.full else 'Incremental'} run finished in {elapsed:.1f}s: "
+            f"{run.profiles_rescored} profile(s) rescored, {run.profiles_merged} merged "
+            f"with {run.jobs_changed} changed job(s)."
+        ))
@@ -0,0 +1,30 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from students.media_tasks import process_tasks
+
+
+class Command(BaseCommand):
+    help = ("Work the media queue: resize uploaded profile pictures, make thumbnails "
+            "and upload them. Runs until stopped unless --once is given.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Run the tasks that are due now, then exit.")
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Exit after this many tasks.")
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help="Seconds to wait when the queue is empty (default MEDIA_TASK_POLL_INTERVAL).")
+
+    def handle(self, *args, **options):
+        stopping = []
+        if not options['once']:
+            # Finish the current task on SIGTERM/SIGINT instead of dying halfway.
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: stopping.append(True))
+            self.stdout.write("Waiting for media tasks...")
+
+        processed = process_tasks(limit=options['limit'], wait=not options['once'],
+                                  poll_interval=options['poll_interval'], stop=lambda: stopping)
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} media task(s)."))
@@ -0,0 +1,208 @@
+"""
+Background media processing.
+
+Decoding, resizing and uploading an image takes far longer than the rest of a
+request, so ``upload_profile_picture_view`` only checks the file's header,
+stores it locally and queues a ``MediaTask``; it answers straight away with the
+task's id and a ``pending`` status. ``manage.py process_media_tasks`` works the
+queue: it resizes the picture (at most ``PICTURE_SIZE`` px), makes its WebP
+and JPEG renditions (jobportal/renditions.py), uploads them all side by side
+(students/supabase_storage.py) and points the profile at the new picture.
+Company logos are saved by ``upload_company_logo`` itself; a ``company_logo``
+task then makes their renditions next to the logo in local storage.
+
+The queue is a table, so queued work survives restarts. Workers claim a task
+with a conditional UPDATE, which is safe with any number of them on any
+database. The upload and the logo sit on the local MEDIA_ROOT, so a task is
+only claimed by workers with the ``MEDIA_TASK_HOST`` of the web process that
+queued it. A claim holds for ``MEDIA_TASK_LEASE`` seconds; if the worker dies
+the task is picked up again after that. Failed tasks are retried with
+exponential backoff up to ``MEDIA_TASK_MAX_ATTEMPTS`` times.
+"""
+import os
+import time
+import uuid
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from jobportal import renditions
+from . import supabase_storage
+from .models import MediaTask
+
+PROFILE_PICTURE = 'profile_picture'
+COMPANY_LOGO = 'company_logo'
+PICTURE_SIZE = 1000
+# Decoded format -> (saved format, extension). GIFs keep their first frame, as PNG.
+OUTPUT_FORMATS = {
+    'JPEG': ('JPEG', 'jpg'),
+    'PNG': ('PNG', 'png'),
+    'GIF': ('PNG', 'png'),
+}
+CLAIM_CANDIDATES = 10
+ERROR_LIMIT = 2000
+
+
+def enqueue_profile_picture(profile, upload):
+    """Store ``upload`` and queue it to become ``profile``'s picture."""
+    return MediaTask.objects.create(kind=PROFILE_PICTURE, profile=profile, source=upload,
+                                    host=settings.MEDIA_TASK_HOST)
+
+
+def enqueue_company_logo(company):
+    """Queue renditions of ``company``'s (already saved) logo."""
+    return MediaTask.objects.create(kind=COMPANY_LOGO, company=company, host=settings.MEDIA_TASK_HOST)
+
+
+def _claimable(now):
+    # Tasks without a host were queued before hosts were recorded.
+    return ((Q(status='pending', run_after__lte=now) | Q(status='running', locked_until__lt=now))
+            & Q(host__in=['', settings.MEDIA_TASK_HOST]))
+
+
+def claim_next():
+    """Take the oldest runnable task for this worker, or return None."""
+    now = timezone.now()
+    candidates = (MediaTask.objects.filter(_claimable(now))
+                  .order_by('run_after', 'pk').values_list('pk', flat=True)[:CLAIM_CANDIDATES])
+    for pk in candidates:
+        # Only one worker's UPDATE can still match the condition.
+        claimed = MediaTask.objects.filter(_claimable(now), pk=pk).update(
+            status='running', attempts=F('attempts') + 1,
+            locked_until=now + timedelta(seconds=settings.MEDIA_TASK_LEASE),
+        )
+        if claimed:
+            return MediaTask.objects.select_related('profile', 'company').get(pk=pk)
+    return None
+
+
+def _render(image, size, output_format):
+    image = image.copy()
+    image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    if output_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG has no alpha: flatten onto white
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[-1])
+        image = background
+    elif output_format == 'PNG' and image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA')
+    output = BytesIO()
+    image.save(output, format=output_format, quality=85, optimize=True)
+    return output.getvalue(), image.size
+
+
+def process_profile_picture(task):
+    profile = task.profile
+    newer = MediaTask.objects.filter(profile=profile, kind=PROFILE_PICTURE, pk__gt=task.pk)
+    if newer.exists():
+        # The student has uploaded another picture since; don't let this one win.
+        return {'superseded': True}
+    with task.source.open('rb') as source:
+        image = Image.open(source)
+        output_format, extension = OUTPUT_FORMATS.get(image.format, ('JPEG', 'jpg'))
+        image = ImageOps.exif_transpose(image)
+        picture, (width, height) = _render(image, PICTURE_SIZE, output_format)
+
+    # One random stem per upload, so the renditions sit next to their picture
+    name = f'users/{profile.user_id}/{uuid.uuid4().hex}.{extension}'
+
+    def upload(path, data):
+        return supabase_storage.upload_profile_picture(
+            ContentFile(data, name=os.path.basename(path)), bucket='public', filename=path)
+
+    url = upload(name, picture)
+    sizes = renditions.generate_renditions(image, name, upload)
+
+    # Stored as the field's name, like the synchronous upload did
+    profile.profile_picture = url
+    profile.renditions = sizes
+    profile.save(update_fields=['profile_picture', 'renditions', 'updated_at'])
+    thumbnail = sizes.get('128', sizes[min(sizes, key=int)])
+    return {'image_url': url, 'thumbnail_url': thumbnail['jpeg'], 'renditions': sizes,
+            'width': width, 'height': height}
+
+
+def process_company_logo(task):
+    company = task.company
+    newer = MediaTask.objects.filter(company=company, kind=COMPANY_LOGO, pk__gt=task.pk)
+    if newer.exists() or not company.logo:
+        # Replaced or removed since; the newer task (if any) does the work.
+        return {'superseded': True}
+    name = company.logo.name
+    with company.logo.open('rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        sizes = renditions.generate_renditions(image, name, renditions.local_saver(company.logo.storage))
+
+    # Only if the logo wasn't swapped while we worked
+    updated = type(company).objects.filter(pk=company.pk, logo=name).update(renditions=sizes)
+    if not updated:
+        renditions.delete_local_renditions(name, company.logo.storage)
+        return {'superseded': True}
+    return {'image_url': company.logo.url, 'renditions': sizes}
+
+
+HANDLERS = {
+    PROFILE_PICTURE: process_profile_picture,
+    COMPANY_LOGO: process_company_logo,
+}
+
+
+def run_task(task):
+    """Run one claimed task and record how it went."""
+    try:
+        result = HANDLERS[task.kind](task)
+    except Exception as exc:
+        task.last_error = f'{type(exc).__name__}: {exc}'[:ERROR_LIMIT]
+        task.locked_until = None
+        if task.attempts >= settings.MEDIA_TASK_MAX_ATTEMPTS:
+            # Given up: nothing will read the upload again.
+            if task.source:
+                task.source.delete(save=False)
+            task.status = 'failed'
+            task.finished_at = timezone.now()
+        else:
+            task.status = 'pending'
+            delay = settings.MEDIA_TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+            task.run_after = timezone.now() + timedelta(seconds=delay)
+        task.save(update_fields=['status', 'source', 'last_error', 'locked_until', 'run_after', 'finished_at'])
+        return task
+
+    if task.source:
+        task.source.delete(save=False)
+    task.status = 'done'
+    task.result = result
+    task.last_error = ''
+    task.locked_until = None
+    task.finished_at = timezone.now()
+    task.save(update_fields=['status', 'result', 'source', 'last_error', 'locked_until', 'finished_at'])
+    return task
+
+
+def process_tasks(limit=None, wait=False, poll_interval=None, stop=None):
+    """
+    Work through runnable tasks; returns how many were run. With ``wait`` it
+    keeps polling for new ones until ``limit`` is reached or ``stop()`` is true.
+    """
+    poll_interval = settings.MEDIA_TASK_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+    while limit is None or processed < limit:
+        if stop and stop():
+            break
+        task = claim_next()
+        if task is None:
+            if not wait:
+                break
+            # Don't sit on a connection the database may drop while idle.
+            close_old_connections()
+            time.sleep(poll_interval)
+            continue
+        run_task(task)
+        processed += 1
+    return processed
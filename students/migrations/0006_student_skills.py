@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:42
+
+from importlib import import_module
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_student_skills(apps, schema_editor):
+    # The skill parsing frozen in the migration that added the Skill table
+    parse_skills = import_module('jobs.migrations.0007_skill_index').parse_skills
+
+    Skill = apps.get_model('jobs', 'Skill')
+    Owner = apps.get_model('students', 'StudentProfile')
+    Link = apps.get_model('students', 'StudentSkill')
+
+    skill_ids = dict(Skill.objects.values_list('slug', 'id'))
+    links = []
+    for owner_id, text in Owner.objects.exclude(skills__isnull=True).exclude(skills='') \
+            .values_list('id', 'skills').iterator():
+        for key, name in parse_skills(text):
+            if key not in skill_ids:
+                skill_ids[key] = Skill.objects.create(slug=key, name=name).pk
+            links.append(Link(profile_id=owner_id, skill_id=skill_ids[key]))
+        if len(links) >= 1000:
+            Link.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    Link.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_skill_index'),
+        ('students', '0005_delete_student'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='students.studentprofile')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_links', to='jobs.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='normalized_skills',
+            field=models.ManyToManyField(blank=True, related_name='students', through='students.StudentSkill', to='jobs.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='studentskill',
+            index=models.Index(fields=['skill', 'profile'], name='students_skill_profile'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentskill',
+            unique_together={('profile', 'skill')},
+        ),
+        migrations.RunPython(backfill_student_skills, migrations.RunPython.noop),
+    ]
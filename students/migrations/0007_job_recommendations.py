@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_updated_at'),
+        ('students', '0006_student_skills'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('full', models.BooleanField(default=False)),
+                ('profiles_rescored', models.PositiveIntegerField(default=0)),
+                ('profiles_merged', models.PositiveIntegerField(default=0)),
+                ('jobs_changed', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'get_latest_by': 'started_at',
+            },
+        ),
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='JobRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='jobs.job')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='students.studentprofile')),
+            ],
+            options={
+                'ordering': ['profile', 'rank'],
+                'indexes': [models.Index(fields=['profile', 'rank'], name='students_rec_profile_rank')],
+                'unique_together': {('profile', 'job')},
+            },
+        ),
+    ]
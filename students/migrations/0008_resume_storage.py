@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:24
+
+import jobs.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_job_recommendations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='resume',
+            field=models.FileField(blank=True, help_text='Upload your resume (PDF)', null=True, storage=jobs.storage.ResumeStorage(), upload_to=''),
+        ),
+    ]
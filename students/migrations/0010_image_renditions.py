@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0004_logo_renditions'),
+        ('students', '0009_media_tasks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediatask',
+            name='company',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media_tasks', to='companies.company'),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='mediatask',
+            name='kind',
+            field=models.CharField(choices=[('profile_picture', 'Profile picture'), ('company_logo', 'Company logo')], max_length=30),
+        ),
+        migrations.AlterField(
+            model_name='mediatask',
+            name='profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media_tasks', to='students.studentprofile'),
+        ),
+    ]
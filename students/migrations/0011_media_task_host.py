@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0010_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediatask',
+            name='host',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0011_media_task_host'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='projects',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from jobs.storage import resume_storage
 import os
 import json
 class StudentProfile(models.Model):
@@ -9,6 +11,8 @@ class StudentProfile(models.Model):
     date_of_birth = models.DateField(blank=True, null=True)
     linkedin_url = models.URLField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    # ✅ Resized WebP/JPEG copies of the picture (see jobportal/renditions.py)
+    renditions = models.JSONField(default=dict, blank=True)
     bio = models.TextField(max_length=500, blank=True, null=True)
     
     # ✅ UPDATED: Academic fields (renamed to match form expectations)
@@ -20,13 +24,15 @@ class StudentProfile(models.Model):
     gpa = models.DecimalField(max_digits=4, decimal_places=2, blank=True, null=True)
     github_url = models.URLField(blank=True, null=True, help_text="GitHub profile URL")
     portfolio_url = models.URLField(blank=True, null=True, help_text="Portfolio website URL")
-    resume = models.FileField(upload_to='resumes/', blank=True, null=True, help_text="Upload your resume (PDF)")
+    resume = models.FileField(storage=resume_storage, blank=True, null=True, help_text="Upload your resume (PDF)")  # ✅ One file per distinct resume
     
     # Existing fields
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     skills = models.TextField(blank=True, null=True, help_text="Comma-separated skills (e.g., Python, JavaScript, React)")
+    # Indexed copy of `skills`, synced on save (see jobs/skills.py)
+    normalized_skills = models.ManyToManyField('jobs.Skill', through='StudentSkill', related_name='students', blank=True)
     experience = models.TextField(blank=True, null=True, help_text="Work experience details")
     education = models.TextField(blank=True, null=True, help_text="Educational background")
     def has_profile_picture(self):
@@ -46,6 +52,7 @@ class StudentProfile(models.Model):
             
             # Clear the field in the database
             self.profile_picture = None
+            self.renditions = {}
             self.save()
     
     def get_skills_list(self):
@@ -178,3 +185,88 @@ class StudentProfile(models.Model):
             return []
 
 
+class StudentSkill(models.Model):
+    profile = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey('jobs.Skill', on_delete=models.CASCADE, related_name='student_links')
+
+    class Meta:
+        unique_together = ['profile', 'skill']
+        indexes = [models.Index(fields=['skill', 'profile'], name='students_skill_profile')]
+
+    def __str__(self):
+        return f"{self.profile_id} knows {self.skill_id}"
+
+
+class JobRecommendation(models.Model):
+    """One entry of a student's precomputed feed (see students/recommendations.py)."""
+    profile = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='recommendations')
+    job = models.ForeignKey('jobs.Job', on_delete=models.CASCADE, related_name='recommendations')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['profile', 'rank']
+        unique_together = ['profile', 'job']
+        indexes = [models.Index(fields=['profile', 'rank'], name='students_rec_profile_rank')]
+
+    def __str__(self):
+        return f"#{self.rank} for {self.profile_id}: job {self.job_id}"
+
+
+class RecommendationRun(models.Model):
+    """Bookkeeping for `manage.py build_recommendations`; the last finished run marks what is fresh."""
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(blank=True, null=True)
+    full = models.BooleanField(default=False)
+    profiles_rescored = models.PositiveIntegerField(default=0)
+    profiles_merged = models.PositiveIntegerField(default=0)
+    jobs_changed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+        get_latest_by = 'started_at'
+
+    def __str__(self):
+        kind = 'full' if self.full else 'incremental'
+        return f"{kind} run at {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class MediaTask(models.Model):
+    """Media work queued for `manage.py process_media_tasks` (see students/media_tasks.py)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    KIND_CHOICES = [
+        ('profile_picture', 'Profile picture'),
+        ('company_logo', 'Company logo'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    # Whose picture or logo this is; one of the two is set, depending on `kind`
+    profile = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='media_tasks', blank=True, null=True)
+    company = models.ForeignKey('companies.Company', on_delete=models.CASCADE, related_name='media_tasks', blank=True, null=True)
+    # The upload as received, kept on local storage until the task is done
+    source = models.FileField(upload_to='media_tasks/%Y/%m/', blank=True)
+    # MEDIA_TASK_HOST of the web process that queued it: the files it needs
+    # are on that host's MEDIA_ROOT, so only workers there may claim it
+    host = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    # A running task whose worker died is picked up again after this
+    locked_until = models.DateTimeField(blank=True, null=True)
+    result = models.JSONField(default=dict, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'run_after'], name='students_media_task_queue')]
+
+    def __str__(self):
+        owner = self.profile_id if self.profile_id else f"company {self.company_id}"
+        return f"{self.kind} for {owner} ({self.status})"
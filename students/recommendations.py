@@ -0,0 +1,200 @@
+"""
+Precomputed job recommendations.
+
+``build_recommendations()`` scores active jobs against student profiles in
+chunks (see jobs/matching.py) and keeps the best ``TOP_N`` per student in
+``JobRecommendation``, so the dashboard reads a feed with one indexed lookup
+instead of scoring on every page view.
+
+Runs are incremental. The first run (or ``full=True``) scores everyone. After
+that, only profiles edited since the previous run are rescored against every
+active job; every other profile is scored against just the jobs created or
+edited since then, and the results are merged into its existing feed. Jobs that
+were closed or deleted in the meantime drop out of the feeds the same way; a
+feed left shorter than it could be is refilled by rescoring that profile.
+
+Memory stays flat as the catalogue grows: job skills are kept sparse and
+jobs are scored ``JOB_BLOCK`` at a time, keeping a running top list.
+"""
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+import numpy as np
+
+from jobs.matching import JobFeatures, ProfileFeatures, match_matrix
+from jobs.models import Job, JobApplication
+from .models import JobRecommendation, RecommendationRun, StudentProfile
+
+TOP_N = 20
+CHUNK_SIZE = 500
+JOB_BLOCK = 2000
+
+
+def _chunks(queryset, size):
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _applied(profiles, jobs):
+    """(row, column) arrays of the jobs each student already applied to."""
+    applied = [
+        (profiles.skills.row_of[profile_id], jobs.skills.row_of[job_id])
+        for profile_id, job_id in JobApplication.objects.filter(
+            student__studentprofile__id__in=profiles.skills.owner_ids,
+        ).values_list('student__studentprofile__id', 'job_id')
+        if job_id in jobs.skills.row_of
+    ]
+    applied = np.array(applied, dtype=np.int64).reshape(-1, 2)
+    return applied[:, 0], applied[:, 1]
+
+
+def _candidates(profiles, jobs, top, today):
+    """Best ``top`` (profile_id, job_id, score) triples per profile as flat arrays."""
+    profile_ids = profiles.skills.owner_ids
+    job_ids = jobs.skills.owner_ids
+    if not profile_ids or not job_ids:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+
+    applied_rows, applied_columns = _applied(profiles, jobs)
+    best_scores = np.zeros((len(profile_ids), 0))
+    best_columns = np.zeros((len(profile_ids), 0), dtype=np.int64)
+    for start in range(0, len(job_ids), JOB_BLOCK):
+        stop = min(start + JOB_BLOCK, len(job_ids))
+        scores = match_matrix(profiles, jobs, today, start, stop)
+        here = (applied_columns >= start) & (applied_columns < stop)
+        scores[applied_rows[here], applied_columns[here] - start] = -np.inf
+        # Running top list: this block's scores against the best so far
+        scores = np.concatenate([best_scores, scores], axis=1)
+        columns = np.concatenate(
+            [best_columns, np.broadcast_to(np.arange(start, stop), (len(profile_ids), stop - start))], axis=1)
+        if scores.shape[1] > top:
+            picked = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            scores = np.take_along_axis(scores, picked, axis=1)
+            columns = np.take_along_axis(columns, picked, axis=1)
+        best_scores, best_columns = scores, columns
+
+    rows = np.repeat(np.arange(len(profile_ids)), best_columns.shape[1])
+    picked = best_scores.ravel()
+    keep = np.isfinite(picked)
+    return (np.asarray(profile_ids)[rows[keep]], np.asarray(job_ids)[best_columns.ravel()[keep]],
+            picked[keep])
+
+
+def _short_feeds(profile_ids, candidate_profiles, top, open_jobs):
+    """
+    Profiles whose merged feed holds fewer jobs than a full scoring would
+    give them, i.e. a job they were shown has gone and the next best one is
+    missing: ``min(top, open jobs they haven't applied to)``.
+    """
+    applied = dict(
+        JobApplication.objects.filter(student__studentprofile__id__in=profile_ids, job__is_active=True)
+        .values_list('student__studentprofile__id').annotate(n=Count('pk'))
+    )
+    have = dict(zip(*np.unique(candidate_profiles, return_counts=True)))
+    return [
+        profile_id for profile_id in profile_ids
+        if have.get(profile_id, 0) < min(top, open_jobs - applied.get(profile_id, 0))
+    ]
+
+
+def _write_feeds(profile_ids, candidate_profiles, candidate_jobs, candidate_scores, top):
+    """Rank the candidates per profile and replace those profiles' feeds."""
+    order = np.lexsort((-candidate_jobs, -candidate_scores, candidate_profiles))
+    profiles = candidate_profiles[order]
+    positions = np.arange(len(profiles))
+    group_start = np.maximum.accumulate(
+        np.where(np.r_[True, profiles[1:] != profiles[:-1]], positions, 0)
+    ) if len(profiles) else positions
+    ranks = positions - group_start
+    keep = order[ranks < top]
+    ranks = ranks[ranks < top]
+
+    rows = [
+        JobRecommendation(profile_id=int(profile_id), job_id=int(job_id), score=float(score), rank=int(rank) + 1)
+        for profile_id, job_id, score, rank in zip(
+            candidate_profiles[keep], candidate_jobs[keep], candidate_scores[keep], ranks)
+    ]
+    with transaction.atomic():
+        JobRecommendation.objects.filter(profile_id__in=profile_ids).delete()
+        JobRecommendation.objects.bulk_create(rows, batch_size=1000)
+
+
+def build_recommendations(full=False, chunk_size=CHUNK_SIZE, top=TOP_N, today=None):
+    """Refresh the recommendation feeds and return the finished ``RecommendationRun``."""
+    previous = RecommendationRun.objects.filter(finished_at__isnull=False).first()
+    full = full or previous is None
+    # Rows edited while this run is in progress are picked up by the next
+    # one, because it starts from this run's start time.
+    run = RecommendationRun.objects.create(started_at=timezone.now(), full=full)
+
+    active_jobs = Job.objects.filter(is_active=True)
+    if full:
+        stale_profiles = StudentProfile.objects.all()
+        fresh_profiles = StudentProfile.objects.none()
+        changed_jobs = Job.objects.none()
+    else:
+        since = previous.started_at
+        stale_profiles = StudentProfile.objects.filter(updated_at__gte=since)
+        fresh_profiles = StudentProfile.objects.filter(updated_at__lt=since)
+        changed_jobs = Job.objects.filter(updated_at__gte=since)
+    run.jobs_changed = changed_jobs.count()
+
+    # Profiles that changed: score against every active job.
+    all_jobs = JobFeatures(active_jobs.values('pk'))
+    open_jobs = len(all_jobs.skills.owner_ids)
+    for profile_ids in _chunks(stale_profiles, chunk_size):
+        candidates = _candidates(ProfileFeatures(profile_ids), all_jobs, top, today)
+        _write_feeds(profile_ids, *candidates, top)
+        run.profiles_rescored += len(profile_ids)
+
+    # Everyone else: score only the changed jobs and merge with the feed.
+    # This runs even when no job changed, since deleted jobs leave gaps too.
+    if not full:
+        changed_features = JobFeatures(active_jobs.filter(pk__in=changed_jobs.values('pk')).values('pk'))
+        for profile_ids in _chunks(fresh_profiles, chunk_size):
+            new_profiles, new_jobs, new_scores = _candidates(
+                ProfileFeatures(profile_ids), changed_features, top, today)
+            kept = np.array(list(
+                JobRecommendation.objects.filter(profile_id__in=profile_ids)
+                .exclude(job_id__in=changed_jobs.values('pk'))
+                .values_list('profile_id', 'job_id', 'score')
+            ), dtype=float).reshape(-1, 3)
+            merged_profiles = np.concatenate([new_profiles, kept[:, 0].astype(np.int64)])
+            _write_feeds(
+                profile_ids,
+                merged_profiles,
+                np.concatenate([new_jobs, kept[:, 1].astype(np.int64)]),
+                np.concatenate([new_scores, kept[:, 2]]),
+                top,
+            )
+            run.profiles_merged += len(profile_ids)
+
+            # Jobs that dropped out left gaps the merge can't fill (the next
+            # best jobs were never stored), so rescore those profiles fully.
+            short = _short_feeds(profile_ids, merged_profiles, top, open_jobs)
+            if short:
+                _write_feeds(short, *_candidates(ProfileFeatures(short), all_jobs, top, today), top)
+                run.profiles_rescored += len(short)
+
+    run.finished_at = timezone.now()
+    run.save()
+    return run
+
+
+def recommended_jobs(profile, limit=5):
+    """Read the top ``limit`` open, not-yet-applied jobs from ``profile``'s feed."""
+    feed = (
+        profile.recommendations
+        .filter(job__is_active=True)
+        .exclude(job__applications__student_id=profile.user_id)
+        .select_related('job__company')
+        .order_by('rank')[:limit]
+    )
+    jobs = []
+    for recommendation in feed:
+        recommendation.job.match_score = round(recommendation.score * 100)
+        jobs.append(recommendation.job)
+    return jobs
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from jobs import resumes
+from jobs.skills import sync_student_skills
+from .models import StudentProfile
+
+
+@receiver(post_init, sender=StudentProfile)
+def remember_skills(sender, instance, **kwargs):
+    instance._synced_skills = instance.__dict__.get('skills')
+
+
+@receiver(post_save, sender=StudentProfile)
+def sync_skills(sender, instance, created=False, raw=False, **kwargs):
+    """Mirror the comma-separated skills text into the normalized Skill index."""
+    if raw:
+        return
+    previous = None if created else instance._synced_skills
+    if (instance.skills or None) != (previous or None):
+        sync_student_skills(instance)
+        instance._synced_skills = instance.skills
+
+
+@receiver(post_init, sender=StudentProfile)
+def remember_resume(sender, instance, **kwargs):
+    instance._stored_resume = resumes.stored_name(instance.__dict__.get('resume'))
+
+
+@receiver(pre_save, sender=StudentProfile)
+def remember_upload(sender, instance, **kwargs):
+    instance._resume_upload = resumes.pending_upload(instance.resume)
+
+
+@receiver(post_save, sender=StudentProfile)
+def count_resume(sender, instance, created=False, raw=False, **kwargs):
+    """Keep the shared resume file's reference count (jobs/resumes.py) in step."""
+    if raw:
+        return
+    resumes.replace(None if created else instance._stored_resume, instance.resume.name,
+                    instance._resume_upload)
+    instance._stored_resume = instance.resume.name
+    instance._resume_upload = None
+
+
+@receiver(post_delete, sender=StudentProfile)
+def release_resume(sender, instance, **kwargs):
+    resumes.release(instance._stored_resume)
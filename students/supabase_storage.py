@@ -1,26 +1,146 @@
 # students/supabase_storage.py
+import mimetypes
 import os
+import random
+import threading
+import time
 import uuid
-from django.conf import settings
+from email.utils import parsedate_to_datetime
 
-# optional: supabase client import - imported lazily in _get_supabase_client()
-from supabase import create_client
+import httpx
+from django.conf import settings
+from storage3 import SyncStorageClient
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 
+from jobportal import metrics
+
+# ── pooled client ─────────────────────────────────────────────────────────
+# One storage client per worker process, created on first use. Its httpx
+# connection pool keeps connections (and their TLS sessions) alive between
+# uploads instead of building a new client for each one. A forked child gets
+# a fresh client: the inherited one's sockets are still the parent's.
+_client = None
+_client_key = None
+_client_lock = threading.Lock()
+
+RETRY_STATUSES = {429, 502, 503, 504}
+# Refused without being processed, so any request can be sent again. A 502 or
+# 504 from a proxy may come after the backend did the work.
+UNPROCESSED_STATUSES = {429, 503}
+RETRY_AFTER_LIMIT = 30
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}
+# Nothing reached the server, so any request can be sent again.
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout,
+                 httpx.WriteError, httpx.WriteTimeout)
+
+
+class RetryTransport(httpx.HTTPTransport):
+    """
+    Retry failed connections and 429/502/503/504 responses with exponential
+    backoff (and jitter), honouring Retry-After. Requests that may have been
+    processed by the server (sent before the connection failed, or answered
+    with a 502/504) are only retried if their method is idempotent, so an
+    upload is never stored twice.
+    """
+
+    def __init__(self, retries=3, backoff=0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.retries = retries
+        self.backoff = backoff
+
+    def handle_request(self, request):
+        attempt = 0
+        while True:
+            try:
+                response = super().handle_request(request)
+            except httpx.TransportError as exc:
+                retryable = isinstance(exc, UNSENT_ERRORS) or request.method in IDEMPOTENT_METHODS
+                if attempt >= self.retries or not retryable:
+                    raise
+                delay = self.delay(attempt)
+            else:
+                retryable = response.status_code in UNPROCESSED_STATUSES or (
+                    response.status_code in RETRY_STATUSES and request.method in IDEMPOTENT_METHODS)
+                if attempt >= self.retries or not retryable:
+                    return response
+                delay = self.delay(attempt, response.headers.get('Retry-After'))
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                seconds = float(retry_after)
+            except ValueError:
+                try:
+                    seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    seconds = 0
+            if seconds > 0:
+                return min(seconds, RETRY_AFTER_LIMIT)
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+
+def _build_client(url, key):
+    http_client = httpx.Client(
+        headers={'apiKey': key, 'Authorization': f'Bearer {key}'},
+        timeout=httpx.Timeout(settings.SUPABASE_TIMEOUT, connect=settings.SUPABASE_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+                            max_keepalive_connections=settings.SUPABASE_MAX_CONNECTIONS,
+                            keepalive_expiry=settings.SUPABASE_KEEPALIVE_EXPIRY),
+        transport=RetryTransport(retries=settings.SUPABASE_RETRIES,
+                                 backoff=settings.SUPABASE_RETRY_BACKOFF),
+        follow_redirects=True,
+    )
+    return SyncStorageClient(f"{url.rstrip('/')}/storage/v1/", {}, http_client=http_client)
+
+
 def _get_supabase_client():
-    """Lazy-create supabase client reading settings or env vars."""
+    """This process's storage client, reading settings or env vars on first use."""
+    global _client, _client_key
     url = getattr(settings, "SUPABASE_URL", None) or os.environ.get("SUPABASE_URL")
     key = getattr(settings, "SUPABASE_KEY", None) or os.environ.get("SUPABASE_KEY")
     if not url or not key:
         raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in settings or environment variables.")
-    return create_client(url, key)
+    wanted = (os.getpid(), url, key)
+    if _client_key != wanted:
+        with _client_lock:
+            if _client_key != wanted:
+                if _client is not None and _client_key[0] == os.getpid():
+                    _client.session.close()
+                _client, _client_key = _build_client(url, key), wanted
+    return _client
+
+
+def close_client():
+    """Close and forget this process's client (settings changed, tests, shutdown)."""
+    global _client, _client_key
+    with _client_lock:
+        if _client is not None and _client_key[0] == os.getpid():
+            _client.session.close()
+        _client = _client_key = None
+
+
+def _forget_inherited_client():
+    # Runs in a forked child: drop the parent's client without closing its
+    # sockets, and replace a lock some other thread may have been holding.
+    global _client, _client_key, _client_lock
+    _client = _client_key = None
+    _client_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_inherited_client)
 
 
-def upload_profile_picture(file_obj, bucket='public', user_path='profile_pics'):
+def upload_profile_picture(file_obj, bucket='public', user_path='profile_pics', filename=None):
     """
     Uploads a Django uploaded file (InMemoryUploadedFile) to Supabase Storage and returns a URL.
     If SUPABASE_* are not configured, it falls back to saving locally to MEDIA_ROOT.
+    ``filename`` (the full path in the bucket) keeps related files side by side;
+    by default a random name under ``user_path`` is used.
     """
     # Defensive check: ensure file_obj looks like an uploaded file
     # Django uploaded files typically have .name and .read()
@@ -34,16 +154,19 @@ def upload_profile_picture(file_obj, bucket='public', user_path='profile_pics'):
 
     # Try Supabase upload first
     try:
-        supabase = _get_supabase_client()
+        storage = _get_supabase_client()
         ext = file_obj.name.split('.')[-1] if '.' in file_obj.name else ''
-        filename = f"{user_path}/{uuid.uuid4().hex}{('.' + ext) if ext else ''}"
+        remote_name = filename or f"{user_path}/{uuid.uuid4().hex}{('.' + ext) if ext else ''}"
+        # Served with this type; storage would say text/plain otherwise
+        content_type = mimetypes.guess_type(remote_name)[0] or 'application/octet-stream'
 
-        res = supabase.storage.from_(bucket).upload(filename, data)
+        with metrics.observe_upload('supabase', len(data)):
+            res = storage.from_(bucket).upload(remote_name, data, {'content-type': content_type})
         # check for error shape
         if isinstance(res, dict) and res.get('error'):
             raise RuntimeError(f"Supabase upload error: {res['error']}")
 
-        public = supabase.storage.from_(bucket).get_public_url(filename)
+        public = storage.from_(bucket).get_public_url(remote_name)
         if isinstance(public, dict):
             return public.get('publicURL') or public.get('public_url') or public.get('signedURL')
         return public
@@ -52,8 +175,9 @@ def upload_profile_picture(file_obj, bucket='public', user_path='profile_pics'):
         raise
     except Exception:
         # Fallback: save locally to MEDIA_ROOT (useful for dev)
-        filename = f"{user_path}/{uuid.uuid4().hex}_{file_obj.name}"
-        path = default_storage.save(filename, ContentFile(data))
+        local_name = filename or f"{user_path}/{uuid.uuid4().hex}_{file_obj.name}"
+        with metrics.observe_upload('local', len(data)):
+            path = default_storage.save(local_name, ContentFile(data))
         if settings.DEBUG:
             return settings.MEDIA_URL + path
         return default_storage.url(path)
@@ -1,3 +1,375 @@
-from django.test import TestCase
+import json
+import os
+import socket
+import tempfile
+import threading
+from datetime import timedelta
+from io import BytesIO, StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from companies.models import Company
+from jobs.models import Job
+from .models import JobRecommendation, MediaTask, StudentProfile
+from .recommendations import build_recommendations
+from . import media_tasks, supabase_storage
+
+
+class StudentSkillIndexTests(TestCase):
+    def setUp(self):
+        self.profile = StudentProfile.objects.create(user=User.objects.create_user(username='ann'))
+
+    def test_set_skills_list_syncs_normalized_skills(self):
+        self.profile.set_skills_list(['Python', {'name': 'nodejs'}, 'python'])
+        self.assertEqual(sorted(self.profile.normalized_skills.values_list('slug', flat=True)),
+                         ['node.js', 'python'])
+
+        self.profile.set_skills_list(['Go'])
+        self.assertEqual(list(self.profile.normalized_skills.values_list('slug', flat=True)), ['go'])
+
+    def test_profiles_sharing_a_skill_share_the_row(self):
+        other = StudentProfile.objects.create(user=User.objects.create_user(username='bob'),
+                                              skills='REACT')
+        self.profile.set_skills_list(['react.js'])
+        self.assertEqual(set(self.profile.normalized_skills.all()), set(other.normalized_skills.all()))
+
+
+class RecommendationFeedTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(user=User.objects.create_user(username='acme'),
+                                              company_name='Acme Corp')
+        self.ann = StudentProfile.objects.create(user=User.objects.create_user(username='ann'),
+                                                 skills='python, django')
+        self.bob = StudentProfile.objects.create(user=User.objects.create_user(username='bob'),
+                                                 skills='figma')
+
+    def make_job(self, title, skills, **fields):
+        return Job.objects.create(company=self.company, title=title, description='Work.',
+                                  location='Pune', required_skills=skills,
+                                  deadline=timezone.now().date() + timedelta(days=30), **fields)
+
+    def feed(self, profile):
+        return list(profile.recommendations.values_list('job__title', flat=True))
+
+    def test_full_run_ranks_every_profile(self):
+        self.make_job('Designer', 'Figma')
+        self.make_job('Django Developer', 'Python, Django')
+        self.make_job('Closed', 'Python, Django', is_active=False)
+
+        run = build_recommendations()
+        self.assertTrue(run.full)
+        self.assertEqual(run.profiles_rescored, 2)
+        self.assertEqual(self.feed(self.ann), ['Django Developer', 'Designer'])
+        self.assertEqual(self.feed(self.bob), ['Designer', 'Django Developer'])
+
+    def test_incremental_run_merges_new_jobs_and_rescores_edited_profiles(self):
+        self.make_job('Designer', 'Figma')
+        build_recommendations(top=2)
+
+        self.make_job('Django Developer', 'Python, Django')
+        self.bob.skills = 'python, django'
+        self.bob.save()
+        run = build_recommendations(top=2)
+
+        self.assertFalse(run.full)
+        self.assertEqual((run.profiles_rescored, run.profiles_merged, run.jobs_changed), (1, 1, 1))
+        self.assertEqual(self.feed(self.ann), ['Django Developer', 'Designer'])
+        self.assertEqual(self.feed(self.bob), ['Django Developer', 'Designer'])
+
+    def test_closed_jobs_leave_the_feed(self):
+        job = self.make_job('Django Developer', 'Python, Django')
+        self.make_job('Designer', 'Figma')
+        build_recommendations()
+
+        job.is_active = False
+        job.save()
+        build_recommendations()
+        self.assertEqual(self.feed(self.ann), ['Designer'])
+        self.assertFalse(JobRecommendation.objects.filter(job=job).exists())
+
+    def test_incremental_run_refills_feeds_that_lost_jobs(self):
+        best = self.make_job('Django Developer', 'Python, Django')
+        runner_up = self.make_job('Python Developer', 'Python, React')
+        self.make_job('Designer', 'Figma')
+        build_recommendations(top=2)
+        self.assertEqual(self.feed(self.ann), ['Django Developer', 'Python Developer'])
+
+        best.is_active = False
+        best.save()
+        runner_up.delete()
+        run = build_recommendations(top=2)
+
+        self.assertFalse(run.full)
+        self.assertEqual(self.feed(self.ann), ['Designer'])
+        self.assertEqual(run.profiles_rescored, 1)  # bob's feed still holds the one open job
+
+    def test_jobs_are_scored_in_blocks(self):
+        for n in range(5):
+            self.make_job(f'Python Developer {n}', 'Python' if n % 2 else 'Figma')
+        build_recommendations(top=2)
+        expected = self.feed(self.ann)
+
+        with mock.patch('students.recommendations.JOB_BLOCK', 2):
+            build_recommendations(full=True, top=2)
+        self.assertEqual(len(expected), 2)
+        self.assertEqual(self.feed(self.ann), expected)
+
+    def test_dashboard_reads_the_feed(self):
+        self.make_job('Designer', 'Figma')
+        applied = self.make_job('Django Developer', 'Python, Django')
+        self.make_job('Python Developer', 'Python')
+        build_recommendations()
+        applied.applications.create(student=self.ann.user, cover_letter='Hi',
+                                    resume='applications/resumes/cv.pdf')
+        self.client.force_login(self.ann.user)
+
+        response = self.client.get(reverse('students:student_dashboard'))
+        recommended = response.context['recommended_jobs']
+        self.assertEqual([job.title for job in recommended], ['Python Developer', 'Designer'])
+        self.assertContains(response, 'Recommended For You')
+
+
+class FakeStorageHandler(BaseHTTPRequestHandler):
+    """Answers Supabase Storage uploads; ``server.statuses`` queues error responses."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append({
+            'path': self.path,
+            'port': self.client_address[1],
+            'authorization': self.headers['Authorization'],
+            'body': body,
+        })
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        if status == 200:
+            payload = {'Key': self.path.split('/object/', 1)[1], 'Id': 'x'}
+        else:
+            payload = {'statusCode': str(status), 'error': 'Unavailable', 'message': 'try again'}
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeStorageMixin:
+    """Point the Supabase client at a FakeStorageHandler server and MEDIA_ROOT at a temp dir."""
+
+    def setUp(self):
+        super().setUp()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeStorageHandler)
+        self.server.requests, self.server.statuses = [], []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self.enterContext(override_settings(SUPABASE_URL=self.url, SUPABASE_KEY='test-key',
+                                            SUPABASE_RETRY_BACKOFF=0, MEDIA_ROOT=media.name))
+        self.addCleanup(supabase_storage.close_client)
+
+
+class SupabaseStorageClientTests(FakeStorageMixin, TestCase):
+
+    def upload(self, name='me.png'):
+        picture = SimpleUploadedFile(name, b'\x89PNG\r\n\x1a\n' + b'0' * 1000, content_type='image/png')
+        return supabase_storage.upload_profile_picture(picture, bucket='public', user_path='users/1')
+
+    def test_uploads_share_one_keep_alive_connection(self):
+        urls = [self.upload() for _ in range(3)]
+
+        self.assertTrue(all(url.startswith(f'{self.url}/storage/v1/object/public/public/users/1/')
+                            for url in urls))
+        requests = self.server.requests
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(len({request['port'] for request in requests}), 1)
+        self.assertEqual(requests[0]['authorization'], 'Bearer test-key')
+        self.assertIs(supabase_storage._get_supabase_client(), supabase_storage._get_supabase_client())
+
+    def test_unavailable_storage_is_retried(self):
+        self.server.statuses = [503, 429]
+        self.assertTrue(self.upload().startswith(self.url))
+        self.assertEqual(len(self.server.requests), 3)
+
+        # Out of retries: the picture is kept locally instead.
+        supabase_storage.close_client()
+        self.server.statuses = [503] * 3
+        with override_settings(SUPABASE_RETRIES=1):
+            self.assertTrue(self.upload().startswith('/media/users/1/'))
+        self.assertEqual(len(self.server.requests), 5)
+
+    def test_uploads_are_not_retried_after_a_gateway_error(self):
+        # The upload may have been stored behind the proxy: sending it again
+        # could store it twice. It is kept locally instead.
+        self.server.statuses = [502]
+        self.assertTrue(self.upload().startswith('/media/users/1/'))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_connection_failures_back_off(self):
+        with socket.socket() as unused:
+            unused.bind(('127.0.0.1', 0))
+            url = f'http://127.0.0.1:{unused.getsockname()[1]}'
+        with override_settings(SUPABASE_URL=url, SUPABASE_RETRIES=2, SUPABASE_RETRY_BACKOFF=0.2), \
+                mock.patch.object(supabase_storage.time, 'sleep') as sleep:
+            self.assertTrue(self.upload().startswith('/media/users/1/'))
+
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0 <= delays[0] <= 0.2 and 0 <= delays[1] <= 0.4, delays)
+
+    @skipUnless(hasattr(os, 'fork'), "needs os.fork()")
+    def test_forked_worker_builds_its_own_client(self):
+        self.upload()
+        parent_client = supabase_storage._get_supabase_client()
+
+        pid = os.fork()
+        if pid == 0:  # the "worker"
+            try:
+                ok = (supabase_storage._client is None and self.upload().startswith(self.url)
+                      and supabase_storage._get_supabase_client() is not parent_client)
+            finally:
+                os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertIs(supabase_storage._get_supabase_client(), parent_client)
+        self.assertEqual(len({request['port'] for request in self.server.requests}), 2)
+
+
+class MediaTaskQueueTests(FakeStorageMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='ann', password='pass12345')
+        self.client.force_login(self.user)
+
+    def image(self, size=(1600, 1200), image_format='PNG', mode='RGBA'):
+        output = BytesIO()
+        Image.new(mode, size, (200, 30, 30, 255)[:len(mode)]).save(output, format=image_format)
+        return output.getvalue()
+
+    def post_picture(self, content, name='me.png'):
+        return self.client.post(reverse('students:upload_profile_picture'),
+                                {'profile_picture': SimpleUploadedFile(name, content)})
+
+    def test_upload_returns_pending_and_worker_finishes_it(self):
+        response = self.post_picture(self.image())
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data['status'], 'pending')
+        self.assertEqual(self.server.requests, [])
+        self.assertFalse(StudentProfile.objects.get(user=self.user).profile_picture)
+
+        out = StringIO()
+        call_command('process_media_tasks', '--once', stdout=out)
+        self.assertIn('Processed 1 media task(s).', out.getvalue())
+
+        status = self.client.get(data['status_url']).json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual((status['width'], status['height']), (1000, 750))
+        self.assertTrue(status['thumbnail_url'].startswith(f'{self.url}/storage/v1/object/public/public/users/'))
+        profile = StudentProfile.objects.get(user=self.user)
+        self.assertEqual(profile.profile_picture.name, status['image_url'])
+        self.assertEqual(len(self.server.requests), 7)  # the picture and 3 sizes x 2 formats
+        task = MediaTask.objects.get()
+        self.assertFalse(task.source)
+
+        # The renditions sit next to the picture, each with its own type
+        stem = status['image_url'][:-len('.png')]
+        self.assertEqual(profile.renditions, task.result['renditions'])
+        self.assertEqual(profile.renditions['128'], {'webp': f'{stem}.128.webp', 'jpeg': f'{stem}.128.jpg'})
+        self.assertEqual(status['thumbnail_url'], f'{stem}.128.jpg')
+        for request in self.server.requests:
+            content_type = {'png': b'image/png', 'webp': b'image/webp', 'jpg': b'image/jpeg'}[request['path'].rsplit('.', 1)[1]]
+            self.assertIn(b'Content-Type: ' + content_type, request['body'])
+
+    def test_small_pictures_get_only_the_sizes_they_cover(self):
+        self.post_picture(self.image((100, 80)))
+        media_tasks.process_tasks()
+        self.assertEqual(list(StudentProfile.objects.get(user=self.user).renditions), ['48'])
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_removing_the_picture_forgets_its_renditions(self):
+        self.post_picture(self.image((100, 80)))
+        media_tasks.process_tasks()
+        profile = StudentProfile.objects.get(user=self.user)
+        profile.delete_profile_picture()
+        profile.refresh_from_db()
+        self.assertEqual(profile.renditions, {})
+
+    def test_invalid_image_is_rejected_on_the_request(self):
+        response = self.post_picture(b'GIF89a but not really', name='me.gif')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(MediaTask.objects.exists())
+
+    def test_failures_are_retried_with_backoff_then_given_up(self):
+        broken = self.image()[:200]  # header intact, pixel data cut off
+        profile = StudentProfile.objects.create(user=self.user)
+        task = media_tasks.enqueue_profile_picture(profile, SimpleUploadedFile('me.png', broken))
+        source = task.source.name
+
+        with override_settings(MEDIA_TASK_MAX_ATTEMPTS=2, MEDIA_TASK_RETRY_DELAY=60):
+            self.assertEqual(media_tasks.process_tasks(), 1)
+            task.refresh_from_db()
+            self.assertEqual((task.status, task.attempts), ('pending', 1))
+            self.assertTrue(default_storage.exists(source))
+            self.assertGreater(task.run_after, timezone.now() + timedelta(seconds=50))
+            self.assertTrue(task.last_error)
+            self.assertEqual(media_tasks.process_tasks(), 0)  # not due yet
+
+            MediaTask.objects.update(run_after=timezone.now())
+            media_tasks.process_tasks()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('failed', 2))
+        # The upload is deleted once nothing will retry it
+        self.assertFalse(task.source)
+        self.assertFalse(default_storage.exists(source))
+        self.assertEqual(self.client.get(reverse('students:media_task_status', args=[task.pk])).json()['success'],
+                         False)
+
+    def test_abandoned_claims_are_picked_up_again(self):
+        self.post_picture(self.image((10, 10)))
+        claimed = media_tasks.claim_next()
+        self.assertIsNone(media_tasks.claim_next())
+
+        MediaTask.objects.filter(pk=claimed.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(media_tasks.claim_next().attempts, 2)
+
+    def test_tasks_are_only_claimed_on_the_host_that_queued_them(self):
+        with override_settings(MEDIA_TASK_HOST='web-1'):
+            self.post_picture(self.image((10, 10)))
+        with override_settings(MEDIA_TASK_HOST='web-2'):
+            self.assertIsNone(media_tasks.claim_next())
+        with override_settings(MEDIA_TASK_HOST='web-1'):
+            self.assertIsNotNone(media_tasks.claim_next())
+
+    def test_older_upload_does_not_overwrite_newer_one(self):
+        self.post_picture(self.image((10, 10)))
+        self.post_picture(self.image((20, 20)))
+        media_tasks.process_tasks()
+
+        first, second = MediaTask.objects.order_by('pk')
+        self.assertEqual(first.result, {'superseded': True})
+        self.assertEqual(StudentProfile.objects.get(user=self.user).profile_picture.name,
+                         second.result['image_url'])
+
+    def test_status_is_private(self):
+        task_url = self.post_picture(self.image((10, 10))).json()['status_url']
+        self.client.force_login(User.objects.create_user(username='bob'))
+        self.assertEqual(self.client.get(task_url).status_code, 404)
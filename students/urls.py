@@ -15,6 +15,7 @@ urlpatterns = [
     path('withdraw-application/<int:application_id>/', views.withdraw_application, name='withdraw_application'),
 
     path('profile/upload-picture/', views.upload_profile_picture_view, name='upload_profile_picture'),
+    path('profile/picture-tasks/<int:task_id>/', views.media_task_status, name='media_task_status'),
     path('profile/delete-picture/', views.delete_profile_picture, name='delete_profile_picture'),
     path('profile/', views.student_profile, name='student_profile'),
     path('delete-account/', views.delete_student_account, name='delete_account'),
@@ -4,14 +4,19 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
+from django.urls import reverse
 from .models import StudentProfile
 from jobs.models import Job, JobApplication
+from jobs.uploads import TYPE_ERROR, detect_resume_type, upload_error
+from .recommendations import recommended_jobs
 from .forms import ProfilePictureForm
 from django.views.decorators.http import require_POST
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.views.decorators.http import require_http_methods  # ✅ Add this import
 
+DASHBOARD_RECOMMENDATIONS = 5
+
 def student_register(request):
     if request.method == 'POST':
         username = request.POST['username']
@@ -142,9 +147,17 @@ def apply_job(request):
         if not cover_letter:
             return JsonResponse({'success': False, 'message': 'Cover letter is required'})
         
+        rejected = upload_error(request)
+        if rejected:
+            return JsonResponse({'success': False, 'message': rejected})
+        
         if not resume:
             return JsonResponse({'success': False, 'message': 'Resume is required'})
         
+        # ✅ FIXED: Check the file type from its contents
+        if detect_resume_type(resume) is None:
+            return JsonResponse({'success': False, 'message': TYPE_ERROR})
+        
         # Create application
         application = JobApplication.objects.create(
             student=request.user,
@@ -189,7 +202,11 @@ def student_dashboard(request):
         messages.error(request, 'Access denied. Student profile required.')
         return redirect('students:student_login')
     
-    context = {'profile': profile}
+    # Precomputed by `manage.py build_recommendations`: one indexed lookup
+    context = {
+        'profile': profile,
+        'recommended_jobs': recommended_jobs(profile, limit=DASHBOARD_RECOMMENDATIONS),
+    }
     return render(request, 'students/student_dashboard.html', context)
 
 from django.shortcuts import render, get_object_or_404
@@ -209,47 +226,49 @@ def student_profile(request):
     }
     return render(request, 'students/profile.html', context)
 
-from .supabase_storage import upload_profile_picture as supabase_upload_profile_picture
+from .media_tasks import enqueue_profile_picture
+from .models import MediaTask
 
 @login_required
 def upload_profile_picture_view(request):
     """
     POST endpoint: '/students/profile/upload-picture/'
     Expects multipart/form-data with field name 'profile_picture'.
-    Returns JSON.
+    Returns JSON straight away with status 'pending'; the picture is resized
+    and uploaded by `manage.py process_media_tasks` (see media_tasks.py).
     """
     if request.method != "POST":
         return JsonResponse({'success': False, 'message': 'Invalid method'}, status=405)
 
-    uploaded_file = request.FILES.get('profile_picture')  # <- IMPORTANT: use request.FILES
-
-    if not uploaded_file:
+    if not request.FILES.get('profile_picture'):  # <- IMPORTANT: use request.FILES
         # If no file present, return a readable JSON error (avoid 500)
         return JsonResponse({'success': False, 'message': 'No file provided in request.FILES with key "profile_picture".'}, status=400)
 
-    try:
-        # Upload (this will call supabase_storage.upload_profile_picture and return a URL or path)
-        public_url = supabase_upload_profile_picture(uploaded_file, bucket='public', user_path=f'users/{request.user.id}')
-
-        # Save the resulting URL/path into the profile model
-        profile, created = StudentProfile.objects.get_or_create(user=request.user)
-        # If your model uses a URLField named 'profile_picture_url', use that:
-        if hasattr(profile, 'profile_picture_url'):
-            profile.profile_picture_url = public_url
-        else:
-            # fallback: try to set profile_picture (if it's a CharField/URLField)
-            try:
-                profile.profile_picture = public_url
-            except Exception:
-                # last resort: attach as an attribute (not recommended)
-                profile.profile_picture_url = public_url
-        profile.save()
+    profile, created = StudentProfile.objects.get_or_create(user=request.user)
+    # ✅ Cheap checks only (size, type from the header); no decoding on the request
+    form = ProfilePictureForm(request.POST, request.FILES, instance=profile)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'message': form.errors['profile_picture'][0]}, status=400)
 
-        return JsonResponse({'success': True, 'image_url': public_url})
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return JsonResponse({'success': False, 'message': str(e)}, status=500)
+    task = enqueue_profile_picture(profile, form.cleaned_data['profile_picture'])
+    return JsonResponse({
+        'success': True,
+        'status': task.status,
+        'task_id': task.pk,
+        'status_url': reverse('students:media_task_status', args=[task.pk]),
+    }, status=202)
+
+
+@login_required
+def media_task_status(request, task_id):
+    """Poll a queued upload: status, and the new picture's URLs once it is done."""
+    task = get_object_or_404(MediaTask, pk=task_id, profile__user=request.user)
+    data = {'success': task.status != 'failed', 'status': task.status}
+    if task.status == 'done':
+        data.update(task.result)
+    elif task.status == 'failed':
+        data['message'] = 'The picture could not be processed. Please try another image.'
+    return JsonResponse(data)
 
 @login_required
 @require_POST